@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Persisted SUM (dump_analysis) results, one compact JSON record per press.
+
+BrowserController._do_dump_analysis appends a record per analysis to
+~/.googlephotos_dumps/analysis.jsonl (next to the dump store), keyed by
+photo id and session, with the textarea inventory and selection decision,
+the album and face inventories and the simulated names. Analyses that find
+no textarea or sidebar root are recorded too, with the error. The query commands
+turn thousands of them into selector-drift numbers:
+
+    python analysis_store.py list [--session S] [--photo ID]
+    python analysis_store.py drift [--by session|sidebar]
+    python analysis_store.py compare REF_A REF_B
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+from dump_store import DEFAULT_ROOT, photo_id_from_url
+
+
+DEFAULT_PATH = os.environ.get('GPHOTOS_ANALYSIS_LOG') or os.path.join(DEFAULT_ROOT, 'analysis.jsonl')
+
+
+def new_session_id():
+    return time.strftime('%Y%m%d-%H%M%S')
+
+
+def select_textarea(textareas):
+    """(selected index or None, visible-only indices) as _do_dump_analysis decides them.
+
+    The legacy rule prefers rendered textareas with content, then the one
+    closest to the viewport centre, then the highest z-index; the simple
+    rule is every non-hidden textarea with a height.
+    """
+    rendered = [ta for ta in textareas if ta['offsetHeight'] > 0 and ta['offsetWidth'] > 0]
+    rendered.sort(key=lambda x: (not x['hasContent'], x['distance'], -x['zIndex']))
+    visible_only = [ta['index'] for ta in textareas if not ta['hidden'] and ta['offsetHeight'] > 0]
+    return (rendered[0]['index'] if rendered else None), visible_only
+
+
+def build_record(result, url, session, names_to_append):
+    """Compact record from the dump_analysis evaluate result.
+
+    A result with an 'error' (no textarea or sidebar root found: the
+    selector drift this store is for) gives a record with empty inventories
+    and the error, whose outcome() is 'error'.
+    """
+    selected, visible_only = select_textarea(result.get('textareas', []))
+    return {
+        'ts': round(time.time(), 3),
+        'session': session,
+        'photo_id': photo_id_from_url(url),
+        'url': url,
+        'sidebar_class': result.get('sidebarClass'),
+        'first_textarea': result.get('textareaInfo'),
+        'current_description': result.get('currentDescription', ''),
+        'textareas': [{
+            'index': ta['index'],
+            'class': ta['className'],
+            'hidden': ta['hidden'],
+            'in_sidebar': ta['inSidebar'],
+            'content_length': ta['contentLength'],
+            'distance': ta['distance'],
+            'z': ta['zIndex'],
+            'rect': [ta['rect']['left'], ta['rect']['top'], ta['rect']['width'], ta['rect']['height']],
+        } for ta in result.get('textareas', [])],
+        'selected': selected,
+        'visible_only': visible_only,
+        'albums': [{'text': a['text'], 'hidden': a['hidden'], 'in_sidebar': a['inSidebar'], 'height': a['offsetHeight']}
+                   for a in result.get('allAlbums', [])],
+        'faces': [{'text': f['text'], 'hidden': f['hidden'], 'in_sidebar': f['inSidebar'], 'height': f['offsetHeight']}
+                  for f in result.get('allFaces', [])],
+        'names_to_append': names_to_append,
+        'error': result.get('error'),
+    }
+
+
+def append_record(record, path=None):
+    path = path or DEFAULT_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+    return path
+
+
+def load_records(path=None, session=None, photo_id=None):
+    path = path or DEFAULT_PATH
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            r = json.loads(line)
+            if session and r['session'] != session:
+                continue
+            if photo_id and r['photo_id'] != photo_id:
+                continue
+            records.append(r)
+    return records
+
+
+def outcome(record):
+    """Short label for how the textarea selection went on this photo."""
+    if record.get('error'):
+        return 'error'
+    if record['selected'] is None:
+        return 'none-rendered'
+    if not record['visible_only']:
+        return 'no-visible'
+    if record['selected'] != record['visible_only'][0]:
+        return 'legacy-differs'
+    if len(record['visible_only']) > 1:
+        return 'ambiguous'
+    return 'ok'
+
+
+def drift(records, by='session'):
+    """Selection outcomes and inventory sizes per session (or sidebar class)."""
+    groups = defaultdict(list)
+    for r in records:
+        groups[r['session'] if by == 'session' else r['sidebar_class']].append(r)
+    report = {}
+    for key, rs in groups.items():
+        report[key] = {
+            'records': len(rs),
+            'photos': len({r['photo_id'] for r in rs}),
+            'outcomes': dict(Counter(outcome(r) for r in rs).most_common()),
+            'sidebar_classes': dict(Counter(r['sidebar_class'] for r in rs).most_common()),
+            'textareas_per_photo': dict(sorted(Counter(len(r['textareas']) for r in rs).items())),
+            'hidden_albums_in_sidebar': sum(1 for r in rs for a in r['albums'] if a['hidden'] and a['in_sidebar']),
+            'faces_outside_sidebar': sum(1 for r in rs for f in r['faces'] if not f['in_sidebar']),
+            'with_names_to_append': sum(1 for r in rs if r['names_to_append']),
+        }
+    return report
+
+
+def compare(a, b):
+    """Fields that differ between two records, as {field: [a, b]}."""
+    def view(r):
+        return {
+            'sidebar_class': r['sidebar_class'],
+            'textarea_count': len(r['textareas']),
+            'selected': r['selected'],
+            'visible_only': r['visible_only'],
+            'outcome': outcome(r),
+            'error': r.get('error'),
+            'textarea_classes': [ta['class'] for ta in r['textareas']],
+            'visible_albums': [x['text'] for x in r['albums'] if not x['hidden']],
+            'visible_faces': [x['text'] for x in r['faces'] if not x['hidden']],
+            'names_to_append': r['names_to_append'],
+        }
+    va, vb = view(a), view(b)
+    return {k: [va[k], vb[k]] for k in va if va[k] != vb[k]}
+
+
+def _find(records, ref):
+    """Latest record for a photo id, or records[int(ref)] (negative counts from the end)."""
+    matches = [r for r in records if r['photo_id'] == ref]
+    if matches:
+        return matches[-1]
+    try:
+        return records[int(ref)]
+    except (ValueError, IndexError):
+        raise SystemExit(f'No analysis record {ref!r}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query persisted SUM analysis records')
+    parser.add_argument('--file', default=None, help=f'Records file (default {DEFAULT_PATH})')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of text')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_list = sub.add_parser('list', help='One line per analysis')
+    p_list.add_argument('--session')
+    p_list.add_argument('--photo')
+    p_drift = sub.add_parser('drift', help='Selection outcomes aggregated per session or sidebar class')
+    p_drift.add_argument('--by', choices=['session', 'sidebar'], default='session')
+    p_drift.add_argument('--session')
+    p_compare = sub.add_parser('compare', help='Differences between two records (photo id or list position)')
+    p_compare.add_argument('a')
+    p_compare.add_argument('b')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        records = load_records(args.file, args.session, args.photo)
+        if args.json:
+            print(json.dumps(records, indent=2, ensure_ascii=False))
+            return
+        for i, r in enumerate(records):
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r['ts']))
+            print(f"{i:>5}  {when}  {r['session']}  {r['photo_id'] or '-':<24} {outcome(r):<15} "
+                  f"ta={len(r['textareas'])} sel={r['selected']} vis={r['visible_only']} "
+                  f"sidebar={r['sidebar_class']} names={r['names_to_append']}")
+    elif args.command == 'drift':
+        report = drift(load_records(args.file, args.session), args.by)
+        if args.json:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+            return
+        for key, v in report.items():
+            print(f"[DRIFT] {key}: {v['records']} analyses of {v['photos']} photos")
+            for name in ('outcomes', 'sidebar_classes', 'textareas_per_photo'):
+                print(f'[DRIFT]   {name}: {v[name]}')
+            print(f"[DRIFT]   hidden albums in sidebar: {v['hidden_albums_in_sidebar']}, "
+                  f"faces outside sidebar: {v['faces_outside_sidebar']}, "
+                  f"with names to append: {v['with_names_to_append']}")
+    elif args.command == 'compare':
+        records = load_records(args.file)
+        diff = compare(_find(records, args.a), _find(records, args.b))
+        if args.json:
+            print(json.dumps(diff, indent=2, ensure_ascii=False))
+            return
+        if not diff:
+            print('No differences')
+        for field, (va, vb) in diff.items():
+            print(f'{field}:\n  A: {va}\n  B: {vb}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""Latency/throughput benchmark for BrowserController variants.
+
+Runs each controller against fake_photos_server.py and reports p50/p95/p99
+per operation plus photos/minute for a tag-and-advance loop, as JSON:
+
+    python benchmark.py --headless --samples 30 --json bench.json
+    python benchmark.py --variants current,v3 --latency-ms 80
+    python benchmark.py --variants current,mine=../some/dir
+
+Every variant runs in its own subprocess (the old trees all define a
+top-level browser_controller module) with HOME pointed at a temp dir, so
+the hard-coded ~/.googlephotos_profile and its SingletonLock check never
+touch the real profile. The old controllers hard-code
+https://photos.google.com, so a small sync_playwright shim routes that
+origin to the local server; the current controller goes through the same
+shim so every variant pays identical routing overhead.
+
+Each sample enqueues the operation and then drains the command queue
+with read_description() calls, so it measures until the page has done
+the work, including names queued by auto-injection. The 'barrier'
+operation is the cost of one drain on its own.
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from latency_tracer import summarize_samples
+
+
+INJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(INJECT_DIR)
+
+VARIANTS = {
+    'current': os.path.join(REPO_ROOT, 'Inject'),
+    'v2': os.path.join(REPO_ROOT, 'OLD', 'Inject_V2'),
+    'v3': os.path.join(REPO_ROOT, 'OLD', 'Inject_V3'),
+    'poc': os.path.join(REPO_ROOT, 'OLD', 'poc', 'main-skeleton-good.py'),
+}
+
+REAL_ORIGIN = 'https://photos.google.com'
+LONG_TEXT = 'Grandma and Grandpa at the lake house with the whole family, summer ' * 2
+LONG_DESCRIPTION = 'x' * 200 + ' '
+
+# Operation name -> controller method it needs
+OPERATIONS = {
+    'barrier': 'read_description',
+    'next': 'goto_next_photo',
+    'prev': 'goto_prev_photo',
+    'append_short': 'append_text',
+    'append_long': 'append_text',
+    'backspace': 'send_backspace',
+    'delete_all': 'delete_all_description',
+    'names': 'goto_next_photo',
+    'tag_and_advance': 'append_text',
+}
+
+
+# --- variant process -------------------------------------------------------
+
+class _RedirectingChromium:
+    """Wraps playwright.chromium so contexts serve REAL_ORIGIN from the local server."""
+
+    def __init__(self, chromium, base_url, headless, channel):
+        self._chromium = chromium
+        self._base_url = base_url
+        self._headless = headless
+        self._channel = channel
+
+    def __getattr__(self, name):
+        return getattr(self._chromium, name)
+
+    def launch_persistent_context(self, user_data_dir, **kwargs):
+        kwargs['headless'] = self._headless
+        if self._channel is not None:
+            kwargs['channel'] = self._channel or None
+        if kwargs.get('channel') is None:
+            kwargs.pop('channel', None)
+        context = self._chromium.launch_persistent_context(user_data_dir, **kwargs)
+        base_url = self._base_url
+
+        def _redirect(route, request):
+            path = request.url[len(REAL_ORIGIN):] or '/'
+            route.fulfill(response=route.fetch(url=base_url + path))
+
+        context.route(REAL_ORIGIN + '/**', _redirect)
+        return context
+
+
+class _ShimPlaywright:
+    def __init__(self, playwright, chromium):
+        self._playwright = playwright
+        self.chromium = chromium
+
+    def __getattr__(self, name):
+        return getattr(self._playwright, name)
+
+
+def make_sync_playwright_shim(base_url, headless, channel):
+    """Drop-in replacement for playwright.sync_api.sync_playwright."""
+    from playwright.sync_api import sync_playwright
+
+    class _Manager:
+        def __init__(self):
+            self._manager = sync_playwright()
+
+        def _wrap(self, pw):
+            return _ShimPlaywright(pw, _RedirectingChromium(pw.chromium, base_url, headless, channel))
+
+        def start(self):
+            return self._wrap(self._manager.start())
+
+        def __enter__(self):
+            return self._wrap(self._manager.__enter__())
+
+        def __exit__(self, *exc):
+            return self._manager.__exit__(*exc)
+
+    return _Manager
+
+
+def load_controller_class(path):
+    """Import BrowserController from a variant dir or a single-file script."""
+    if os.path.isdir(path):
+        sys.path.insert(0, path)
+        os.chdir(path)
+        if os.path.exists(os.path.join(path, 'log_setup.py')):
+            importlib.import_module('log_setup').configure('WARNING')
+        module = importlib.import_module('browser_controller')
+    else:
+        sys.path.insert(0, os.path.dirname(path))
+        os.chdir(os.path.dirname(path))
+        spec = importlib.util.spec_from_file_location('variant_main', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+def drain(bc, timeout=30.0):
+    """Block until the worker has run everything queued so far (including follow-ups it queued)."""
+    ok = True
+    while True:
+        ok = bc.read_description(timeout=timeout) is not None and ok
+        if bc._cmd_queue.qsize() == 0:
+            return ok
+
+
+def run_variant(name, path, samples, warmup, latency_ms, headless, channel, faces):
+    """Benchmark one variant in this process and return its result dict."""
+    from fake_photos_server import PhotoStore, start_in_thread
+
+    per_op = warmup + samples
+    store = PhotoStore.load(None, count=per_op * (len(OPERATIONS) + 2) + 10, max_faces=0)
+    store.update_all(faces=[], albums=[], description='')
+    server, base_url = start_in_thread(store, port=0, latency_ms=latency_ms)
+
+    module = load_controller_class(path)
+    module.sync_playwright = make_sync_playwright_shim(base_url, headless, channel)
+    bc = module.BrowserController()
+    bc.start(headful=not headless, timeout=60)
+    if not getattr(bc, '_running', False) or not bc._ready_event.is_set():
+        raise RuntimeError(f'{name}: controller did not start')
+    drain(bc)
+
+    # Index of the photo on screen; page.url belongs to the worker thread, so count moves
+    position = [0]
+    operations = {}
+
+    def measure(op, action, prepare=None, prepare_moves=0, moves=0):
+        method = OPERATIONS[op]
+        if not hasattr(bc, method):
+            operations[op] = {'supported': False}
+            return
+        timings = []
+        failures = 0
+        for i in range(per_op):
+            if prepare:
+                prepare()
+                drain(bc)
+                position[0] += prepare_moves
+            t0 = time.perf_counter()
+            action()
+            ok = drain(bc)
+            ms = (time.perf_counter() - t0) * 1000.0
+            position[0] += moves
+            if i >= warmup:
+                timings.append(ms)
+                failures += 0 if ok else 1
+        result = summarize_samples(timings)
+        result['failures'] = failures
+        operations[op] = result
+        print(f'[BENCH] {name} {op}: p50 {result.get("p50_ms")} ms, p95 {result.get("p95_ms")} ms', file=sys.stderr)
+
+    def upcoming(**fields):
+        store.update_all(start=position[0] + 1, **fields)
+
+    measure('barrier', lambda: None)
+    measure('next', bc.goto_next_photo, moves=1)
+    measure('prev', bc.goto_prev_photo, moves=-1)
+    measure('append_short', lambda: bc.append_text('Dennis '))
+    measure('append_long', lambda: bc.append_text(LONG_TEXT))
+    measure('backspace', bc.send_backspace)
+
+    upcoming(description=LONG_DESCRIPTION)
+    measure('delete_all', bc.delete_all_description, prepare=bc.goto_next_photo, prepare_moves=1)
+
+    upcoming(description='', faces=[f'Person {chr(65 + i)}' for i in range(faces)])
+    measure('names', bc.goto_next_photo, moves=1)
+
+    upcoming(description='', faces=[])
+    tag_started = time.perf_counter()
+    measure('tag_and_advance', lambda: (bc.append_text('Dennis '), bc.goto_next_photo()), moves=1)
+    tagged = operations['tag_and_advance']
+    if tagged.get('count'):
+        tagged['photos_per_minute'] = round(60000.0 / tagged['mean_ms'], 1)
+        tagged['wall_s'] = round(time.perf_counter() - tag_started, 2)
+
+    bc.stop()
+    server.shutdown()
+    return {'variant': name, 'path': path, 'operations': operations}
+
+
+# --- driver ----------------------------------------------------------------
+
+def default_browsers_path():
+    """Playwright's per-user browser cache for the real HOME."""
+    home = os.path.expanduser('~')
+    if sys.platform == 'darwin':
+        return os.path.join(home, 'Library', 'Caches', 'ms-playwright')
+    if sys.platform.startswith('win'):
+        return os.path.join(os.environ.get('LOCALAPPDATA', home), 'ms-playwright')
+    return os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(home, '.cache')), 'ms-playwright')
+
+
+def parse_variants(spec):
+    variants = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, path = item.partition('=')
+        if path:
+            variants[name] = os.path.abspath(path)
+        elif name in VARIANTS:
+            variants[name] = VARIANTS[name]
+        else:
+            raise SystemExit(f'Unknown variant {name!r}; known: {", ".join(VARIANTS)} or name=path')
+    return variants
+
+
+def print_table(results):
+    ops = list(OPERATIONS)
+    names = [r['variant'] for r in results]
+    print(f"{'operation':<16}" + ''.join(f'{n[:22]:>24}' for n in names))
+    for op in ops:
+        cells = []
+        for r in results:
+            o = r.get('operations', {}).get(op)
+            if not o:
+                cells.append('error' if r.get('error') else '-')
+            elif o.get('supported') is False:
+                cells.append('n/a')
+            elif o.get('count'):
+                cells.append(f"{o['p50_ms']:.0f}/{o['p95_ms']:.0f}/{o['p99_ms']:.0f}")
+            else:
+                cells.append('-')
+        print(f'{op:<16}' + ''.join(f'{c:>24}' for c in cells))
+    print(f"{'photos/min':<16}" + ''.join(
+        f"{r.get('operations', {}).get('tag_and_advance', {}).get('photos_per_minute', '-'):>24}" for r in results))
+    print('(p50/p95/p99 ms)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark BrowserController variants against the local fake server')
+    parser.add_argument('--variants', default='current', help=f'Comma list of {", ".join(VARIANTS)} or name=path (default current)')
+    parser.add_argument('--samples', type=int, default=20, help='Timed samples per operation (default 20)')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed samples per operation (default 2)')
+    parser.add_argument('--latency-ms', type=int, default=0, help='Fake server latency per request')
+    parser.add_argument('--faces', type=int, default=3, help='Face chips per photo for the names operation (default 3)')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--channel', help="Browser channel override, e.g. 'chrome'; '' for bundled Chromium")
+    parser.add_argument('--json', metavar='FILE', help='Write the combined JSON report here')
+    parser.add_argument('--run-one', nargs=2, metavar=('NAME', 'PATH'), help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        name, path = args.run_one
+        try:
+            result = run_variant(name, path, args.samples, args.warmup, args.latency_ms,
+                                 args.headless, args.channel, args.faces)
+        except Exception as e:
+            result = {'variant': name, 'path': path, 'error': f'{type(e).__name__}: {e}'}
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    results = []
+    for name, path in parse_variants(args.variants).items():
+        print(f'[BENCH] Running {name} ({path})', file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix='gphotos_bench_') as home:
+            out = os.path.join(home, 'result.json')
+            cmd = [sys.executable, os.path.abspath(__file__), '--run-one', name, path, '--out', out,
+                   '--samples', str(args.samples), '--warmup', str(args.warmup),
+                   '--latency-ms', str(args.latency_ms), '--faces', str(args.faces)]
+            if args.headless:
+                cmd.append('--headless')
+            if args.channel is not None:
+                cmd += ['--channel', args.channel]
+            env = dict(os.environ, HOME=home)
+            # Keep finding the installed browsers once HOME moves
+            env.setdefault('PLAYWRIGHT_BROWSERS_PATH', default_browsers_path())
+            proc = subprocess.run(cmd, env=env)
+            if os.path.exists(out):
+                with open(out, 'r', encoding='utf-8') as f:
+                    results.append(json.load(f))
+            else:
+                results.append({'variant': name, 'path': path, 'error': f'exit code {proc.returncode}'})
+        if results[-1].get('error'):
+            print(f"[BENCH] {name} failed: {results[-1]['error']}", file=sys.stderr)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'samples': args.samples,
+        'latency_ms': args.latency_ms,
+        'faces': args.faces,
+        'results': results,
+    }
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'[BENCH] Wrote {args.json}')
+
+
+if __name__ == '__main__':
+    main()
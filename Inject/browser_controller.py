@@ -1,18 +1,148 @@
 """Browser controller - extracted from inject_v3.py"""
+import contextlib
+import importlib.util
 import time
 import queue
+import sys
 import threading
 
-try:
-    from playwright.sync_api import sync_playwright
-except Exception:
-    sync_playwright = None
+from analysis_store import append_record, build_record, new_session_id, select_textarea
+from dump_store import DumpWriter, photo_id_from_url
+from log_setup import get_logger
+from macro import advances
+from rpc_metadata import RpcMetadataListener
+from selector_health import PROBES, SelectorHealth
+
+# Imported by the worker on first start: playwright pulls in asyncio, greenlet
+# and its whole client (~100+ ms), which CLIs that only borrow a helper
+# from here should not pay. benchmark.py presets a shim in its place.
+sync_playwright = None
+
+
+log = get_logger('browser')
+
+
+def _sync_playwright():
+    """playwright.sync_api.sync_playwright, imported on first use."""
+    global sync_playwright
+    if sync_playwright is None:
+        from playwright.sync_api import sync_playwright as factory
+        sync_playwright = factory
+    return sync_playwright
+
+
+DEFAULT_BASE_URL = 'https://photos.google.com'
+
+# Chrome's text-field shortcuts on this platform; on macOS Control+A only
+# moves to the start of the line
+SELECT_ALL_KEY = 'Meta+A' if sys.platform == 'darwin' else 'Control+A'
+FIELD_END_KEY = 'Meta+ArrowDown' if sys.platform == 'darwin' else 'Control+End'
+
+# Opening of a JS function that leaves the visible description textarea in
+# `visible` and its value in `v` (both null when none is visible); callers
+# append the check and "}"
+_VISIBLE_DESCRIPTION_JS_BODY = """(expected) => {
+    let v = null, visible = null;
+    for (const ta of document.querySelectorAll('textarea[aria-label="Description"]')) {
+        let hidden = false;
+        for (let el = ta; el && el.tagName !== 'BODY'; el = el.parentElement) {
+            const style = (el.getAttribute('style') || '').toLowerCase();
+            if (el.getAttribute('aria-hidden') === 'true' || style.includes('display: none') || style.includes('display:none')) {
+                hidden = true;
+                break;
+            }
+        }
+        if (ta.offsetHeight > 0 && !hidden) {
+            v = ta.value || '';
+            visible = ta;
+            break;
+        }
+    }
+"""
+
+# Before an arrow key: tag the visible description textarea (and only it)
+# with its text, so _NEW_PANEL_JS can tell the next photo's panel from it
+_MARK_PANEL_JS = _VISIBLE_DESCRIPTION_JS_BODY + """
+    for (const ta of document.querySelectorAll('textarea[data-gphotos-left]')) ta.removeAttribute('data-gphotos-left');
+    if (visible) visible.setAttribute('data-gphotos-left', v.trim());
+    return v;
+}"""
+
+# True once the visible textarea belongs to another photo: it is not the
+# tagged one, or (if the page reuses the element) it shows the expected
+# description and that differs from the text it was tagged with
+_NEW_PANEL_JS = _VISIBLE_DESCRIPTION_JS_BODY + """
+    if (visible === null) return false;
+    if (!visible.hasAttribute('data-gphotos-left')) return true;
+    return expected !== null && v.trim() === expected && expected !== visible.getAttribute('data-gphotos-left');
+}"""
+
+# Grab everything a DMP press needs in one round trip. By default only the
+# info panel (the div.ZPTMcc / div.YW656b holding the visible description,
+# as dump-explorer finds it) is serialized, wrapped with the page title and
+# URL so the dump tools still read it; full=true takes the whole document.
+_DUMP_JS = """(full) => {
+    const esc = (s) => (s || '').replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/"/g, '&quot;');
+    let panel = null;
+    if (!full) {
+        for (const ta of document.querySelectorAll('textarea[aria-label="Description"]')) {
+            if (ta.offsetHeight > 0) {
+                panel = ta.closest('.ZPTMcc') || ta.closest('.YW656b');
+                if (panel) break;
+            }
+        }
+    }
+    const html = panel
+        ? '<!DOCTYPE html><html><head><title>' + esc(document.title) + '</title><base href="' + esc(location.href)
+          + '"></head><body>' + panel.outerHTML + '</body></html>'
+        : '<!DOCTYPE html>' + document.documentElement.outerHTML;
+    const all = document.querySelectorAll('textarea');
+    const textareas = Array.from(all).slice(0, 5).map((ta) => ({
+        ariaLabel: ta.getAttribute('aria-label'),
+        placeholder: ta.getAttribute('placeholder'),
+        value: ta.value || '',
+    }));
+    return { html: html, url: location.href, subtree: !!panel, textareaCount: all.length, textareas: textareas };
+}"""
 
 
 class BrowserController:
     """Minimal Playwright wrapper for Google Photos with old device spoofing."""
     
-    def __init__(self):
+    def __init__(self, base_url=None, user_data_dir=None, channel='chrome',
+                 record_har_path=None, replay_har_path=None, har_fast_forward=False,
+                 dump_full_page=False, photo_index=None, work_queue=None, rpc_metadata=False,
+                 cdp_port=None):
+        """base_url/user_data_dir/channel default to real Google Photos, the
+        ~/.googlephotos_profile profile and installed Chrome; point base_url at
+        fake_photos_server.py (and channel=None for bundled Chromium) to run offline.
+        
+        record_har_path saves the session's traffic as a HAR on stop.
+        replay_har_path serves the page from such a HAR with no network, with
+        the recorded delays unless har_fast_forward (see har_replay.py).
+        
+        DMP dumps only the info panel unless dump_full_page.
+        
+        photo_index (a photo_index.PhotoIndex) enables goto_photo, advance and
+        goto_first_untagged, and records each visited photo's description.
+        With work_queue (a work_queue.WorkQueue over it) next/prev walk that
+        queue by direct jumps instead of arrow keys.
+        
+        rpc_metadata reads descriptions from the page's batchexecute
+        responses (rpc_metadata.py): arrow navigation finishes once the info
+        panel shows the new photo instead of after a fixed wait, and a
+        description from a response to that navigation saves reading the page.
+        
+        cdp_port keeps Chrome running between restarts: it is started
+        detached with that remote-debugging port and attached to over CDP
+        (chrome_cdp.py); stop() only disconnects."""
+        import pathlib
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.user_data_dir = user_data_dir or str(pathlib.Path.home() / '.googlephotos_profile')
+        self.channel = channel
+        self.record_har_path = record_har_path
+        self.replay_har_path = replay_har_path
+        self.har_fast_forward = har_fast_forward
         self.playwright = None
         self.context = None
         self.page = None
@@ -23,74 +153,135 @@ class BrowserController:
         self._launch_mode = 'default'
         self._last_url = None
         self._last_description = None
+        self._nav_started = time.perf_counter()  # RPC metadata older than this is not trusted
+        self._direct_appends = False  # set while one worker command visits several photos (macro replay)
+        self.tracer = None  # Optional LatencyTracer shared with the UI
+        self._macro_cancel = threading.Event()
+        self.dump_full_page = dump_full_page
+        self.dump_writer = DumpWriter()
+        self.session_id = new_session_id()  # ties SUM analysis records to this run
+        self.selector_health = SelectorHealth()
+        self.photo_index = photo_index
+        self.work_queue = work_queue
+        self.rpc = RpcMetadataListener() if rpc_metadata else None
+        self.cdp_port = cdp_port
+        self.browser = None  # set when attached over CDP
+        self.startup_timer = None  # Optional startup_timing.StartupTimer for the launch phases
+        self._start_error = None
 
     def start(self, headful=True, timeout=30):
-        """Start browser worker thread."""
-        if sync_playwright is None:
+        """Start the browser worker (unless start_async already did) and wait until the page is usable."""
+        if not self.start_async(headful):
+            return
+        ready = self._ready_event.wait(timeout=timeout)
+        if self._start_error is not None:
+            raise RuntimeError(f'Browser failed to start: {self._start_error}')
+        if not ready:
+            raise RuntimeError('Browser worker did not become ready in time')
+
+    def start_async(self, headful=True):
+        """Launch the browser worker and return at once; start() waits for it.
+        
+        Returns False if the profile is locked by another browser (logged).
+        """
+        if self._worker and self._worker.is_alive():
+            return True
+        if sync_playwright is None and importlib.util.find_spec('playwright') is None:
             raise RuntimeError('playwright not installed; run pip install -r requirements.txt')
         
         # Check if browser is already running
         import os
-        import pathlib
-        user_data_dir = str(pathlib.Path.home() / '.googlephotos_profile')
-        lock_file = os.path.join(user_data_dir, 'SingletonLock')
+        lock_file = os.path.join(self.user_data_dir, 'SingletonLock')
+      
+        if self.cdp_port:
+            from chrome_cdp import is_our_chrome
+            if is_our_chrome(self.cdp_port, self.user_data_dir):
+                lock_file = None  # our own Chrome from an earlier start: attach to it
       
-        if os.path.exists(lock_file):
-            print(f'\n[ERROR] Browser appears to be already running!')
-            print(f'[ERROR] Lock file exists: {lock_file}')
-            print(f'[ERROR] Please close any existing browser windows first.')
-            print(f'[ERROR] If no browser is visible, remove the lock file manually.\n')
+        if lock_file and os.path.exists(lock_file):
+            log.error('[ERROR] Browser appears to be already running!')
+            log.error(f'[ERROR] Lock file exists: {lock_file}')
+            log.error('[ERROR] Please close any existing browser windows first.')
+            log.error('[ERROR] If no browser is visible, remove the lock file manually.')
             #raise RuntimeError(f'Browser already running (lock file: {lock_file})')
-            return  # Just return instead of raising exception
-
-
-        if self._worker and self._worker.is_alive():
-            return
+            return False  # Just return instead of raising exception
 
         self._running = True
+        self._start_error = None
         self._ready_event.clear()
         self._worker = threading.Thread(target=self._worker_main, args=(headful,), daemon=True)
         self._worker.start()
-        ready = self._ready_event.wait(timeout=timeout)
-        if not ready:
-            raise RuntimeError('Browser worker did not become ready in time')
+        return True
+
+    def _phase(self, name):
+        """Time a startup phase when a StartupTimer is attached."""
+        return self.startup_timer.phase(name) if self.startup_timer else contextlib.nullcontext()
 
     def stop(self):
         """Stop browser worker."""
-        self._cmd_queue.put(('stop', None))
+        self._cmd_queue.put(('stop', None, None))
         self._running = False
         if self._worker:
             self._worker.join(timeout=5)
 
     def _worker_main(self, headful):
         """Main worker thread - runs Playwright with old device spoofing."""
-        import pathlib
         try:
-            self.playwright = sync_playwright().start()
-            user_data_dir = str(pathlib.Path.home() / '.googlephotos_profile')
+            with self._phase('playwright'):
+                self.playwright = _sync_playwright()().start()
             
             # Default to iOS 12 iPad (most compatible with Google Photos)
             user_agent = 'Mozilla/5.0 (iPad; CPU OS 12_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/12.0 Mobile/15E148 Safari/604.1'
-            print('[BROWSER] Mode: iOS 12 iPad')
-            print(f'[BROWSER] Using user agent: {user_agent}')
+            log.info('[BROWSER] Mode: iOS 12 iPad')
+            log.debug('[BROWSER] Using user agent: %s', user_agent)
             
-            self.context = self.playwright.chromium.launch_persistent_context(
-                user_data_dir=user_data_dir,
-                headless=not headful,
-                channel='chrome',
-                #user_agent=user_agent,
-                #viewport={'width': 1024, 'height': 768},
-                #device_scale_factor=1,
-                #is_mobile=True,
-                #has_touch=True,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    # '--user-agent=' + user_agent,
-                    # '--disable-web-security',
-                ],
-            )
+            har_options = {}
+            if self.record_har_path:
+                har_options = {'record_har_path': self.record_har_path, 'record_har_mode': 'full'}
+                log.info(f'[BROWSER] Recording network traffic to {self.record_har_path}')
+            if self.record_har_path or self.replay_har_path:
+                # Service worker fetches bypass both HAR recording and routing
+                har_options['service_workers'] = 'block'
             
-            self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+            reused = False
+            with self._phase('browser_launch'):
+                if self.cdp_port:
+                    from chrome_cdp import open_over_cdp
+                    if self.record_har_path:
+                        log.warning('[BROWSER] --record-har needs a fresh context; not recording over CDP')
+                    self.browser, self.context, self.page, reused = open_over_cdp(
+                        self.playwright, self.cdp_port, self.user_data_dir, self.base_url,
+                        channel=self.channel, headless=not headful)
+                else:
+                    self.context = self.playwright.chromium.launch_persistent_context(
+                        **har_options,
+                        user_data_dir=self.user_data_dir,
+                        headless=not headful,
+                        channel=self.channel,
+                        #user_agent=user_agent,
+                        #viewport={'width': 1024, 'height': 768},
+                        #device_scale_factor=1,
+                        #is_mobile=True,
+                        #has_touch=True,
+                        args=[
+                            '--disable-blink-features=AutomationControlled',
+                            # '--user-agent=' + user_agent,
+                            # '--disable-web-security',
+                        ],
+                    )
+                
+                    self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+            
+            if self.rpc:
+                self.rpc.attach(self.page)
+            
+            if self.replay_har_path:
+                if self.har_fast_forward:
+                    self.context.route_from_har(self.replay_har_path, not_found='abort')
+                    log.info(f'[BROWSER] Replaying {self.replay_har_path} without network delays')
+                else:
+                    from har_replay import install_timed_replay
+                    install_timed_replay(self.context, self.page, self.replay_har_path)
             
             # Additional spoofing via CDP
             try:
@@ -103,33 +294,48 @@ class BrowserController:
                     });
                 }""")
             except Exception as e:
-                print(f'[BROWSER] Warning: Could not override navigator properties: {e}')
-            
-            self.page.goto('https://photos.google.com')
+                log.warning(f'[BROWSER] Warning: Could not override navigator properties: {e}')
             
-            print('[BROWSER] Started, navigated to Google Photos')
+            if reused and self.page.url.startswith(self.base_url):
+                # Adopted tab: stay on whatever photo it shows
+                self._last_url = self.page.url
+                log.info(f'[BROWSER] Started, adopted tab at {self.page.url}')
+            else:
+                # Usable once the document is parsed; images and scripts keep loading
+                with self._phase('first_page'):
+                    self.page.goto(self.base_url, wait_until='domcontentloaded')
+                log.info(f'[BROWSER] Started, navigated to {self.base_url}')
             self._ready_event.set()
 
             # Command loop
             while self._running:
                 try:
-                    cmd, arg = self._cmd_queue.get(timeout=0.5)
+                    cmd, arg, trace_id = self._cmd_queue.get(timeout=0.5)
                 except Exception:
                     continue
 
                 if cmd == 'stop':
                     break
-                elif cmd == 'next':
+                if trace_id is not None:
+                    self.tracer.mark(trace_id, 'dequeued')
+
+                if cmd == 'next':
                     self._do_next()
                 elif cmd == 'prev':
                     self._do_prev()
+                elif cmd == 'goto':
+                    self._do_goto(arg)
+                elif cmd == 'advance':
+                    self._do_advance(arg)
+                elif cmd == 'goto_untagged':
+                    self._do_goto_first_untagged()
                 elif cmd == 'append_x':
                     pass
                 elif cmd == 'append_text':
                     try:
                         self._do_append_text(arg)
                     except Exception as e:
-                        print(f'[APPEND_TEXT] ERROR: {e}')
+                        log.error(f'[APPEND_TEXT] ERROR: {e}')
                 elif cmd == 'read_desc':
                     ev, res = arg
                     desc = self._sample_description()
@@ -145,10 +351,32 @@ class BrowserController:
                     self._do_delete_all()
                 elif cmd == 'keystroke':
                     self.page.keyboard.press(arg)
+                elif cmd == 'macro':
+                    self._do_macro(*arg)
+                elif cmd == 'call':
+                    fn, args, kwargs, ev, res = arg
+                    try:
+                        res['value'] = fn(self, *args, **kwargs)
+                    except Exception as e:
+                        res['error'] = e
+                    ev.set()
+
+                if trace_id is not None:
+                    self.tracer.mark(trace_id, 'executed')
+                    ok = self._wait_for_commit(cmd, arg)
+                    self.tracer.mark(trace_id, 'committed')
+                    self.tracer.complete(trace_id, ok=ok)
 
+        except Exception as e:
+            if not self._ready_event.is_set():
+                self._start_error = e  # start() re-raises it instead of waiting out its timeout
+            raise
         finally:
+            self._running = False
+            self._ready_event.set()
             try:
-                if self.context:
+                # Over CDP the browser is shared with later starts: only disconnect
+                if self.context and not self.browser:
                     self.context.close()
             except Exception:
                 pass
@@ -157,40 +385,34 @@ class BrowserController:
                     self.playwright.stop()
             except Exception:
                 pass
-            print('[BROWSER] Stopped')
+            self.dump_writer.close()
+            self.selector_health.log_summary()
+            if self.rpc:
+                self.rpc.log_summary()
+            log.info('[BROWSER] Stopped')
 
     def _do_dump_html(self):
-        """Dump current page HTML for debugging."""
+        """Grab the info panel (or whole page) HTML; the dump writer stores it in the background."""
         try:
-            html = self.page.content()
-            filename = f'gphotos_dump_{int(time.time())}.html'
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(html)
-            print(f'[DUMP] Saved HTML to {filename}')
+            t0 = time.perf_counter()
+            result = self.page.evaluate(_DUMP_JS, self.dump_full_page)
+            scope = 'info panel' if result['subtree'] else 'full page'
+            log.info(f"[DUMP] Captured {scope} ({len(result['html']) / 1024:.0f} KB) in "
+                     f"{(time.perf_counter() - t0) * 1000:.0f} ms, storing in background")
+            self.dump_writer.submit(result['html'], url=result['url'], source=f'DMP {scope}')
             
-            print('[DUMP] Checking for textareas...')
-            textareas = self.page.query_selector_all('textarea')
-            print(f'[DUMP] Found {len(textareas)} textareas')
-            
-            for i, ta in enumerate(textareas[:5]):
-                try:
-                    aria_label = ta.get_attribute('aria-label')
-                    placeholder = ta.get_attribute('placeholder')
-                    value = ta.input_value()
-                    print(f'[DUMP]   Textarea {i}: aria-label="{aria_label}", placeholder="{placeholder}", value="{value[:50]}"')
-                except Exception as e:
-                    print(f'[DUMP]   Textarea {i}: Error reading - {e}')
+            log.info(f"[DUMP] Found {result['textareaCount']} textareas")
+            for i, ta in enumerate(result['textareas']):
+                log.info(f'[DUMP]   Textarea {i}: aria-label="{ta["ariaLabel"]}", placeholder="{ta["placeholder"]}", value="{ta["value"][:50]}"')
                     
         except Exception as e:
-            print(f'[DUMP] ERROR: {e}')
-            import traceback
-            traceback.print_exc()
+            log.exception(f'[DUMP] ERROR: {e}')
 
 
     def _position_cursor_at_end(self):
         """Position cursor at END of description textarea WITHOUT scrolling."""
         try:
-            print('[CURSOR] Positioning cursor at END...')
+            log.debug('[CURSOR] Positioning cursor at END...')
 
             # Use pure JavaScript to find and position cursor - NO clicking, NO key pressing
             result = self.page.evaluate("""() => {
@@ -236,12 +458,12 @@ class BrowserController:
         }""")
 
             if result:
-                print(f'[CURSOR] Positioned cursor at END (text length: {result.get("textLength", 0)})')
+                log.debug('[CURSOR] Positioned cursor at END (text length: %s)', result.get("textLength", 0))
             else:
-                print('[CURSOR] No visible textarea found')
+                log.debug('[CURSOR] No visible textarea found')
 
         except Exception as e:
-            print(f'[CURSOR] ERROR: {e}')
+            log.error(f'[CURSOR] ERROR: {e}')
     
     def _do_dump_analysis(self):
         """Run dump-explorer style analysis on current page."""
@@ -421,6 +643,8 @@ class BrowserController:
             
             if result.get('error'):
                 print(f'[ANALYSIS] ERROR: {result["error"]}')
+                path = append_record(build_record(result, self.page.url, self.session_id, []))
+                print(f'[ANALYSIS] Error record saved to {path}')
                 return
             
             # Print results
@@ -453,20 +677,15 @@ class BrowserController:
             # Determine which textarea would be selected
             if textareas:
                 print('[ANALYSIS] --- TEXTAREA SELECTION ANALYSIS ---')
-                candidates = [ta for ta in textareas if ta['offsetHeight'] > 0 and ta['offsetWidth'] > 0]
-                if candidates:
-                    candidates.sort(key=lambda x: (
-                        not x['hasContent'],
-                        x['distance'],
-                        -x['zIndex']
-                    ))
-                    selected = candidates[0]
+                selected_index, visible_indices = select_textarea(textareas)
+                if selected_index is not None:
+                    selected = next(ta for ta in textareas if ta['index'] == selected_index)
                     print(f'[ANALYSIS] Current logic would select: Textarea {selected["index"]}')
                     print(f'[ANALYSIS]   Reason: hasContent={selected["hasContent"]}, distance={selected["distance"]}px, zIndex={selected["zIndex"]}')
                 else:
                     print('[ANALYSIS] Current logic would find NO visible textarea')
                 
-                visible_only = [ta for ta in textareas if not ta['hidden'] and ta['offsetHeight'] > 0]
+                visible_only = [ta for ta in textareas if ta['index'] in visible_indices]
                 if visible_only:
                     print(f'\n[ANALYSIS] Simple visibility filter would find: {len(visible_only)} textarea(s)')
                     for ta in visible_only:
@@ -542,9 +761,9 @@ class BrowserController:
                 if not album['hidden'] and album['offsetHeight'] > 0:
                     visible_names.append(('album', album['text']))
             
+            names_would_add = []
             if visible_names:
                 desc_normalized = ' '.join(current_description.split()).lower()
-                names_would_add = []
                 
                 for source_type, name in visible_names:
                     print(f'\n[ANALYSIS] Processing {source_type}: "{name}"')
@@ -600,6 +819,9 @@ class BrowserController:
                 print('[ANALYSIS] No visible names found to process')
             
             print('\n' + '='*60)
+            record = build_record(result, self.page.url, self.session_id, names_would_add)
+            path = append_record(record)
+            print(f'[ANALYSIS] Record for photo {record["photo_id"]} saved to {path} (query with analysis_store.py)')
             print('[ANALYSIS] Analysis complete')
             print('='*60 + '\n')
             
@@ -611,7 +833,7 @@ class BrowserController:
     def _scroll_right_panel_to_top(self):
         """Scroll the right information panel to the top to ensure description is visible."""
         try:
-            print('[SCROLL] Ensuring right panel is scrolled to top...')
+            log.debug('[SCROLL] Ensuring right panel is scrolled to top...')
             js_scroll = """() => {
         // Focus the description textarea first
         const textarea = document.querySelector('textarea.tL9Q4c');
@@ -626,11 +848,11 @@ class BrowserController:
     }"""
             result = self.page.evaluate(js_scroll)
             if result.get('success'):
-                print(f'[SCROLL] Scrolled right panel to top (found: {result["selector"]})')
+                log.debug('[SCROLL] Scrolled right panel to top (found: %s)', result["selector"])
             else:
-                print('[SCROLL] Warning: Could not find scrollable right panel')
+                log.warning('[SCROLL] Warning: Could not find scrollable right panel')
         except Exception as e:
-            print(f'[SCROLL] Error: {e}')
+            log.debug('[SCROLL] Error: %s', e)
             # Don't fail the operation, log and continue
 
 
@@ -639,9 +861,14 @@ class BrowserController:
         
         Args:
             avoid_scroll: If True, skip clicking/positioning to avoid scrolling the right panel
+        
+        Names are normally queued as append_text commands behind the current
+        one. While _direct_appends is set they are typed at once instead:
+        a queued append would only run after the whole command, on whatever
+        photo it ends on.
         """
         try:
-            print('[NAMES] Extracting names from webpage...')
+            log.debug('[NAMES] Extracting names from webpage...')
 
             # Load names and special cases from names.json
             import json
@@ -651,7 +878,7 @@ class BrowserController:
                 names_list = data.get('names', [])
                 special_cases = data.get('special_cases', {})
 
-            print(f'[NAMES] Loaded special cases: {special_cases}')
+            log.debug('[NAMES] Loaded special cases: %s', special_cases)
 
             # Extract clean names (without parentheses) for logging
             clean_names = []
@@ -660,7 +887,7 @@ class BrowserController:
                 if clean and clean != '4':
                     clean_names.append(clean)
 
-            print(f'[NAMES] Searching for names: {clean_names}')
+            log.debug('[NAMES] Searching for names: %s', clean_names)
 
             # JS logic to extract all candidates with visibility check
             # CRITICAL CHANGE: Search entire document, not just sidebar
@@ -683,6 +910,8 @@ class BrowserController:
                 return false;
             }
 
+            const sidebarTier = document.querySelector('.ZPTMcc') ? 0 : document.querySelector('.YW656b') ? 1 : null;
+
             // 1. Search for face/people tags (span.Y8X4Pc)
             const allSpanNames = document.querySelectorAll('span.Y8X4Pc');
             for (const span of allSpanNames) {
@@ -693,8 +922,10 @@ class BrowserController:
 
             // 2. Search for album names that might be people (div.DgVY7 > div.AJM7gb)
             const allAlbumDivs = document.querySelectorAll('div.DgVY7');
+            let albumNames = 0;
             for (const albumDiv of allAlbumDivs) {
                 const nameDiv = albumDiv.querySelector('div.AJM7gb');
+                if (nameDiv) albumNames++;
                 if (nameDiv && nameDiv.textContent && !isElementVisuallyHidden(nameDiv) && nameDiv.offsetHeight > 0) {
                     const text = nameDiv.textContent.trim();
                     // Filter out year-prefixed albums (they're not people names)
@@ -704,112 +935,134 @@ class BrowserController:
                 }
             }
 
-            return foundNames.length > 0 ? foundNames : null;
+            return {
+                names: foundNames.length > 0 ? foundNames : null,
+                sidebarTier: sidebarTier,
+                faces: allSpanNames.length,
+                albums: albumNames
+            };
         }"""
 
-            found_names = self.page.evaluate(js_find_names)
+            result = self.page.evaluate(js_find_names)
+            health = self.selector_health
+            health.record('sidebar_root', result['sidebarTier'])
+            health.record('face_chips', 0 if result['faces'] else None, [result['faces']])
+            health.record('album_chips', 0 if result['albums'] else None, [result['albums']])
+            found_names = result['names']
 
             if not found_names:
-                print('[NAMES] No name sections found on webpage')
+                log.debug('[NAMES] No name sections found on webpage')
+                self._note_photo(faces=result['faces'], people=[])
                 return
 
-            print(f'[NAMES] Found names in webpage: {found_names}')
+            log.debug('[NAMES] Found names in webpage: %s', found_names)
 
             # Retrieve the current description
-            current_desc = self._sample_description() 
-            if not current_desc:
-                current_desc = ''
+            sampled = self._sample_description()
+            current_desc = sampled or ''
+            added = []
 
             # Normalize description early for comparison
             desc_normalized = ' '.join(current_desc.split()).lower()
 
-            print(f'[NAMES] Current description: {repr(current_desc)[:80]}')
+            log.debug('[NAMES] Current description: %.80r', current_desc)
 
             if not avoid_scroll:
-                print('[NAMES] Positioning cursor at END before adding names')
+                log.debug('[NAMES] Positioning cursor at END before adding names')
                 self._position_cursor_at_end()
             else:
-                print('[NAMES] Skipping cursor positioning to avoid scroll')
+                log.debug('[NAMES] Skipping cursor positioning to avoid scroll')
                 
+            people = []
             for found_name in found_names:
-                print(f'[NAMES] Processing: {repr(found_name)}')
+                log.debug('[NAMES] Processing: %r', found_name)
                 
                 # Normalize spaces
                 name_to_check = ' '.join(found_name.split())
                 
                 # 1. Year/Digit Prefix Check
                 if name_to_check and name_to_check[0:4].isdigit():
-                    print(f'[NAMES] Skipping year-prefixed text: "{name_to_check}"')
+                    log.debug('[NAMES] Skipping year-prefixed text: "%s"', name_to_check)
                     continue
 
                 if name_to_check and name_to_check.startswith("0"):
-                    print(f'[NAMES] Skipping name starting with 0: "{name_to_check}"')
+                    log.debug('[NAMES] Skipping name starting with 0: "%s"', name_to_check)
                     continue
                 
                 # 2. Special Case Mapping
                 if name_to_check in special_cases:
                     mapped_name = special_cases[name_to_check]
-                    print(f'[NAMES] Special case: "{name_to_check}" -> "{mapped_name}"')
+                    log.debug('[NAMES] Special case: "%s" -> "%s"', name_to_check, mapped_name)
                     found_name = mapped_name
                 else:
                     found_name = name_to_check # Use the cleaned version
+                people.append(found_name)
                     
                 # 3. Duplication Check
                 # Use the mapped name (or cleaned original) for duplication check
                 if found_name.lower() in desc_normalized: 
-                    print(f'[NAMES] "{found_name}" already in description, skipping')
+                    log.debug('[NAMES] "%s" already in description, skipping', found_name)
                     continue
                 
                 # 4. Append to description
                 if not avoid_scroll:
                     self._position_cursor_at_end()
                     
-                print(f'[NAMES] Adding " {found_name}" to description')
-                self.append_text(' ' + found_name + ' ')
+                log.debug('[NAMES] Adding " %s" to description', found_name)
+                if self._direct_appends:
+                    self._do_append_text(' ' + found_name + ' ')
+                else:
+                    self.append_text(' ' + found_name + ' ')
+                added.append(found_name)
                 
                 # Update normalized description for subsequent duplication checks in this loop
                 current_desc += ' ' + found_name + ' '
                 desc_normalized = ' '.join(current_desc.split()).lower()
                 
             if not avoid_scroll:
-                print('[NAMES] Positioning cursor at END after adding all names')
+                log.debug('[NAMES] Positioning cursor at END after adding all names')
                 self._position_cursor_at_end()
             
+            # Queued appends run after this command, so note the description the
+            # appends leave (the sampled text plus the added names), not the one
+            # on screen now; when sampling failed there is nothing to note
+            fields = {'faces': result['faces'], 'people': people}
+            if sampled is not None:
+                fields['description'] = ' '.join((sampled + ' ' + ' '.join(added)).split())
+            self._note_photo(**fields)
+            
         except FileNotFoundError as e:
-            print(f'[NAMES] ERROR: Could not find or load names.json. Check working directory. ({e})')
+            log.error(f'[NAMES] ERROR: Could not find or load names.json. Check working directory. ({e})')
         except Exception as e:
-            print(f'[NAMES] ERROR: {e}')
+            log.error(f'[NAMES] ERROR: {e}')
     def _navigate_photo(self, direction):
         """Common navigation logic for next/prev photo.
         
         Click image center to focus it, then send arrow key.
         
-        NOTE: Alternative approach if dynamic image finding breaks in future:
-        Instead of searching for image elements, could use fixed viewport:
-          - Set viewport={'width': 1024, 'height': 768} in browser launch
-          - Always click at viewport center (512, 384) to focus image
-          - This guarantees focus but loses responsive behavior
-        Currently using dynamic image detection which is more flexible.
+        The image is found by dynamic selector tiers. While selector_health
+        reports the viewer_image probe degraded, a fallback-tier match or no
+        match clicks the viewport centre instead, which still focuses the
+        image without relying on the selectors. Otherwise no match only warns:
+        a blind click on a page that is not the viewer could open something.
         """
         arrow_key = 'ArrowRight' if direction == 'next' else 'ArrowLeft'
         label = direction.upper()
         
         try:
-            print(f'[{label}] Step 1: Starting navigation...')
+            log.debug('[%s] Step 1: Starting navigation...', label)
             
             # Find and click the main viewer image
-            result = self.page.evaluate("""() => {
-                // Look for the main image in the viewer - be more specific
-                // Try multiple selectors in order of likelihood
-                const selectors = [
-                    'img[alt="View photo"]',
-                    'img[alt*="View"]',
-                    'img[role="button"]',
-                    'img[jsname]'
-                ];
-                
-                for (let selector of selectors) {
-                    const imgs = document.querySelectorAll(selector);
+            # Look for the main image in the viewer, selectors in order of
+            # likelihood (PROBES['viewer_image']); every tier's candidate
+            # count is reported so selector drift shows up in the hit rates
+            result = self.page.evaluate("""(selectors) => {
+                const counts = [];
+                let match = null;
+                for (let tier = 0; tier < selectors.length; tier++) {
+                    const imgs = document.querySelectorAll(selectors[tier]);
+                    counts.push(imgs.length);
+                    if (match) continue;
                     for (let img of imgs) {
                         const rect = img.getBoundingClientRect();
                         const style = window.getComputedStyle(img);
@@ -817,79 +1070,334 @@ class BrowserController:
                         // Must be visible and reasonably sized
                         if (rect.width > 100 && rect.height > 100 && style.display !== 'none' && style.visibility !== 'hidden') {
                             // Click the center
-                            return {
+                            match = {
                                 x: rect.left + rect.width / 2,
                                 y: rect.top + rect.height / 2,
                                 width: rect.width,
                                 height: rect.height,
-                                selector: selector,
+                                selector: selectors[tier],
+                                tier: tier,
                                 found: true
                             };
+                            break;
                         }
                     }
                 }
-                return { found: false };
-            }""")
+                const centre = { x: window.innerWidth / 2, y: window.innerHeight / 2 };
+                return Object.assign(match || { found: false, tier: null }, { counts: counts, centre: centre });
+            }""", list(PROBES['viewer_image'][0]))
+            self.selector_health.record('viewer_image', result.get('tier'), result.get('counts'))
             
-            print(f'[{label}] Step 2: Image location found')
+            log.debug('[%s] Step 2: Image location found', label)
             
-            if result and result.get('found'):
+            # Trust a fallback-tier match only while the primary selector is healthy:
+            # once it is degraded the fallbacks are guesses at the wrong image,
+            # so (as with no match at all) click the viewport centre
+            degraded = self.selector_health.degraded('viewer_image')
+            if result.get('found') and (result['tier'] == 0 or not degraded):
                 x = result['x']
                 y = result['y']
                 width = result.get('width', 0)
                 height = result.get('height', 0)
                 selector = result.get('selector', 'unknown')
-                print(f'[{label}] Step 3a: Found via "{selector}", size {int(width)}x{int(height)}, clicking center at ({int(x)}, {int(y)})')
+                log.debug('[%s] Step 3a: Found via "%s", size %dx%d, clicking center at (%d, %d)', label, selector, width, height, x, y)
+                self.page.mouse.click(x, y)
+                log.debug('[%s] Step 3b: Click completed', label)
+                self.page.wait_for_timeout(100)
+                log.debug('[%s] Step 3c: Wait after click completed', label)
+            elif degraded:
+                x, y = result['centre']['x'], result['centre']['y']
+                log.debug('[%s] Step 3: No trusted image match (tier %s), clicking viewport centre (%d, %d)', label, result.get("tier"), x, y)
                 self.page.mouse.click(x, y)
-                print(f'[{label}] Step 3b: Click completed')
                 self.page.wait_for_timeout(100)
-                print(f'[{label}] Step 3c: Wait after click completed')
             else:
-                print(f'[{label}] Step 3: WARNING: Could not find image to click')
+                log.warning(f'[{label}] Step 3: WARNING: Could not find image to click')
             
             # Now send arrow key
-            print(f'[{label}] Step 4a: About to send {arrow_key}')
+            log.debug('[%s] Step 4a: About to send %s', label, arrow_key)
+            previous_url = self.page.url
+            if self.rpc:
+                self.page.evaluate(_MARK_PANEL_JS, None)
+            self._nav_started = time.perf_counter()
             self.page.keyboard.press(arrow_key)
-            print(f'[{label}] Step 4b: Arrow key sent')
-            self.page.wait_for_timeout(500)
-            print(f'[{label}] Step 4c: Wait after arrow key completed')
+            log.debug('[%s] Step 4b: Arrow key sent', label)
+            if self.rpc:
+                found = self._wait_for_new_photo(previous_url)
+                log.debug('[%s] Step 4c: %s', label, "Info panel shows the new photo" if found else "Panel unchanged, wait timed out")
+            else:
+                self.page.wait_for_timeout(500)
+                log.debug('[%s] Step 4c: Wait after arrow key completed', label)
             
-            try:
-                self._last_url = self.page.url
-                print(f'[{label}] Step 5: URL updated')
-            except Exception:
-                pass
+            self._settle_on_photo(label)
             
-            # Just read description, don't interact with textarea (no clicking, no pressing keys)
-            print(f'[{label}] Step 6a: About to sample description...')
+        except Exception as e:
+            log.error(f'[{label}] ERROR: {e}')
+
+    def _settle_on_photo(self, label, add_names=True):
+        """Steps 5-8 once a new photo is showing, however we got there.
+
+        add_names=False skips step 7, for photos only passed through.
+        """
+        try:
+            self._last_url = self.page.url
+            log.debug('[%s] Step 5: URL updated', label)
+        except Exception:
+            pass
+        
+        # Just read description, don't interact with textarea (no clicking, no pressing keys)
+        # Only metadata from a response to this navigation: an older one may
+        # predate an edit made here, and the page need not fetch it again
+        meta = self.rpc.get(photo_id_from_url(self._last_url or ''), since=self._nav_started) if self.rpc else None
+        if meta and meta.get('description') is not None:
+            desc = meta['description'].strip()
+            log.debug('[%s] Step 6b: Description taken from RPC metadata', label)
+        else:
+            log.debug('[%s] Step 6a: About to sample description...', label)
             desc = self._sample_description()
-            print(f'[{label}] Step 6b: Description sampled')
-            self._last_description = desc
-            print(f'[{label}] Step 6c: New description: {repr(desc)[:100]}')
-            
-            print(f'[{label}] Step 7a: About to extract and add names...')
+            log.debug('[%s] Step 6b: Description sampled', label)
+        self._last_description = desc
+        log.debug('[%s] Step 6c: New description: %.100r', label, desc)
+        if desc is not None:
+            self._note_photo(description=desc)
+        
+        if add_names:
+            log.debug('[%s] Step 7a: About to extract and add names...', label)
             self._extract_and_add_names()
-            print(f'[{label}] Step 7b: Extract and add names completed')
-            
-            print(f'[{label}] Step 8: Focusing textarea for keystroke input...')
+            log.debug('[%s] Step 7b: Extract and add names completed', label)
+        
+        log.debug('[%s] Step 8: Focusing textarea for keystroke input...', label)
+        self._position_cursor_at_end()
+        log.debug('[%s] Step 8b: Textarea focused and cursor positioned at end', label)
+
+    def _wait_for_new_photo(self, previous_url, timeout=1000):
+        """After an arrow key: wait until the URL moved on and the info panel shows that photo.
+        
+        The URL, and the RPC metadata (at once when already cached), can be
+        ahead of the panel that _settle_on_photo reads names from, so the
+        wait ends on the DOM: the visible textarea is no longer the one
+        _MARK_PANEL_JS tagged, or shows the new photo's RPC description.
+        Returns False after timeout ms (e.g. at the last photo).
+        """
+        deadline = time.perf_counter() + timeout / 1000.0
+        while time.perf_counter() < deadline:
+            url = self.page.url
+            if url != previous_url:
+                meta = self.rpc.get(photo_id_from_url(url) or '')
+                expected = meta['description'].strip() if meta and meta.get('description') is not None else None
+                if self.page.evaluate(_NEW_PANEL_JS, expected):
+                    return True
+            self.page.wait_for_timeout(25)  # lets Playwright deliver response events
+        return False
+
+    def _note_photo(self, **fields):
+        """Record what was seen on the current photo in photo_index, if it is indexed."""
+        photo_id = photo_id_from_url(self._last_url or '')
+        if self.photo_index is not None and photo_id in self.photo_index:
+            self.photo_index.note(photo_id, **fields)
+
+    def _photo_url(self, ref):
+        """URL for a photo id, a full URL or a 1-based position (int) in photo_index."""
+        if isinstance(ref, int):
+            entry = self.photo_index.get(ref) if self.photo_index is not None else None
+            if entry is None:
+                raise ValueError(f'no photo {ref} in the index')
+            return entry['url']
+        if ref.startswith('http://') or ref.startswith('https://'):
+            return ref
+        if self.photo_index is not None and ref in self.photo_index:
+            return self.photo_index.get(self.photo_index.position(ref))['url']
+        return f'{self.base_url}/photo/{ref}'
+
+    def _load_photo(self, url, label='GOTO', add_names=True):
+        """Jump straight to a photo with one page.goto, then settle like arrow navigation.
+        
+        Instead of the arrow path's fixed wait, the load is done once the
+        description textarea is visible. Returns the sampled description.
+        """
+        started = self._nav_started = time.perf_counter()
+        log.debug('[%s] Step 4a: Loading %s', label, url)
+        self.page.goto(url, wait_until='domcontentloaded')
+        try:
+            self.page.wait_for_function(_VISIBLE_DESCRIPTION_JS_BODY + "return v !== null; }", arg=None, timeout=15000)
+            log.debug('[%s] Step 4b: Description textarea visible', label)
+        except Exception:
+            log.warning(f'[{label}] No description field after loading {url}')
+        self._settle_on_photo(label, add_names=add_names)
+        log.info(f'[{label}] {url} in {(time.perf_counter() - started) * 1000:.0f} ms')
+        return self._last_description
+
+    def _current_position(self):
+        """1-based photo_index position of the photo on screen, or None."""
+        if self.photo_index is None:
+            return None
+        return self.photo_index.position(photo_id_from_url(self.page.url) or '')
+
+    def _do_goto(self, ref):
+        """Open a photo by id, URL or index position."""
+        try:
+            self._load_photo(self._photo_url(ref))
+        except Exception as e:
+            log.error(f'[GOTO] ERROR: {e}')
+
+    def _do_advance(self, n):
+        """Move n photos forward (negative: back) in photo_index order in one navigation."""
+        try:
+            if self.photo_index is None:
+                raise RuntimeError('no photo index loaded (inject.py --index NAME)')
+            current = self._current_position()
+            if current is None:
+                raise RuntimeError(f'current photo is not in index {self.photo_index.name}')
+            target = max(1, min(len(self.photo_index), current + n))
+            if target == current:
+                log.info(f'[ADVANCE] Already at photo {current} of {len(self.photo_index)}')
+                return
+            log.info(f'[ADVANCE] Photo {current} -> {target} of {len(self.photo_index)}')
+            self._load_photo(self.photo_index.get(target)['url'], label='ADVANCE')
+        except Exception as e:
+            log.error(f'[ADVANCE] ERROR: {e}')
+
+    def _do_goto_first_untagged(self, max_loads=20):
+        """Open the first index photo not known to have a description.
+        
+        The index state comes from earlier visits, so this is normally one
+        navigation; a photo tagged since it was last seen is noted on arrival
+        and the search moves on. Names are only added on the photo the search
+        stops at: appends queued on the photos passed through would all land
+        on that last one.
+        """
+        try:
+            if self.photo_index is None:
+                raise RuntimeError('no photo index loaded (inject.py --index NAME)')
+            pos = self.photo_index.first_untagged()
+            for _ in range(max_loads):
+                if pos is None:
+                    log.info(f'[UNTAGGED] Every photo in {self.photo_index.name} has a description')
+                    return
+                desc = self._load_photo(self.photo_index.get(pos)['url'], label='UNTAGGED', add_names=False)
+                if desc is None or not desc.strip():
+                    log.info(f'[UNTAGGED] Photo {pos} of {len(self.photo_index)} is untagged')
+                    self._extract_and_add_names()
+                    self._position_cursor_at_end()
+                    return
+                pos = self.photo_index.first_untagged(pos + 1)
+            log.warning(f'[UNTAGGED] Gave up after {max_loads} tagged photos; run again to continue')
+        except Exception as e:
+            log.error(f'[UNTAGGED] ERROR: {e}')
+
+    def _macro_snapshot(self):
+        """Return {'url', 'description'} in one round trip (description None if no textarea)."""
+        return self.page.evaluate(
+            _VISIBLE_DESCRIPTION_JS_BODY + "return { url: location.href, description: v }; }", None)
+
+    def _run_macro_step(self, action, data):
+        """Execute one recorded step directly on the worker thread."""
+        if action == 'name':
+            self._do_append_text(data)
+        elif action in ('name_and_next', 'tab_dennis'):
+            self._do_append_text(data if action == 'name_and_next' else 'Dennis ')
+            self._do_next()
+        elif action == 'next':
+            self._do_next()
+        elif action == 'prev':
+            self._do_prev()
+        elif action == 'backspace':
+            self._do_backspace()
+        elif action == 'delete_all':
+            self._do_delete_all()
+        elif action == 'cursor_to_end':
             self._position_cursor_at_end()
-            print(f'[{label}] Step 8b: Textarea focused and cursor positioned at end')
-            
+        elif action == 'keystroke':
+            self.page.keyboard.press(data)
+
+    def _do_macro(self, steps, count, on_done):
+        """Replay a recorded macro over the next `count` photos.
+        
+        Stops at the first photo whose snapshot deviates from what the macro
+        expects: no visible description textarea, or navigation that did not
+        land on a new photo.
+        """
+        self._macro_cancel.clear()
+        needs_next = not advances(steps)
+        started = time.perf_counter()
+        done = 0
+        stop_reason = None
+        log.info(f'[MACRO] Replaying {len(steps)} step(s) over {count} photo(s)')
+        self._direct_appends = True  # each photo's names before the macro moves on
+        try:
+            for i in range(count):
+                if self._macro_cancel.is_set():
+                    stop_reason = 'cancelled'
+                    break
+                snap = self._macro_snapshot()
+                if snap.get('description') is None:
+                    stop_reason = f'photo {i + 1}: no visible description textarea'
+                    break
+                for action, data in steps:
+                    self._run_macro_step(action, data)
+                if needs_next:
+                    self._do_next()
+                done += 1
+                after = self._macro_snapshot()
+                if after.get('url') == snap.get('url'):
+                    stop_reason = f'photo {i + 1}: still on the same photo after the macro (end of album?)'
+                    break
         except Exception as e:
-            print(f'[{label}] ERROR: {e}')
+            log.exception(f'[MACRO] ERROR: {e}')
+            stop_reason = f'error: {e}'
+        finally:
+            self._direct_appends = False
+
+        elapsed = time.perf_counter() - started
+        report = {
+            'requested': count,
+            'completed': done,
+            'stopped': stop_reason,
+            'elapsed_s': round(elapsed, 2),
+            'photos_per_minute': round(done * 60.0 / elapsed, 1) if elapsed > 0 else 0.0,
+            'ms_per_photo': round(elapsed * 1000.0 / done, 1) if done else None,
+        }
+        log.info(f'[MACRO] Done: {report}')
+        if on_done:
+            on_done(report)
 
     def _do_next(self):
         """Navigate to next photo."""
-        self._navigate_photo('next')
+        if self.work_queue is not None:
+            self._do_queue_step(1)
+        else:
+            self._navigate_photo('next')
 
     def _do_prev(self):
         """Navigate to previous photo."""
-        self._navigate_photo('prev')
+        if self.work_queue is not None:
+            self._do_queue_step(-1)
+        else:
+            self._navigate_photo('prev')
+
+    def _do_queue_step(self, n):
+        """Jump to the next (or previous) photo of the work queue.
+        
+        The description on screen is noted first, so the photo just worked
+        on drops out of the queue next time it is built.
+        """
+        try:
+            self._last_url = self.page.url
+            desc = self._sample_description()
+            if desc is not None:
+                self._note_photo(description=desc)
+            entry = self.work_queue.step(n)
+            if entry is None:
+                log.info(f'[QUEUE] {"End" if n > 0 else "Start"} of the work queue')
+                return
+            log.info(f'[QUEUE] Photo {entry["pos"]} ({self.work_queue.remaining()} left in the queue)')
+            self._load_photo(entry['url'], label='QUEUE')
+        except Exception as e:
+            log.error(f'[QUEUE] ERROR: {e}')
 
     def _sample_description(self):
         """Read current description from page."""
         try:
-            print('[SAMPLE] Executing page.evaluate...')
+            log.debug('[SAMPLE] Executing page.evaluate...')
             js = """() => {
     // Helper function to check if element is visually hidden
     function isElementVisuallyHidden(element) {
@@ -928,11 +1436,11 @@ class BrowserController:
 }"""
 
             result = self.page.evaluate(js)
-            print(f'[SAMPLE] Result: {repr(result)[:100]}')
+            log.debug('[SAMPLE] Result: %.100r', result)
             return result
 
         except Exception as e:
-            print(f'[SAMPLE] ERROR: {e}')
+            log.error(f'[SAMPLE] ERROR: {e}')
             return None
 
     def _focus_textarea(self, x, y):
@@ -960,15 +1468,15 @@ class BrowserController:
                 "return !!(a && a.getAttribute && a.getAttribute('aria-label') === 'Description'); }",
                 timeout=2000,
             )
-            print('[FOCUS] textarea became active')
+            log.debug('[FOCUS] textarea became active')
         except Exception:
-            print('[FOCUS] WARNING: textarea did not become active within timeout')
+            log.warning('[FOCUS] WARNING: textarea did not become active within timeout')
 
 
     def _do_append_text(self, text):
         """Append arbitrary text to current description WITHOUT scrolling right panel."""
         try:
-            print(f'[APPEND_TEXT] Starting append of: {repr(text)[:50]}')
+            log.debug('[APPEND_TEXT] Starting append of: %.50r', text)
             js_find = """() => {
     // Helper function to check if element is visually hidden
     function isElementVisuallyHidden(element) {
@@ -1008,25 +1516,25 @@ class BrowserController:
 
             result = self.page.evaluate(js_find)
             if not result:
-                print('[APPEND_TEXT] FAILED - No textarea found')
+                log.warning('[APPEND_TEXT] FAILED - No textarea found')
                 return
 
             x = result['x']
             y = result['y']
             current = result['currentValue']
-            print(f'[APPEND_TEXT] Textarea at ({x}, {y}), current value: "{current}"')
+            log.debug('[APPEND_TEXT] Textarea at (%s, %s), current value: "%s"', x, y, current)
 
             if y is not None and y < 0:
-                print(f"[APPEND_TEXT] WARNING: target y is negative ({y}), re-sampling once")
+                log.warning(f"[APPEND_TEXT] WARNING: target y is negative ({y}), re-sampling once")
                 self.page.wait_for_timeout(5)
                 result2 = self.page.evaluate(js_find)
                 if result2 and result2.get('y') is not None and result2.get('y') >= 0:
                     x = result2['x']
                     y = result2['y']
                     current = result2.get('currentValue')
-                    print(f"[APPEND_TEXT] Re-sampled textarea at ({x}, {y}), current value: {repr(current)[:80]}")
+                    log.debug('[APPEND_TEXT] Re-sampled textarea at (%s, %s), current value: %.80r', x, y, current)
                 else:
-                    print('[APPEND_TEXT] FAILED - target remains off-screen after re-sample')
+                    log.warning('[APPEND_TEXT] FAILED - target remains off-screen after re-sample')
                     return
 
             # Freeze scroll - disable scroll events and save position
@@ -1045,12 +1553,12 @@ class BrowserController:
                     }
                 }
             }""")
-            print('[APPEND_TEXT] Scroll frozen')
+            log.debug('[APPEND_TEXT] Scroll frozen')
             
-            print('[APPEND_TEXT] Positioning cursor at END before typing')
+            log.debug('[APPEND_TEXT] Positioning cursor at END before typing')
             self._position_cursor_at_end()
             
-            print(f'[APPEND_TEXT] Typing text: {repr(text)}')
+            log.debug('[APPEND_TEXT] Typing text: %r', text)
             self.page.keyboard.type(text)
             self.page.wait_for_timeout(10)
 
@@ -1062,24 +1570,22 @@ class BrowserController:
                     window.__savedScrollPos = null;
                 }
             }""")
-            print('[APPEND_TEXT] Scroll unfrozen')
+            log.debug('[APPEND_TEXT] Scroll unfrozen')
 
             self._last_description = (current if current else '') + text
-            print(f'[APPEND_SUCCESS] Appended {repr(text)} to description')
+            log.debug('[APPEND_SUCCESS] Appended %r to description', text)
             # Ensure cursor is positioned at the end after append
             try:
                 self._position_cursor_at_end()
             except Exception as e:
-                print(f'[APPEND_TEXT] WARNING: _position_cursor_at_end failed: {e}')
+                log.warning(f'[APPEND_TEXT] WARNING: _position_cursor_at_end failed: {e}')
 
         except Exception as e:
-            print(f'[APPEND_TEXT] ERROR: {e}')
-            import traceback
-            traceback.print_exc()
+            log.exception(f'[APPEND_TEXT] ERROR: {e}')
     def _do_backspace(self):
         """Send backspace key to the active textarea WITHOUT scrolling right panel."""
         try:
-            print('[BACKSPACE] Starting...')
+            log.debug('[BACKSPACE] Starting...')
             
             js_find = """() => {
     // Helper function to check if element is visually hidden
@@ -1120,13 +1626,13 @@ class BrowserController:
 
             result = self.page.evaluate(js_find)
             if not result:
-                print('[BACKSPACE] FAILED - No textarea found')
+                log.warning('[BACKSPACE] FAILED - No textarea found')
                 return
 
             x = result['x']
             y = result['y']
             
-            print(f'[BACKSPACE] Textarea at ({x}, {y})')
+            log.debug('[BACKSPACE] Textarea at (%s, %s)', x, y)
 
             # Freeze scroll - disable scroll events and save position
             self.page.evaluate("""() => {
@@ -1144,7 +1650,7 @@ class BrowserController:
                     }
                 }
             }""")
-            print('[BACKSPACE] Scroll frozen')
+            log.debug('[BACKSPACE] Scroll frozen')
 
             self._focus_textarea(x, y)
 
@@ -1152,7 +1658,7 @@ class BrowserController:
             # than sending End key). Then verify the active element and selection
             # are at the end before sending Backspace. If verification fails,
             # fall back to End key.
-            print('[BACKSPACE] Positioning cursor at END (programmatic)')
+            log.debug('[BACKSPACE] Positioning cursor at END (programmatic)')
             try:
                 self._position_cursor_at_end()
 
@@ -1174,19 +1680,19 @@ class BrowserController:
                     verified = False
 
                 if not verified:
-                    print('[BACKSPACE] WARNING: cursor verification failed, falling back to End key')
+                    log.warning('[BACKSPACE] WARNING: cursor verification failed, falling back to End key')
                     self.page.keyboard.press('End')
                     self.page.wait_for_timeout(50)
 
             except Exception as e:
-                print(f'[BACKSPACE] WARNING: programmatic positioning failed: {e}; falling back to End key')
+                log.warning(f'[BACKSPACE] WARNING: programmatic positioning failed: {e}; falling back to End key')
                 try:
                     self.page.keyboard.press('End')
                     self.page.wait_for_timeout(50)
                 except Exception:
                     pass
 
-            print('[BACKSPACE] Sending backspace')
+            log.debug('[BACKSPACE] Sending backspace')
             self.page.keyboard.press('Backspace')
             self.page.wait_for_timeout(15)
 
@@ -1198,19 +1704,17 @@ class BrowserController:
                     window.__savedScrollPos = null;
                 }
             }""")
-            print('[BACKSPACE] Scroll unfrozen')
+            log.debug('[BACKSPACE] Scroll unfrozen')
 
-            print('[BACKSPACE] SUCCESS')
+            log.debug('[BACKSPACE] SUCCESS')
             
         except Exception as e:
-            print(f'[BACKSPACE] ERROR: {e}')
-            import traceback
-            traceback.print_exc()
+            log.exception(f'[BACKSPACE] ERROR: {e}')
 
     def _do_delete_all(self):
         """Delete entire description."""
         try:
-            print('[DELETE_ALL] Starting...')
+            log.debug('[DELETE_ALL] Starting...')
             
             js_find = """() => {
     // Helper function to check if element is visually hidden
@@ -1251,81 +1755,142 @@ class BrowserController:
 
             result = self.page.evaluate(js_find)
             if not result:
-                print('[DELETE_ALL] FAILED - No textarea found')
+                log.warning('[DELETE_ALL] FAILED - No textarea found')
                 return
 
             x = result['x']
             y = result['y']
             
-            print(f'[DELETE_ALL] Textarea at ({x}, {y})')
+            log.debug('[DELETE_ALL] Textarea at (%s, %s)', x, y)
             self._focus_textarea(x, y)
             self._position_cursor_at_end()  # Explicitly position cursor at end
    
             
-            print('[DELETE_ALL] Pressing backspace 50 times to clear description')
-            for _ in range(150):
-                self.page.keyboard.press('Backspace')
+            # Select all + Delete clears any length (a fixed run of Backspaces
+            # stopped at 150 characters); Backspace per character remains as
+            # the fallback if the selection did not take
+            self.page.keyboard.press(SELECT_ALL_KEY)
+            self.page.keyboard.press('Delete')
+            remaining = self.page.evaluate(_VISIBLE_DESCRIPTION_JS_BODY + "return v; }", None)
+            if remaining:
+                log.debug('[DELETE_ALL] %s characters left after select-all, backspacing them', len(remaining))
+                self._position_cursor_at_end()
+                for _ in range(len(remaining)):
+                    self.page.keyboard.press('Backspace')
             self.page.wait_for_timeout(5)
-            print('[DELETE_ALL] SUCCESS')
+            log.debug('[DELETE_ALL] SUCCESS')
             
             self._last_description = ''
             
         except Exception as e:
-            print(f'[DELETE_ALL] ERROR: {e}')
-            import traceback
-            traceback.print_exc()
+            log.exception(f'[DELETE_ALL] ERROR: {e}')
 
-    def goto_next_photo(self):
-        """Queue next photo command."""
+    def _wait_for_commit(self, cmd, arg, timeout=2000):
+        """Wait until the visible description textarea reflects a traced command.
+        
+        Only called for traced commands, so untraced sessions pay nothing.
+        Returns False if the change never showed up.
+        """
+        try:
+            if cmd == 'append_text':
+                expected = (arg or '').strip()
+                self.page.wait_for_function(
+                    _VISIBLE_DESCRIPTION_JS_BODY + "return v !== null && v.trimEnd().endsWith(expected); }",
+                    arg=expected, timeout=timeout)
+            elif cmd == 'delete_all':
+                self.page.wait_for_function(
+                    _VISIBLE_DESCRIPTION_JS_BODY + "return v === ''; }",
+                    arg=None, timeout=timeout)
+            else:
+                # Navigation and backspace already sampled the textarea on the
+                # worker; one more read confirms it is there
+                self.page.evaluate(_VISIBLE_DESCRIPTION_JS_BODY + "return v; }", None)
+            return True
+        except Exception as e:
+            log.debug('[TRACE] Commit not observed for %s: %s', cmd, e)
+            return False
+
+    def _enqueue(self, cmd, arg=None, trace_id=None):
+        """Put a command on the worker queue, tagging its trace if any."""
         if not self._running:
             raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('next', None))
+        if trace_id is not None:
+            self.tracer.mark(trace_id, 'queued')
+        self._cmd_queue.put((cmd, arg, trace_id))
 
-    def goto_prev_photo(self):
+    def goto_next_photo(self, trace_id=None):
+        """Queue next photo command."""
+        self._enqueue('next', trace_id=trace_id)
+
+    def goto_prev_photo(self, trace_id=None):
         """Queue prev photo command."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('prev', None))
+        self._enqueue('prev', trace_id=trace_id)
+
+    def goto_photo(self, ref, trace_id=None):
+        """Queue a direct jump to a photo id, URL or 1-based index position."""
+        self._enqueue('goto', ref, trace_id)
+
+    def advance(self, n, trace_id=None):
+        """Queue a jump n photos forward (negative: back) in photo_index order."""
+        self._enqueue('advance', n, trace_id)
 
-    def append_text(self, text):
+    def goto_first_untagged(self, trace_id=None):
+        """Queue a jump to the first photo_index photo without a description."""
+        self._enqueue('goto_untagged', trace_id=trace_id)
+
+    def append_text(self, text, trace_id=None):
         """Queue append_text command with provided string."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('append_text', text))
+        self._enqueue('append_text', text, trace_id)
 
-    def send_backspace(self):
+    def send_backspace(self, trace_id=None):
         """Queue backspace command."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('backspace', None))
+        self._enqueue('backspace', trace_id=trace_id)
 
     def send_keystroke(self, key):
         """Send a raw keystroke to the web page without any focus/cursor manipulation."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('keystroke', key))
+        self._enqueue('keystroke', key)
 
-    def delete_all_description(self):
+    def delete_all_description(self, trace_id=None):
         """Queue delete all description command."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('delete_all', None))
+        self._enqueue('delete_all', trace_id=trace_id)
 
     def read_description(self, timeout=5.0):
         """Read current description synchronously."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
         ev = threading.Event()
         res = {}
-        self._cmd_queue.put(('read_desc', (ev, res)))
+        self._enqueue('read_desc', (ev, res))
         ok = ev.wait(timeout)
         return res.get('description') if ok else None
 
+    def run_on_worker(self, fn, *args, timeout=None, **kwargs):
+        """Run fn(controller, *args, **kwargs) on the worker thread and return its result.
+        
+        For batch tools (see page_ops.py) that need a synchronous answer;
+        exceptions raised by fn are re-raised here.
+        """
+        ev = threading.Event()
+        res = {}
+        self._enqueue('call', (fn, args, kwargs, ev, res))
+        if not ev.wait(timeout):
+            raise TimeoutError(f'{getattr(fn, "__name__", fn)} did not finish within {timeout} s')
+        if 'error' in res:
+            raise res['error']
+        return res['value']
+
+    def run_macro(self, steps, count, on_done=None):
+        """Queue a macro replay over the next `count` photos as one worker command.
+        
+        on_done(report) is called from the worker thread when replay ends.
+        """
+        self._enqueue('macro', (list(steps), count, on_done))
+
+    def cancel_macro(self):
+        """Stop a running macro replay after the current photo."""
+        self._macro_cancel.set()
+
     def dump_html(self):
         """Queue HTML dump command for debugging."""
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('dump_html', None))
+        self._enqueue('dump_html')
 
     def get_state(self):
         """Return current state for UI polling."""
@@ -1341,6 +1906,4 @@ class BrowserController:
         The worker must implement handling for the 'dump_analysis' command
         (e.g. a `_do_dump_analysis` method) to perform the actual analysis.
         """
-        if not self._running:
-            raise RuntimeError('Browser not running')
-        self._cmd_queue.put(('dump_analysis', None))
+        self._enqueue('dump_analysis')
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Headless bulk tagging: write descriptions and names from a manifest.
+
+The manifest is CSV or JSON lines, one photo per row:
+
+    photo,description,names
+    AF1QipN...,Beach day 1998,Bekah Dennis;Bob
+    https://photos.google.com/photo/AF1QipM...,,Grandma
+
+    {"photo": "AF1QipN...", "description": "Beach day 1998", "names": ["Bekah Dennis"]}
+
+`photo` (or `photo_id` / `url`) is a photo id or a full URL. `description`
+replaces the current text (an empty CSV cell leaves it alone); `names` are
+appended when not already present, like the name buttons do.
+
+    python bulk_apply.py manifest.csv
+    python bulk_apply.py manifest.jsonl --headful --report report.json
+    python bulk_apply.py manifest.csv --base-url http://127.0.0.1:8765   # fake_photos_server.py
+    python bulk_apply.py manifest.csv --pages 4      # up to 4 tabs in parallel
+    python bulk_apply.py manifest.csv --daemon       # through controller_daemon.py's browser
+
+Every finished photo is appended to a checkpoint (manifest + .progress.jsonl)
+as it completes, so after a crash or Ctrl+C the same command resumes with
+the first photo that is not yet 'ok' or 'unchanged'.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import log_setup
+from browser_controller import BrowserController
+from latency_tracer import summarize_samples
+from page_ops import apply_entry, default_waits, photo_url
+
+
+log = log_setup.get_logger('bulk')
+
+DONE_STATUSES = ('ok', 'unchanged')
+
+
+def _split_names(value):
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [n for n in value if n and n.strip()]
+    return [n.strip() for n in value.replace('|', ';').split(';') if n.strip()]
+
+
+def load_manifest(path):
+    """[(key, description or None, [names])] from a .csv or .jsonl manifest."""
+    if path.endswith('.csv'):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    entries = []
+    for n, row in enumerate(rows, 1):
+        key = (row.get('photo') or row.get('photo_id') or row.get('url') or '').strip()
+        if not key:
+            raise ValueError(f'{path}: row {n} has no photo, photo_id or url')
+        description = row.get('description')
+        if description is not None and not str(description).strip() and path.endswith('.csv'):
+            description = None
+        entries.append((key, description, _split_names(row.get('names'))))
+    return entries
+
+
+def load_checkpoint(path):
+    """{key: last status} from a progress file."""
+    done = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    r = json.loads(line)
+                    done[r['key']] = r['status']
+    return done
+
+
+def build_report(results, resumed, elapsed, waits):
+    worked = [r for r in results if r['status'] in DONE_STATUSES]
+    return {
+        'processed': len(results),
+        'resumed_skipped': resumed,
+        'statuses': dict(Counter(r['status'] for r in results)),
+        'elapsed_s': round(elapsed, 1),
+        'photos_per_minute': round(len(worked) * 60.0 / elapsed, 1) if elapsed > 0 else 0.0,
+        'per_photo_ms': summarize_samples([r['ms'] for r in worked]),
+        'waits': {name: {'timeout_ms': round(w.timeout_ms()), 'timeouts': w.timeouts,
+                         'observed': summarize_samples(w.samples)} for name, w in waits.items()},
+        'failures': [{'key': r['key'], 'status': r['status'], 'error': r.get('error')}
+                     for r in results if r['status'] not in DONE_STATUSES],
+    }
+
+
+def run_single(args, todo, waits, finish):
+    """One page through BrowserController's worker, one photo at a time."""
+    ctl = BrowserController(base_url=args.base_url, channel=args.channel or None)
+    ctl.start(headful=args.headful)
+    if ctl.page is None:  # start() already logged why
+        sys.exit(1)
+    try:
+        for key, description, names in todo:
+            url = photo_url(ctl.base_url, key)
+            record = {'key': key}
+            t0 = time.perf_counter()
+            for attempt in range(1, args.retries + 2):
+                record['attempts'] = attempt
+                try:
+                    record.update(ctl.run_on_worker(apply_entry, url, description, names, waits=waits, timeout=120))
+                    record.pop('error', None)
+                    if record['status'] in DONE_STATUSES:
+                        break
+                except Exception as e:
+                    record.update(status='failed', error=f'{type(e).__name__}: {str(e).splitlines()[0][:200]}')
+                    log.warning(f'[BULK] {key}: attempt {attempt} failed: {record["error"]}')
+            record['ms'] = round((time.perf_counter() - t0) * 1000, 1)
+            record['ts'] = round(time.time(), 3)
+            finish(record)
+    finally:
+        ctl.stop()
+
+
+def run_daemon(args, todo, finish):
+    """Like run_single, through the controller daemon's shared browser; returns its wait stats."""
+    from controller_daemon import DaemonClient, ensure_daemon
+    daemon_args = ['--base-url', args.base_url] if args.base_url else []
+    ensure_daemon(daemon_args=daemon_args + ([] if args.headful else ['--headless']))
+    client = DaemonClient()
+    try:
+        base_url = client.call('info', timeout=10)['base_url']
+        for key, description, names in todo:
+            record = {'key': key}
+            t0 = time.perf_counter()
+            for attempt in range(1, args.retries + 2):
+                record['attempts'] = attempt
+                try:
+                    record.update(client.call('apply_entry', photo_url(base_url, key), description, names, timeout=130))
+                    record.pop('error', None)
+                    if record['status'] in DONE_STATUSES:
+                        break
+                except Exception as e:
+                    record.update(status='failed', error=f'{type(e).__name__}: {str(e).splitlines()[0][:200]}')
+                    log.warning(f'[BULK] {key}: attempt {attempt} failed: {record["error"]}')
+            record['ms'] = round((time.perf_counter() - t0) * 1000, 1)
+            record['ts'] = round(time.time(), 3)
+            finish(record)
+        return client.call('wait_stats', timeout=10)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply descriptions/names from a CSV or JSONL manifest, headless')
+    parser.add_argument('manifest', help='CSV (photo,description,names) or JSON lines')
+    parser.add_argument('--checkpoint', help='Progress file (default: <manifest>.progress.jsonl)')
+    parser.add_argument('--report', metavar='FILE.json', help='Write the final report here')
+    parser.add_argument('--retries', type=int, default=2, help='Extra attempts per photo after a failure (default 2)')
+    parser.add_argument('--limit', type=int, help='Stop after this many photos')
+    parser.add_argument('--pages', type=int, default=1,
+                        help='Tabs working in parallel (page_pool.py); concurrency backs off when latency rises')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Use the browser of controller_daemon.py (started if needed) instead of launching one')
+    parser.add_argument('--headful', action='store_true', help='Show the browser window')
+    parser.add_argument('--base-url', help='Open this instead of https://photos.google.com (e.g. fake_photos_server.py)')
+    parser.add_argument('--channel', default='chrome', help="Browser channel ('chrome'; empty for bundled Chromium)")
+    parser.add_argument('--dry-run', action='store_true', help='Parse the manifest and show what would run')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO')
+    args = parser.parse_args()
+    log_setup.configure(args.log_level)
+
+    entries = load_manifest(args.manifest)
+    checkpoint = args.checkpoint or args.manifest + '.progress.jsonl'
+    previous = load_checkpoint(checkpoint)
+    todo = [e for e in entries if previous.get(e[0]) not in DONE_STATUSES]
+    resumed = len(entries) - len(todo)
+    if args.limit is not None:
+        todo = todo[:args.limit]
+    log.info(f'[BULK] {len(entries)} photos in {args.manifest}, {resumed} already done, {len(todo)} to go')
+    if args.dry_run:
+        for key, description, names in todo:
+            print(f'{key}  description={description!r}  names={names}')
+        return
+    if not todo:
+        return
+
+    results = []
+    started = time.perf_counter()
+    with open(checkpoint, 'a', encoding='utf-8') as progress:
+        def finish(record):
+            progress.write(json.dumps(record, ensure_ascii=False) + '\n')
+            progress.flush()
+            os.fsync(progress.fileno())
+            results.append(record)
+            log.info(f"[BULK] {len(results)}/{len(todo)} {record['key']}: {record['status']} ({record['ms']:.0f} ms)"
+                     + (f", added {record['added_names']}" if record.get('added_names') else ''))
+
+        daemon_waits = {}
+        try:
+            if args.daemon:
+                waits = {}
+                daemon_waits = run_daemon(args, todo, finish)
+            elif args.pages > 1:
+                from page_pool import PagePool  # asyncio + async playwright, only for parallel tabs
+                pool = PagePool(args.pages, base_url=args.base_url, channel=args.channel or None,
+                                headless=not args.headful, retries=args.retries, on_result=finish)
+                waits = pool.waits
+                pool.run(todo)
+            else:
+                waits = default_waits()
+                run_single(args, todo, waits, finish)
+        except KeyboardInterrupt:
+            log.warning('[BULK] Interrupted; rerun the same command to resume')
+
+    report = build_report(results, resumed, time.perf_counter() - started, waits)
+    if args.daemon:
+        report['waits'] = daemon_waits
+    if args.pages > 1:
+        report['pages'] = {'max': args.pages, 'limit_changes': pool.limiter.history if pool.limiter else [],
+                           'photos_per_page': pool.per_page}
+    log.info(f"[BULK] Done: {report['statuses']}, {report['photos_per_minute']} photos/min, "
+             f"{len(report['failures'])} failure(s), checkpoint {checkpoint}")
+    for failure in report['failures']:
+        log.info(f"[BULK]   {failure['key']}: {failure['status']} {failure['error'] or ''}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        log.info(f'[BULK] Wrote {args.report}')
+    if report['failures']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
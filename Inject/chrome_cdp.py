@@ -0,0 +1,188 @@
+"""Keep one Chrome running between tagger restarts and attach to it over CDP.
+
+launch_persistent_context starts Chrome as a child of the Playwright
+driver, so it dies with the tagger and every restart pays a cold launch
+of the profile. With a CDP port, BrowserController instead starts Chrome
+itself, detached, with --remote-debugging-port, and connects with
+connect_over_cdp. Later starts find the port listening and only attach,
+adopting the tab that already shows Google Photos (and the photo on it).
+
+A port counts as ours only when Chrome answers /json/version on it and its
+browser target is the one recorded in the profile's DevToolsActivePort, so
+another Chrome profile or an unrelated tool on the port is never adopted.
+
+A detached Chrome (headless has no window to close) is stopped with
+
+    python chrome_cdp.py --stop [--port 9222]
+    python chrome_cdp.py --status
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from log_setup import get_logger
+
+
+log = get_logger('cdp')
+
+DEFAULT_PORT = 9222
+DEFAULT_PROFILE = os.path.join(os.path.expanduser('~'), '.googlephotos_profile')  # BrowserController's
+
+# Where the 'chrome' channel usually lives, after whatever is on PATH
+CHROME_PATHS = {
+    'darwin': ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'],
+    'win32': [os.path.expandvars(r'%ProgramFiles%\Google\Chrome\Application\chrome.exe'),
+              os.path.expandvars(r'%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe'),
+              os.path.expandvars(r'%LocalAppData%\Google\Chrome\Application\chrome.exe')],
+    'linux': ['/opt/google/chrome/chrome'],
+}
+
+
+def endpoint(port):
+    return f'http://127.0.0.1:{port}'
+
+
+def is_listening(port, timeout=0.2):
+    """True if something accepts connections on the debugging port."""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def browser_version(port, timeout=0.5):
+    """The /json/version answer on the port, or None when it is not Chrome's debugging endpoint."""
+    from urllib.request import urlopen  # http.client & co.: ~50 ms, only when a port is checked
+    try:
+        with urlopen(f'{endpoint(port)}/json/version', timeout=timeout) as response:
+            info = json.loads(response.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(info, dict) or 'webSocketDebuggerUrl' not in info or not info.get('Browser'):
+        return None
+    return info
+
+
+def is_our_chrome(port, user_data_dir):
+    """True if the Chrome debugging on `port` runs on user_data_dir.
+
+    Chrome writes the port and its browser target path to
+    <user_data_dir>/DevToolsActivePort when it opens the port; the target
+    from /json/version must match it.
+    """
+    info = browser_version(port)
+    if info is None:
+        return False
+    try:
+        with open(os.path.join(user_data_dir, 'DevToolsActivePort'), encoding='utf-8') as f:
+            active_port, target = (f.read().split() + ['', ''])[:2]
+    except OSError:
+        return False
+    return active_port == str(port) and urlsplit(info['webSocketDebuggerUrl']).path == target
+
+
+def find_chrome(channel, playwright):
+    """Executable for `channel` ('chrome'), or Playwright's bundled Chromium."""
+    if channel == 'chrome':
+        for name in ('google-chrome', 'google-chrome-stable', 'chrome'):
+            path = shutil.which(name)
+            if path:
+                return path
+        for path in CHROME_PATHS.get(sys.platform, []):
+            if os.path.exists(path):
+                return path
+        log.warning('[CDP] Chrome not found, using bundled Chromium')
+    return playwright.chromium.executable_path
+
+
+def launch_detached(executable, port, user_data_dir, url, headless=False):
+    """Start Chrome in its own session so it outlives this process."""
+    args = [executable, f'--remote-debugging-port={port}', f'--user-data-dir={user_data_dir}',
+            '--disable-blink-features=AutomationControlled', '--no-first-run', '--no-default-browser-check']
+    if headless:
+        args.append('--headless=new')
+    args.append(url)
+    options = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL, 'stdin': subprocess.DEVNULL}
+    if sys.platform == 'win32':
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True
+    return subprocess.Popen(args, **options)
+
+
+def wait_until_listening(port, timeout=20.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if is_listening(port):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def pick_page(context, base_url):
+    """The open tab already on base_url, else the first tab, else a new one."""
+    for page in context.pages:
+        if page.url.startswith(base_url):
+            return page
+    return context.pages[0] if context.pages else context.new_page()
+
+
+def open_over_cdp(playwright, port, user_data_dir, base_url, channel='chrome', headless=False):
+    """(browser, context, page, reused) attached to Chrome on `port`, starting it first if needed."""
+    started = time.perf_counter()
+    reused = is_listening(port)
+    if reused and not is_our_chrome(port, user_data_dir):
+        raise RuntimeError(f'Port {port} is in use, but not by Chrome on {user_data_dir}; pick another --cdp-port')
+    if not reused:
+        executable = find_chrome(channel, playwright)
+        log.info(f'[CDP] Starting {os.path.basename(executable)} with debugging port {port}')
+        launch_detached(executable, port, user_data_dir, base_url, headless=headless)
+        if not wait_until_listening(port):
+            raise RuntimeError(f'Chrome did not open debugging port {port}')
+    browser = playwright.chromium.connect_over_cdp(endpoint(port))
+    context = browser.contexts[0] if browser.contexts else browser.new_context()
+    page = pick_page(context, base_url)
+    log.info(f'[CDP] {"Attached to running" if reused else "Launched"} Chrome on port {port} '
+             f'in {(time.perf_counter() - started) * 1000:.0f} ms, tab {page.url[:80]}')
+    return browser, context, page, reused
+
+
+def stop_chrome(port):
+    """Close the Chrome debugging on `port` (Browser.close over CDP)."""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.connect_over_cdp(endpoint(port))
+        browser.new_browser_cdp_session().send('Browser.close')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Status of, or stop, the Chrome kept running for --cdp-port')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Debugging port (default {DEFAULT_PORT})')
+    parser.add_argument('--user-data-dir', default=DEFAULT_PROFILE, help='Profile the Chrome must be running on')
+    parser.add_argument('--stop', action='store_true', help='Close that Chrome')
+    args = parser.parse_args()
+
+    info = browser_version(args.port)
+    if info is None:
+        print(f'[CDP] No Chrome debugging on port {args.port}')
+        sys.exit(1)
+    ours = is_our_chrome(args.port, args.user_data_dir)
+    print(f"[CDP] {info['Browser']} on port {args.port}, "
+          f"{'profile ' + args.user_data_dir if ours else 'not running on ' + args.user_data_dir}")
+    if args.stop:
+        if not ours:
+            print('[CDP] Not stopping a Chrome that is not ours')
+            sys.exit(1)
+        stop_chrome(args.port)
+        print('[CDP] Stopped')
+
+
+if __name__ == '__main__':
+    main()
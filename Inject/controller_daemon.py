@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""BrowserController as a long-lived daemon behind a Unix socket.
+
+One process owns the browser; the tagger UI, bulk_apply.py and scripts are
+thin clients, so closing or crashing the UI keeps the session (and its
+queue) alive and any number of tools share one warm browser.
+
+The protocol is JSON lines over ~/.googlephotos_controller.sock (or
+$GPHOTOS_DAEMON_SOCKET). A request names a controller method and its
+positional arguments; every request gets exactly one reply with the same
+id, possibly much later (read_description, apply_entry and run_macro
+answer when the work is done), so a client can keep several in flight:
+
+    -> {"id": 1, "method": "goto_next_photo", "args": []}
+    <- {"id": 1, "result": null}
+    -> {"id": 2, "method": "subscribe", "args": []}
+    <- {"event": "state", "data": {"url": "...", "description": "..."}}
+    <- {"id": 7, "error": "RuntimeError: Browser not running"}
+
+    python controller_daemon.py --index trip            # start (usually inject.py --daemon does this)
+    python controller_daemon.py --status
+    python controller_daemon.py --stop
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import log_setup
+
+
+log = log_setup.get_logger('daemon')
+
+DEFAULT_SOCKET = os.environ.get('GPHOTOS_DAEMON_SOCKET') or os.path.join(os.path.expanduser('~'), '.googlephotos_controller.sock')
+
+# Controller methods that only queue a command; they reply at once
+QUEUE_METHODS = frozenset({
+    'goto_next_photo', 'goto_prev_photo', 'append_text', 'send_backspace', 'send_keystroke',
+    'delete_all_description', 'dump_html', 'dump_analysis', 'goto_photo', 'advance',
+    'goto_first_untagged', 'cancel_macro',
+})
+
+# Controller methods that wait for the worker; each gets its own thread so
+# the connection keeps reading. Everything else runs in the reader loop, in
+# the order the client sent it
+BLOCKING_METHODS = frozenset({'read_description', 'apply_entry', 'barrier'})
+
+STATE_POLL_S = 0.1
+
+
+class DaemonError(Exception):
+    """An error reply from the daemon."""
+
+
+class ControllerDaemon:
+    """Serves one started BrowserController on a Unix socket."""
+
+    def __init__(self, controller, path=DEFAULT_SOCKET):
+        self.controller = controller
+        self.path = path
+        self.server = None
+        self.waits = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    # --- requests ---------------------------------------------------------
+
+    def handle(self, method, args, reply, conn):
+        """Run one request; reply(result=...) or reply(error=...) exactly once."""
+        ctl = self.controller
+        if method in QUEUE_METHODS:
+            getattr(ctl, method)(*args)
+            reply(result=None)
+        elif method == 'read_description':
+            reply(result=ctl.read_description(*args))
+        elif method == 'get_state':
+            reply(result=ctl.get_state())
+        elif method == 'run_macro':
+            steps, count = args
+            ctl.run_macro(steps, count, on_done=lambda report: reply(result=report))
+        elif method == 'apply_entry':
+            from page_ops import apply_entry, default_waits
+            if self.waits is None:
+                self.waits = default_waits()
+            url, description, names = args
+            reply(result=ctl.run_on_worker(apply_entry, url, description, names, waits=self.waits, timeout=120))
+        elif method == 'wait_stats':
+            from latency_tracer import summarize_samples
+            reply(result={name: {'timeout_ms': round(w.timeout_ms()), 'timeouts': w.timeouts,
+                                 'observed': summarize_samples(w.samples)}
+                          for name, w in (self.waits or {}).items()})
+        elif method == 'barrier':
+            reply(result=ctl.run_on_worker(lambda c: None, timeout=args[0] if args else None))
+        elif method == 'info':
+            reply(result={'pid': os.getpid(), 'base_url': ctl.base_url, 'session': ctl.session_id,
+                          'index': ctl.photo_index.name if ctl.photo_index is not None else None,
+                          'work_queue': ctl.work_queue is not None, 'clients': len(self._subscribers)})
+        elif method == 'subscribe':
+            with self._lock:
+                self._subscribers.add(conn)
+            reply(result=ctl.get_state())
+        elif method == 'shutdown':
+            reply(result=None)
+            threading.Thread(target=self.stop, daemon=True).start()
+        else:
+            reply(error=f'unknown method {method!r}')
+
+    # --- events -----------------------------------------------------------
+
+    def broadcast(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for conn in subscribers:
+            if not conn.send(message):
+                with self._lock:
+                    self._subscribers.discard(conn)
+
+    def _watch_state(self):
+        last = None
+        while not self._stopping.wait(STATE_POLL_S):
+            state = self.controller.get_state()
+            if state != last:
+                last = dict(state)
+                self.broadcast({'event': 'state', 'data': last})
+            if not self.controller._running:
+                log.warning('[DAEMON] Browser worker stopped; shutting down')
+                self.stop()
+
+    # --- lifecycle --------------------------------------------------------
+
+    def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale: is_running() was checked by main()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                conn = _Connection(self.wfile)
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    daemon._dispatch(line, conn)
+                with daemon._lock:
+                    daemon._subscribers.discard(conn)
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(self.path, 0o600)
+        threading.Thread(target=self._watch_state, daemon=True).start()
+        log.info(f'[DAEMON] Serving {self.controller.base_url} on {self.path} (pid {os.getpid()})')
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def _dispatch(self, line, conn):
+        """Handle one request line from the connection's reader loop."""
+        try:
+            request = json.loads(line)
+            method = request['method']
+        except Exception as e:
+            conn.send({'id': None, 'error': f'{type(e).__name__}: {e}'})
+            return
+        request_id = request.get('id')
+        sent = threading.Event()
+
+        def reply(result=None, error=None):
+            if not sent.is_set():
+                sent.set()
+                conn.send({'id': request_id, 'error': error} if error is not None
+                          else {'id': request_id, 'result': result})
+
+        def run():
+            try:
+                self.handle(method, request.get('args') or [], reply, conn)
+            except Exception as e:
+                reply(error=f'{type(e).__name__}: {e}')
+
+        if method in BLOCKING_METHODS:
+            threading.Thread(target=run, daemon=True).start()
+        else:
+            run()
+
+    def stop(self):
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self.broadcast({'event': 'shutdown'})
+        if self.server:
+            self.server.shutdown()
+
+
+class _Connection:
+    """Serialises replies and events written to one client."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        try:
+            with self.lock:
+                self.wfile.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+                self.wfile.flush()
+            return True
+        except OSError:
+            return False
+
+
+# --- clients ------------------------------------------------------------------
+
+def is_running(path=DEFAULT_SOCKET):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(0.5)
+            s.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def ensure_daemon(path=DEFAULT_SOCKET, daemon_args=(), timeout=60.0):
+    """Start a daemon in the background unless one is already serving `path`.
+
+    Its output goes to the socket path with a .log suffix, since it
+    outlives the terminal of whoever started it.
+    """
+    if is_running(path):
+        return False
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'controller_daemon.py')
+    log_path = os.path.splitext(path)[0] + '.log'
+    log.info(f'[DAEMON] Starting {os.path.basename(script)} {" ".join(daemon_args)} (log {log_path})')
+    with open(log_path, 'a', encoding='utf-8') as out:
+        subprocess.Popen([sys.executable, script, '--socket', path, *daemon_args], start_new_session=True,
+                         stdin=subprocess.DEVNULL, stdout=out, stderr=subprocess.STDOUT, cwd=os.getcwd())
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if is_running(path):
+            return True
+        time.sleep(0.1)
+    raise RuntimeError(f'controller daemon did not come up on {path} within {timeout:.0f} s')
+
+
+class DaemonClient:
+    """One connection; submit() returns a Future resolved by the matching reply."""
+
+    def __init__(self, path=DEFAULT_SOCKET, on_event=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.on_event = on_event
+        self._futures = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def submit(self, method, *args):
+        future = Future()
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._futures[request_id] = future
+            self.sock.sendall((json.dumps({'id': request_id, 'method': method, 'args': list(args)}) + '\n').encode('utf-8'))
+        return future
+
+    def call(self, method, *args, timeout=None):
+        return self.submit(method, *args).result(timeout)
+
+    def _read(self):
+        try:
+            for line in self.sock.makefile('r', encoding='utf-8'):
+                message = json.loads(line)
+                if 'event' in message:
+                    if self.on_event:
+                        self.on_event(message)
+                    continue
+                with self._lock:
+                    future = self._futures.pop(message.get('id'), None)
+                if future is None:
+                    continue
+                if message.get('error') is not None:
+                    future.set_exception(DaemonError(message['error']))
+                else:
+                    future.set_result(message.get('result'))
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            pending, self._futures = list(self._futures.values()), {}
+        for future in pending:
+            future.set_exception(ConnectionError('controller daemon connection closed'))
+        if self.on_event:
+            self.on_event({'event': 'disconnected'})
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class RemoteController:
+    """Drop-in for BrowserController in AssistantUI, backed by the daemon.
+
+    start() connects (launching the daemon if needed) and stop() only
+    disconnects; state comes from the daemon's events, so get_state()
+    costs no round trip.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, daemon_args=()):
+        self.path = path
+        self.daemon_args = list(daemon_args)
+        self.client = None
+        self.tracer = None  # traces need the worker thread; not available remotely
+        self.photo_index = None
+        self._running = False
+        self._launch_mode = 'default'
+        self._state = {'url': None, 'description': None}
+
+    def start(self, headful=True, timeout=60):
+        args = self.daemon_args + ([] if headful else ['--headless'])
+        ensure_daemon(self.path, args, timeout=timeout)
+        self.client = DaemonClient(self.path, on_event=self._on_event)
+        self._state = self.client.call('subscribe', timeout=10) or self._state
+        info = self.client.call('info', timeout=10)
+        if info.get('index'):
+            from photo_index import PhotoIndex
+            self.photo_index = PhotoIndex(info['index'])
+        self._running = True
+        log.info(f"[DAEMON] Connected to pid {info['pid']} ({info['base_url']})")
+
+    def stop(self):
+        self._running = False
+        if self.client:
+            self.client.close()
+
+    def _on_event(self, message):
+        if message['event'] == 'state':
+            self._state = message['data']
+        elif message['event'] in ('shutdown', 'disconnected'):
+            self._running = False
+
+    def _send(self, method, *args):
+        if not self._running:
+            raise RuntimeError('Browser not running')
+        future = self.client.submit(method, *args)
+        future.add_done_callback(lambda f: f.exception() and log.error(f'[DAEMON] {method}: {f.exception()}'))
+        return future
+
+    def goto_next_photo(self, trace_id=None):
+        self._send('goto_next_photo')
+
+    def goto_prev_photo(self, trace_id=None):
+        self._send('goto_prev_photo')
+
+    def goto_photo(self, ref, trace_id=None):
+        self._send('goto_photo', ref)
+
+    def advance(self, n, trace_id=None):
+        self._send('advance', n)
+
+    def goto_first_untagged(self, trace_id=None):
+        self._send('goto_first_untagged')
+
+    def append_text(self, text, trace_id=None):
+        self._send('append_text', text)
+
+    def send_backspace(self, trace_id=None):
+        self._send('send_backspace')
+
+    def send_keystroke(self, key):
+        self._send('send_keystroke', key)
+
+    def delete_all_description(self, trace_id=None):
+        self._send('delete_all_description')
+
+    def dump_html(self):
+        self._send('dump_html')
+
+    def dump_analysis(self):
+        self._send('dump_analysis')
+
+    def cancel_macro(self):
+        self._send('cancel_macro')
+
+    def run_macro(self, steps, count, on_done=None):
+        future = self._send('run_macro', [list(s) for s in steps], count)
+        if on_done:
+            future.add_done_callback(lambda f: f.exception() is None and on_done(f.result()))
+
+    def read_description(self, timeout=5.0):
+        try:
+            return self._send('read_description', timeout).result(timeout + 1)
+        except Exception:
+            return None
+
+    def get_state(self):
+        return dict(self._state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve BrowserController to local clients over a Unix socket')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help=f'Socket path (default {DEFAULT_SOCKET})')
+    parser.add_argument('--status', action='store_true', help='Show the running daemon and exit')
+    parser.add_argument('--stop', action='store_true', help='Stop the running daemon and exit')
+    parser.add_argument('--headless', action='store_true', help='Run the browser without a window')
+    parser.add_argument('--base-url', help='Open this instead of https://photos.google.com (e.g. fake_photos_server.py)')
+    parser.add_argument('--channel', default='chrome', help="Browser channel ('chrome'; empty for bundled Chromium)")
+    parser.add_argument('--index', metavar='NAME', help='Photo index for goto_photo/advance/goto_first_untagged')
+    parser.add_argument('--work-queue', action='store_true', help='With --index, next/prev walk the needs-work queue')
+    parser.add_argument('--rpc-metadata', action='store_true', help="Read descriptions from the page's RPC responses")
+    parser.add_argument('--cdp-port', type=int, nargs='?', const=9222, metavar='PORT', help='Keep Chrome running over CDP')
+    parser.add_argument('--dump-full-page', action='store_true', help='DMP dumps the whole page')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO')
+    parser.add_argument('--log-json', metavar='FILE.jsonl', help='Also write every log record as JSON lines to this file')
+    args = parser.parse_args()
+    log_setup.configure(args.log_level, json_path=args.log_json)
+
+    if args.status or args.stop:
+        if not is_running(args.socket):
+            raise SystemExit(f'No controller daemon on {args.socket}')
+        client = DaemonClient(args.socket)
+        print(json.dumps(client.call('info', timeout=10), indent=2))
+        if args.stop:
+            client.call('shutdown', timeout=10)
+            print('Stopping')
+        client.close()
+        return
+    if is_running(args.socket):
+        raise SystemExit(f'A controller daemon is already serving {args.socket}')
+
+    from browser_controller import BrowserController
+    from photo_index import PhotoIndex
+    from work_queue import WorkQueue
+
+    photo_index = PhotoIndex(args.index) if args.index else None
+    ctl = BrowserController(base_url=args.base_url, channel=args.channel or None, dump_full_page=args.dump_full_page,
+                            photo_index=photo_index,
+                            work_queue=WorkQueue(photo_index) if args.work_queue and photo_index else None,
+                            rpc_metadata=args.rpc_metadata, cdp_port=args.cdp_port)
+    ctl.start(headful=not args.headless)
+    if ctl.page is None:  # start() already logged why
+        sys.exit(1)
+    daemon = ControllerDaemon(ctl, args.socket)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ctl.stop()
+
+
+if __name__ == '__main__':
+    main()
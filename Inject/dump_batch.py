@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Analyze whole directories of dumps in parallel, one JSON record per dump.
+
+    python dump_batch.py ../OLD/old_device --out records.jsonl --summary summary.json
+    python dump_batch.py 'captures/**/*.html' --workers 8 --engine bs4
+    python dump_batch.py 'store:*'                     # every dump in dump_store
+
+Each record holds the textarea inventory, the description the explorer
+reads (first textarea) and the one the controller would type into (first
+visible Description textarea), the album/face candidates and the names the
+simulated _extract_and_add_names would append. The aggregated summary
+counts the selector outcomes across all dumps, so a change to the scanner
+or to the name logic shows up as a diff between two summaries.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from dump_scan import (album_candidates, face_candidates, load_special_cases, scan_file, simulate_names,
+                       visible_description)
+from dump_store import STORE_PREFIX, dump_size, store_refs
+
+
+DEFAULT_NAMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'names.json')
+
+_explorer = None
+
+
+def expand_inputs(inputs, pattern='*.html'):
+    """Files from a mix of files, directories (searched recursively), globs and store refs."""
+    paths = []
+    for item in inputs:
+        if item == STORE_PREFIX + '*':
+            paths.extend(store_refs())
+        elif item.startswith(STORE_PREFIX):
+            paths.append(item)
+        elif os.path.isdir(item):
+            paths.extend(glob.glob(os.path.join(item, '**', pattern), recursive=True))
+        elif any(c in item for c in '*?['):
+            paths.extend(glob.glob(item, recursive=True))
+        else:
+            paths.append(item)
+    return sorted(set(paths))
+
+
+def _summarize(path, engine):
+    if engine == 'bs4':
+        global _explorer
+        if _explorer is None:
+            import importlib.util
+            spec = importlib.util.spec_from_file_location(
+                'dump_explorer', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dump-explorer.py'))
+            _explorer = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(_explorer)
+        return _explorer.summarize(path, 'bs4')
+    return scan_file(path)
+
+
+def analyze_one(path, engine, special_cases):
+    """Worker: one dump -> one JSON-serialisable record."""
+    t0 = time.perf_counter()
+    try:
+        summary = _summarize(path, engine)
+    except Exception as e:
+        return {'file': path, 'error': f'{type(e).__name__}: {e}'}
+    names, _ = simulate_names(summary['candidates'], summary['current_description'], special_cases)
+    return {
+        'file': path,
+        'bytes': dump_size(path),
+        'ms': round((time.perf_counter() - t0) * 1000, 1),
+        'title': summary['title'],
+        'url': summary['url'],
+        'textareas': [{k: ta[k] for k in ('index', 'aria_label', 'hidden', 'in_sidebar', 'div_class', 'value')}
+                      for ta in summary['textareas']],
+        'current_description': summary['current_description'],
+        'visible_description': visible_description(summary),
+        'sidebar_root': summary['sidebar_root'],
+        'album_candidates': album_candidates(summary['albums']),
+        'face_candidates': face_candidates(summary['faces']),
+        'candidates': summary['candidates'],
+        'names_to_append': names,
+    }
+
+
+def aggregate(records):
+    """Counts across all records for quick regression comparison."""
+    ok = [r for r in records if 'error' not in r]
+    description_textareas = Counter()
+    visible_textareas = Counter()
+    names = Counter()
+    for r in ok:
+        descs = [t for t in r['textareas'] if t['aria_label'] == 'Description']
+        description_textareas[len(descs)] += 1
+        visible_textareas[sum(1 for t in descs if not t['hidden'])] += 1
+        names.update(r['names_to_append'])
+    return {
+        'dumps': len(records),
+        'errors': len(records) - len(ok),
+        'total_mb': round(sum(r['bytes'] for r in ok) / 1e6, 1),
+        'no_sidebar_root': sum(1 for r in ok if not r['sidebar_root']),
+        'no_visible_description': sum(1 for r in ok if r['visible_description'] is None),
+        # The explorer reads the first textarea, the controller the first visible one
+        'first_textarea_not_visible': sum(1 for r in ok if r['textareas'] and r['textareas'][0]['hidden']),
+        'description_mismatch': sum(1 for r in ok if r['visible_description'] is not None
+                                    and r['visible_description'] != r['current_description']),
+        'description_textareas_per_dump': dict(sorted(description_textareas.items())),
+        'visible_description_textareas_per_dump': dict(sorted(visible_textareas.items())),
+        'with_candidates': sum(1 for r in ok if r['candidates']),
+        'with_names_to_append': sum(1 for r in ok if r['names_to_append']),
+        'names_to_append': dict(names.most_common()),
+        'error_files': [r['file'] for r in records if 'error' in r],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze many Google Photos dumps in parallel')
+    parser.add_argument('inputs', nargs='+', help="Dump files, directories, globs, store:<ref> or 'store:*'")
+    parser.add_argument('--out', metavar='FILE.jsonl', help='Write one JSON record per dump (default stdout)')
+    parser.add_argument('--summary', metavar='FILE.json', help='Write the aggregated summary here')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    parser.add_argument('--engine', choices=['stream', 'bs4'], default='stream')
+    parser.add_argument('--names', default=DEFAULT_NAMES, help='names.json with special_cases for the name simulation')
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print('No dumps found.', file=sys.stderr)
+        sys.exit(1)
+    special_cases = load_special_cases(args.names)
+
+    t0 = time.perf_counter()
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    records = []
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing is ~30 ms of startup
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            chunk = max(1, len(paths) // (max(1, args.workers) * 4))
+            for record in pool.map(analyze_one, paths, [args.engine] * len(paths),
+                                   [special_cases] * len(paths), chunksize=chunk):
+                records.append(record)
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+
+    summary = aggregate(records)
+    summary['engine'] = args.engine
+    summary['seconds'] = round(elapsed, 2)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"[BATCH] {summary['dumps']} dumps ({summary['total_mb']} MB) in {elapsed:.1f} s, "
+          f"{summary['errors']} errors, {summary['no_visible_description']} without a visible description, "
+          f"{summary['description_mismatch']} where first textarea != visible one", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
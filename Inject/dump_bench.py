@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Time and peak memory of dump-explorer's engines on real dumps.
+
+    python dump_bench.py ../OLD/old_device/gphotos_dump_*.html
+    python dump_bench.py --repeat 5 --json bench.json dump1.html dump2.html
+
+Each file is read once; parse + analysis time is measured per engine
+(best of --repeat runs) and peak Python allocation with tracemalloc in a
+separate run, so tracing overhead does not distort the timings. The two
+summaries are also compared, so a speed-up never hides a behaviour change.
+"""
+import argparse
+import gc
+import glob
+import importlib.util
+import json
+import os
+import time
+import tracemalloc
+
+from dump_scan import scan_html
+
+
+def _load_explorer():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dump-explorer.py')
+    spec = importlib.util.spec_from_file_location('dump_explorer', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn, html, path, repeat):
+    """Return (best seconds, peak bytes, summary) for one engine on one document."""
+    best = None
+    summary = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        summary = fn(html, path)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    gc.collect()
+    tracemalloc.start()
+    fn(html, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark stream vs bs4 dump analysis')
+    parser.add_argument('files', nargs='+', help='Dump files or globs')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per engine and file (default 3)')
+    parser.add_argument('--json', metavar='FILE', help='Write per-file results here')
+    args = parser.parse_args()
+
+    explorer = _load_explorer()
+    engines = {'stream': scan_html, 'bs4': explorer.summarize_with_bs4}
+
+    paths = []
+    for pattern in args.files:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    rows = []
+    print(f"{'file':<32}{'size':>9}{'stream ms':>11}{'bs4 ms':>9}{'speedup':>9}{'stream MB':>11}{'bs4 MB':>9}  match")
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        row = {'file': path, 'bytes': len(html.encode('utf-8'))}
+        summaries = {}
+        for name, fn in engines.items():
+            seconds, peak, summary = measure(fn, html, path, args.repeat)
+            row[name] = {'ms': round(seconds * 1000, 1), 'peak_mb': round(peak / 1e6, 2)}
+            summary.pop('engine')
+            summaries[name] = summary
+        row['match'] = summaries['stream'] == summaries['bs4']
+        row['speedup'] = round(row['bs4']['ms'] / row['stream']['ms'], 2) if row['stream']['ms'] else None
+        rows.append(row)
+        print(f"{os.path.basename(path)[:31]:<32}{row['bytes'] / 1e6:>8.2f}M"
+              f"{row['stream']['ms']:>11.0f}{row['bs4']['ms']:>9.0f}{row['speedup']:>8.1f}x"
+              f"{row['stream']['peak_mb']:>11.1f}{row['bs4']['peak_mb']:>9.1f}  {'yes' if row['match'] else 'NO'}")
+
+    if rows:
+        total = {name: sum(r[name]['ms'] for r in rows) for name in engines}
+        peak = {name: max(r[name]['peak_mb'] for r in rows) for name in engines}
+        print(f"{'total / max':<41}{total['stream']:>11.0f}{total['bs4']:>9.0f}"
+              f"{total['bs4'] / total['stream']:>8.1f}x{peak['stream']:>11.1f}{peak['bs4']:>9.1f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2)
+        print(f'Wrote {args.json}')
+
+
+if __name__ == '__main__':
+    main()
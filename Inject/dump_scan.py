@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""Single-pass dump analyzer used by dump-explorer.py (default engine).
+
+Walks a gphotos_dump_*.html once with html.parser, in the spirit of the
+TextareaFinder in OLD/old_device/dump.py, and collects everything the
+explorer reports - textareas, album chips (div.DgVY7 > div.AJM7gb), face
+chips (span.Y8X4Pc), title, <base> and canonical link - without building a
+tree. An explicit ancestor stack carries the inherited "hidden" flag and the
+ids of enclosing sidebar candidates (div.ZPTMcc / div.YW656b), so the
+sidebar root, which is only known once the first textarea is seen, can be
+resolved for every element at the end.
+
+    python dump_scan.py gphotos_dump_1762913731.html      # summary JSON
+    python dump_scan.py store:<photo id or dump id>        # from dump_store
+"""
+import json
+import sys
+from html.parser import HTMLParser
+
+from dump_store import read_dump
+
+
+# Elements that never get an end tag (bs4's html.parser builder treats them the same)
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+})
+
+SIDEBAR_CLASSES = ('ZPTMcc', 'YW656b')
+
+
+def _own_hidden(attrs):
+    """Same heuristic as dump-explorer's TreeAnnotations, for one element."""
+    if attrs.get('aria-hidden') == 'true':
+        return True
+    return 'display: none' in (attrs.get('style') or '').lower()
+
+
+class _Frame:
+    __slots__ = ('tag', 'node_id', 'hidden', 'ident', 'classes', 'elem_id', 'captures')
+
+    def __init__(self, tag, node_id, hidden, ident, classes, elem_id):
+        self.tag = tag
+        self.elem_id = elem_id
+        self.node_id = node_id
+        self.hidden = hidden
+        self.ident = ident
+        self.classes = classes
+        self.captures = None
+
+
+class DumpScanner(HTMLParser):
+    """Collect textareas, album/face chips and page context in one pass."""
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.next_id = 0
+        # Enclosing div.ZPTMcc / div.YW656b as (node_id, class, class0, id), outermost first
+        self.sidebar_stack = []
+        self.textareas = []
+        self.albums = []
+        self.faces = []
+        self.title = None
+        self.base_href = None
+        self.canonical_href = None
+        self._captures = []        # open text captures: lists of string parts
+        self._pending_albums = []  # open div.DgVY7 records still looking for their div.AJM7gb
+
+    # --- parser callbacks ---
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, void=tag in VOID_ELEMENTS)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, void=True)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                while len(self.stack) > i:
+                    self._close(self.stack.pop())
+                return
+        # Stray end tag: nothing open to close, same as bs4
+
+    def handle_data(self, data):
+        for parts in self._captures:
+            parts.append(data)
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._close(self.stack.pop())
+
+    # --- stack handling ---
+
+    def _open(self, tag, attr_list, void):
+        attrs = dict(attr_list)
+        parent = self.stack[-1] if self.stack else None
+        classes = (attrs.get('class') or '').split()
+        node_id = self.next_id
+        self.next_id += 1
+
+        if tag == 'body':
+            hidden = False  # the visibility walk stops at <body>
+        else:
+            hidden = (parent.hidden if parent else False) or _own_hidden(attrs)
+        ident = f"#{attrs['id']}" if attrs.get('id') else f'.{classes[0]}' if classes else ''
+        frame = _Frame(tag, node_id, hidden, ident, classes, attrs.get('id'))
+
+        if tag == 'textarea':
+            self._start_textarea(frame, attrs)
+        elif tag == 'div':
+            if 'AJM7gb' in classes and self._pending_albums:
+                self._start_album_name(frame)
+            if 'DgVY7' in classes:
+                album = {'text': None, 'hidden': None, 'sidebar': self._sidebar_ids(), 'node': node_id}
+                self.albums.append(album)
+                self._pending_albums.append(album)
+        elif tag == 'span' and 'Y8X4Pc' in classes:
+            face = {'text': '', 'hidden': hidden, 'sidebar': self._sidebar_ids()}
+            self.faces.append(face)
+            self._capture(frame, face, 'text')
+        elif tag == 'title' and self.title is None:
+            self._capture(frame, self, 'title')
+        elif tag == 'base' and self.base_href is None:
+            self.base_href = attrs.get('href')
+        elif tag == 'link' and self.canonical_href is None and 'canonical' in (attrs.get('rel') or '').split():
+            self.canonical_href = attrs.get('href')
+
+        if void:
+            self._close(frame)
+            return
+        self.stack.append(frame)
+        if tag == 'div':
+            for cls in SIDEBAR_CLASSES:
+                if cls in classes:
+                    self.sidebar_stack.append((node_id, cls, classes[0], attrs.get('id')))
+
+    def _close(self, frame):
+        if frame.captures:
+            for target, key, parts in frame.captures:
+                text = ''.join(parts)
+                if isinstance(target, dict):
+                    target[key] = text
+                else:
+                    setattr(target, key, text)
+                self._captures.remove(parts)
+        if frame.tag == 'div':
+            while self.sidebar_stack and self.sidebar_stack[-1][0] >= frame.node_id:
+                self.sidebar_stack.pop()
+            if 'DgVY7' in frame.classes:
+                self._pending_albums = [a for a in self._pending_albums if a['node'] != frame.node_id]
+
+    def _capture(self, frame, target, key):
+        parts = []
+        self._captures.append(parts)
+        if frame.captures is None:
+            frame.captures = []
+        frame.captures.append((target, key, parts))
+
+    def _sidebar_ids(self):
+        return tuple(entry[0] for entry in self.sidebar_stack)
+
+    # --- element records ---
+
+    def _start_textarea(self, frame, attrs):
+        div_index = None
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == 'div':
+                div_index = i
+                break
+        record = {
+            'id': attrs.get('id'),
+            'name': attrs.get('name'),
+            'aria_label': attrs.get('aria-label'),
+            'class': ' '.join(frame.classes) if frame.classes else None,
+            'value': '',
+            'hidden': frame.hidden,
+            'div_id': None,
+            'div_class': None,
+            'ancestor_path': None,
+            'sidebar': self._sidebar_ids(),
+            'sidebar_root': self._closest_sidebar_root(),
+        }
+        if div_index is not None:
+            div = self.stack[div_index]
+            record['div_id'] = div.elem_id
+            record['div_class'] = div.classes[0] if div.classes else None
+            path = []
+            for f in reversed(self.stack[:div_index + 1]):
+                if f.tag in ('html', 'body'):
+                    break
+                path.append(f'{f.tag.upper()}{f.ident}')
+            record['ancestor_path'] = ' > '.join(reversed(path))
+        self.textareas.append(record)
+        self._capture(frame, record, 'value')
+
+    def _closest_sidebar_root(self):
+        """Closest div.ZPTMcc ancestor, else the closest div.YW656b (like _find_closest_sidebar_root)."""
+        for cls in SIDEBAR_CLASSES:
+            for node_id, kind, class0, div_id in reversed(self.sidebar_stack):
+                if kind == cls:
+                    return {'node': node_id, 'class': class0, 'id': div_id}
+        return None
+
+    def _start_album_name(self, frame):
+        # Every open DgVY7 without a name takes its first AJM7gb descendant
+        shared = {'text': ''}
+        for album in self._pending_albums:
+            album['text'] = shared
+            album['hidden'] = frame.hidden
+        self._pending_albums = []
+        self._capture(frame, shared, 'text')
+
+
+def scan_html(html, file_path=None):
+    """Parse dump HTML in one pass and return the summary dict dump-explorer reports."""
+    scanner = DumpScanner()
+    scanner.feed(html)
+    scanner.close()
+
+    target = scanner.textareas[0] if scanner.textareas else None
+    root = target['sidebar_root'] if target else None
+    root_node = root['node'] if root else None
+
+    def located(record):
+        return root_node is not None and root_node in record['sidebar']
+
+    textareas = []
+    for i, ta in enumerate(scanner.textareas):
+        textareas.append({
+            'index': i + 1,
+            'id': ta['id'],
+            'name': ta['name'],
+            'aria_label': ta['aria_label'],
+            'class': ta['class'],
+            'value': ta['value'],
+            'div_id': ta['div_id'],
+            'div_class': ta['div_class'],
+            'ancestor_path': ta['ancestor_path'],
+            'hidden': ta['hidden'],
+            'in_sidebar': located(ta),
+        })
+    albums = []
+    for album in scanner.albums:
+        name = album['text']
+        albums.append({
+            'text': name['text'] if isinstance(name, dict) else None,
+            'hidden': album['hidden'],
+            'in_sidebar': located(album),
+        })
+    faces = [{'text': f['text'], 'hidden': f['hidden'], 'in_sidebar': located(f)} for f in scanner.faces]
+    return build_summary(file_path, 'stream', textareas, root, albums, faces,
+                         scanner.title, scanner.base_href, scanner.canonical_href)
+
+
+def album_candidates(albums):
+    """Visible album chip texts, without year-prefixed ones (e.g. "2019 Trip")."""
+    texts = [a['text'].strip() for a in albums if a['text'] and not a['hidden']]
+    return [t for t in texts if not (len(t) >= 4 and t[0:4].isdigit())]
+
+
+def face_candidates(faces):
+    """Visible face chip texts."""
+    return [f['text'].strip() for f in faces if f['text'].strip() and not f['hidden']]
+
+
+def build_summary(file_path, engine, textareas, sidebar_root, albums, faces, title, base_href, canonical_href):
+    """Assemble the engine-independent report; both engines end here."""
+    current_desc = (textareas[0]['value'] or '').strip() if textareas else '(EMPTY)'
+    full_url = canonical_href or base_href
+    return {
+        'file': file_path,
+        'engine': engine,
+        'title': title.strip() if title else None,
+        'base_href': base_href,
+        'canonical_href': canonical_href,
+        'url': full_url,
+        'short_url': full_url.split('/')[-1] if full_url else None,
+        'textareas': textareas,
+        'current_description': current_desc,
+        'sidebar_root': {'class': sidebar_root['class'], 'id': sidebar_root['id']} if sidebar_root else None,
+        'albums': albums,
+        'faces': faces,
+        'candidates': album_candidates(albums) + face_candidates(faces) if sidebar_root else [],
+    }
+
+
+def simulate_names(candidates, current_desc, special_cases):
+    """Pure version of _extract_and_add_names' filtering.
+    
+    Returns (names_to_append, steps); steps are (candidate, outcome, value)
+    in order, with outcome 'check' opening each candidate followed by
+    'year', 'zero', 'map', 'dup' or 'add'.
+    """
+    desc_normalized = ' '.join(current_desc.strip().split()).lower()
+    if desc_normalized == '(empty)':
+        desc_normalized = ''
+    names_to_append = []
+    steps = []
+    for original_name in candidates:
+        steps.append((original_name, 'check', None))
+        name_to_check = ' '.join(original_name.split())
+        if name_to_check and name_to_check[0:4].isdigit():
+            steps.append((original_name, 'year', None))
+            continue
+        if name_to_check and name_to_check.startswith('0'):
+            steps.append((original_name, 'zero', None))
+            continue
+        mapped_name = special_cases.get(name_to_check, name_to_check)
+        if mapped_name != name_to_check:
+            steps.append((original_name, 'map', mapped_name))
+        normalized_name_check = ' '.join(mapped_name.split()).lower()
+        if normalized_name_check in desc_normalized or normalized_name_check in [n.lower() for n in names_to_append]:
+            steps.append((original_name, 'dup', None))
+            continue
+        names_to_append.append(mapped_name)
+        steps.append((original_name, 'add', mapped_name))
+        desc_normalized += ' ' + normalized_name_check
+    return names_to_append, steps
+
+
+def load_special_cases(names_path):
+    """special_cases mapping from names.json, or {} when the file is missing."""
+    try:
+        with open(names_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('special_cases', {})
+    except FileNotFoundError:
+        return {}
+
+
+def visible_description(summary):
+    """Value of the first non-hidden Description textarea, the one the controller types into."""
+    for ta in summary['textareas']:
+        if ta['aria_label'] == 'Description' and not ta['hidden']:
+            return (ta['value'] or '').strip()
+    return None
+
+
+def scan_file(file_path):
+    """Summary of a dump file or a 'store:<ref>' dump."""
+    return scan_html(read_dump(file_path), file_path)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: python dump_scan.py <dump.html>')
+        sys.exit(2)
+    print(json.dumps(scan_file(sys.argv[1]), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Content-addressed, compressed store for page dumps (~/.googlephotos_dumps).
+
+Consecutive DMP presses produce 2+ MB pages that are almost identical, so
+each dump is cut into content-defined chunks at '<div' boundaries; a chunk
+boundary depends only on the bytes just before it, which keeps unchanged
+regions cutting into the same chunks from one dump to the next. Chunks are
+stored once, zlib compressed, under their sha256:
+
+    chunks/ab/abcdef....z          zlib(chunk bytes)
+    manifests/<dump sha256>.json   chunk list + metadata
+    index.jsonl                    one line per stored dump (photo id, time, url)
+
+Dumps are referred to by id (or a unique prefix of it), by photo id (latest
+dump of that photo) or as 'store:<ref>' by dump-explorer.py / dump_batch.py.
+
+    python dump_store.py list [--photo ID]
+    python dump_store.py export REF [-o out.html]
+    python dump_store.py import gphotos_dump_*.html
+    python dump_store.py stats
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import zlib
+
+from log_setup import get_logger
+
+
+log = get_logger('store')
+
+DEFAULT_ROOT = os.environ.get('GPHOTOS_DUMP_STORE') or os.path.join(os.path.expanduser('~'), '.googlephotos_dumps')
+STORE_PREFIX = 'store:'
+
+# Chunk sizes in bytes; a boundary cuts when the hash of the 32 bytes before it hits 1/CUT_MODULUS
+MIN_CHUNK = 4 * 1024
+MAX_CHUNK = 64 * 1024
+CUT_MODULUS = 16
+HASH_WINDOW = 32
+# Cut candidates in order of preference: element starts, then array
+# separators inside the large AF_initDataCallback script blobs
+BOUNDARIES = (b'<div', b'],[')
+
+PHOTO_ID_RE = re.compile(r'/photo/([A-Za-z0-9_-]+)')
+DUMP_TS_RE = re.compile(r'gphotos_dump_(\d+)')
+
+
+def _next_cut(data, start):
+    """End of the chunk starting at `start`."""
+    limit = min(start + MAX_CHUNK, len(data))
+    for token in BOUNDARIES:
+        pos = data.find(token, start + MIN_CHUNK, limit)
+        while pos != -1:
+            if zlib.crc32(data[pos - HASH_WINDOW:pos]) % CUT_MODULUS == 0:
+                return pos
+            pos = data.find(token, pos + 1, limit)
+    # No natural cut in range: force one so chunks stay bounded
+    return limit
+
+
+def chunk_boundaries(data):
+    """Yield (start, end) of content-defined chunks of data (bytes)."""
+    start = 0
+    while start < len(data):
+        end = _next_cut(data, start)
+        yield start, end
+        start = end
+
+
+def photo_id_from_url(url):
+    m = PHOTO_ID_RE.search(url or '')
+    return m.group(1) if m else None
+
+
+class DumpStore:
+    """Chunked, deduplicated dump storage rooted at a directory."""
+
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_ROOT
+        self.chunk_dir = os.path.join(self.root, 'chunks')
+        self.manifest_dir = os.path.join(self.root, 'manifests')
+        self.index_path = os.path.join(self.root, 'index.jsonl')
+
+    def _chunk_path(self, chunk_id):
+        return os.path.join(self.chunk_dir, chunk_id[:2], chunk_id + '.z')
+
+    def _manifest_path(self, dump_id):
+        return os.path.join(self.manifest_dir, dump_id + '.json')
+
+    def put(self, html, url=None, photo_id=None, source=None, ts=None):
+        """Store one dump; returns its index entry (id, sizes, new bytes written)."""
+        t0 = time.perf_counter()
+        data = html.encode('utf-8') if isinstance(html, str) else html
+        dump_id = hashlib.sha256(data).hexdigest()
+        entry = {
+            'id': dump_id,
+            'ts': ts if ts is not None else time.time(),
+            'photo_id': photo_id or photo_id_from_url(url),
+            'url': url,
+            'size': len(data),
+            'source': source,
+        }
+        new_chunks = 0
+        new_bytes = 0
+        chunk_ids = []
+        if not os.path.exists(self._manifest_path(dump_id)):
+            os.makedirs(self.manifest_dir, exist_ok=True)
+            for start, end in chunk_boundaries(data):
+                piece = data[start:end]
+                chunk_id = hashlib.sha256(piece).hexdigest()
+                chunk_ids.append(chunk_id)
+                path = self._chunk_path(chunk_id)
+                if os.path.exists(path):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                packed = zlib.compress(piece, 6)
+                tmp = path + '.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(packed)
+                os.replace(tmp, path)
+                new_chunks += 1
+                new_bytes += len(packed)
+            manifest = dict(entry, chunks=chunk_ids)
+            with open(self._manifest_path(dump_id), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+        entry['chunks'] = len(chunk_ids)
+        entry['new_chunks'] = new_chunks
+        entry['new_bytes'] = new_bytes
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        entry['ms'] = round((time.perf_counter() - t0) * 1000, 1)
+        return entry
+
+    def entries(self):
+        """Index entries, oldest first."""
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def resolve(self, ref):
+        """Dump id for a full id, unique id prefix or photo id (latest dump wins)."""
+        ref = ref[len(STORE_PREFIX):] if ref.startswith(STORE_PREFIX) else ref
+        if os.path.exists(self._manifest_path(ref)):
+            return ref
+        entries = self.entries()
+        by_photo = [e for e in entries if e.get('photo_id') == ref]
+        if by_photo:
+            return max(by_photo, key=lambda e: e['ts'])['id']
+        matches = {e['id'] for e in entries if e['id'].startswith(ref)}
+        if len(matches) == 1:
+            return matches.pop()
+        raise KeyError(f'{ref!r} matches {len(matches)} dumps' if matches else f'no dump {ref!r} in {self.root}')
+
+    def get_bytes(self, ref):
+        dump_id = self.resolve(ref)
+        with open(self._manifest_path(dump_id), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        parts = []
+        for chunk_id in manifest['chunks']:
+            with open(self._chunk_path(chunk_id), 'rb') as f:
+                parts.append(zlib.decompress(f.read()))
+        data = b''.join(parts)
+        if hashlib.sha256(data).hexdigest() != dump_id:
+            raise ValueError(f'dump {dump_id} is corrupt')
+        return data
+
+    def get_text(self, ref):
+        return self.get_bytes(ref).decode('utf-8')
+
+    def stats(self):
+        entries = self.entries()
+        unique = {e['id']: e['size'] for e in entries}
+        stored = 0
+        chunk_count = 0
+        for dirpath, _, files in os.walk(self.chunk_dir):
+            for name in files:
+                if name.endswith('.z'):
+                    chunk_count += 1
+                    stored += os.path.getsize(os.path.join(dirpath, name))
+        logical = sum(unique.values())
+        return {
+            'root': self.root,
+            'dumps': len(unique),
+            'puts': len(entries),
+            'photos': len({e['photo_id'] for e in entries if e.get('photo_id')}),
+            'chunks': chunk_count,
+            'logical_mb': round(logical / 1e6, 2),
+            'stored_mb': round(stored / 1e6, 2),
+            'ratio': round(logical / stored, 1) if stored else None,
+        }
+
+
+class DumpWriter:
+    """Stores dumps on a background thread so the caller only pays for grabbing the HTML.
+
+    submit() queues (html, metadata) and returns at once; chunking, zlib
+    and the file writes run on the writer thread, which logs the stored
+    id. close() waits for queued dumps to be written.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or DumpStore()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, html, **meta):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='dump-writer', daemon=True)
+            self._thread.start()
+        self._queue.put((html, meta))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            html, meta = item
+            try:
+                entry = self.store.put(html, **meta)
+                log.info(f"[DUMP] Stored {entry['size'] / 1e6:.2f} MB as store:{entry['id'][:12]} "
+                         f"(+{entry['new_bytes'] / 1024:.0f} KB, {entry['new_chunks']}/{entry['chunks']} new chunks, "
+                         f"{entry['ms']:.0f} ms) in {self.store.root}")
+            except Exception as e:
+                log.exception(f'[DUMP] ERROR storing dump: {e}')
+
+    def close(self, timeout=10):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+
+def read_dump(ref):
+    """Text of a dump given a file path or a 'store:<ref>' reference."""
+    if ref.startswith(STORE_PREFIX):
+        return DumpStore().get_text(ref)
+    with open(ref, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def store_refs():
+    """'store:<id>' for every distinct stored dump, oldest first."""
+    seen = {}
+    for e in DumpStore().entries():
+        seen.setdefault(e['id'], None)
+    return [STORE_PREFIX + dump_id for dump_id in seen]
+
+
+def dump_size(ref):
+    """Uncompressed size in bytes of a dump file or 'store:<ref>'."""
+    if ref.startswith(STORE_PREFIX):
+        store = DumpStore()
+        dump_id = store.resolve(ref)
+        return next(e['size'] for e in store.entries() if e['id'] == dump_id)
+    return os.path.getsize(ref)
+
+
+def dump_exists(ref):
+    if ref.startswith(STORE_PREFIX):
+        try:
+            DumpStore().resolve(ref)
+            return True
+        except KeyError:
+            return False
+    return os.path.exists(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed dump store')
+    parser.add_argument('--root', default=None, help=f'Store directory (default {DEFAULT_ROOT})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_list = sub.add_parser('list', help='List stored dumps')
+    p_list.add_argument('--photo', help='Only dumps of this photo id')
+    p_export = sub.add_parser('export', help='Write a dump back out as HTML')
+    p_export.add_argument('ref', help='Dump id, id prefix or photo id')
+    p_export.add_argument('-o', '--output', help='Output file (default stdout)')
+    p_import = sub.add_parser('import', help='Add existing gphotos_dump_*.html files')
+    p_import.add_argument('files', nargs='+')
+    sub.add_parser('stats', help='Dump count, chunk count and compression ratio')
+    args = parser.parse_args()
+
+    store = DumpStore(args.root)
+    if args.command == 'list':
+        for e in store.entries():
+            if args.photo and e.get('photo_id') != args.photo:
+                continue
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(e['ts']))
+            print(f"{e['id'][:12]}  {when}  {e.get('photo_id') or '-':<24} {e['size'] / 1e6:>6.2f} MB  "
+                  f"+{e.get('new_bytes', 0) / 1024:.0f} KB  {e.get('source') or e.get('url') or ''}")
+    elif args.command == 'export':
+        data = store.get_bytes(args.ref)
+        if args.output:
+            with open(args.output, 'wb') as f:
+                f.write(data)
+            print(f'Wrote {len(data)} bytes to {args.output}')
+        else:
+            sys.stdout.buffer.write(data)
+    elif args.command == 'import':
+        paths = []
+        for pattern in args.files:
+            paths.extend(sorted(glob.glob(pattern)) or [pattern])
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            m = DUMP_TS_RE.search(os.path.basename(path))
+            ts = int(m.group(1)) if m else os.path.getmtime(path)
+            text = data.decode('utf-8', errors='replace')
+            canonical = re.search(r'<link[^>]+rel="canonical"[^>]+href="([^"]+)"', text)
+            url = canonical.group(1) if canonical else None
+            entry = store.put(data, url=url, source=os.path.basename(path), ts=ts)
+            print(f"{entry['id'][:12]}  {path}  {entry['size'] / 1e6:.2f} MB -> +{entry['new_bytes'] / 1024:.0f} KB "
+                  f"({entry['new_chunks']}/{entry['chunks']} new chunks, {entry['ms']:.0f} ms)")
+    elif args.command == 'stats':
+        for k, v in store.stats().items():
+            print(f'{k:<12} {v}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""Local stand-in for the parts of Google Photos that BrowserController uses.
+
+Serves a single-page photo viewer that mimics the DOM the controller relies
+on, so navigation/typing/name injection can be exercised and timed offline:
+
+  - /photo/<id> viewer with a large img[alt="View photo"]; ArrowLeft/ArrowRight
+    (when the description is not focused) load the neighbour and pushState
+    the URL, like the real SPA
+  - a visible textarea[aria-label="Description"] inside .ZPTMcc, plus stale
+    copies of previous panels kept under aria-hidden / display:none parents
+  - face chips (span.Y8X4Pc) and album chips (div.DgVY7 > div.AJM7gb),
+    including year-prefixed albums the controller must skip
+  - descriptions saved back through /api/photo/<id>, optionally persisted
+  - /grid, a virtualized library grid of ./photo/<id> links for grid_harvester.py
+
+Usage:
+    python fake_photos_server.py --port 8765 --photos 200 --latency-ms 80
+    python inject.py --base-url http://127.0.0.1:8765
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log_setup import configure, get_logger
+
+
+log = get_logger('fake')
+
+DEFAULT_PORT = 8765
+
+PEOPLE = [
+    'Dennis', 'Graeme', 'Juliet', 'Tim Denny', 'Audrey', 'Kiki', 'Yolanda',
+    'Ken', 'Leslie', 'Frank', 'Olivia', 'Harry',
+]
+ALBUMS = [
+    '2019 Hawaii', '2021-07 Camping', '1998 Wedding', 'Family', 'Dennis', 'Juliet', 'Pets',
+]
+# Number of stale panel copies kept hidden in the DOM, like the real site
+STALE_PANELS = 2
+
+PHOTO_PATH_RE = re.compile(r'^/photo/([A-Za-z0-9_-]+)$')
+API_PATH_RE = re.compile(r'^/api/photo/([A-Za-z0-9_-]+)$')
+IMAGE_PATH_RE = re.compile(r'^/img/([A-Za-z0-9_-]+)\.svg$')
+
+
+def generate_photos(count, max_faces=3, seed=1):
+    """Deterministic album of `count` photos with random faces/albums/descriptions."""
+    rng = random.Random(seed)
+    photos = {}
+    for i in range(count):
+        photo_id = f'AF1Qip{i:05d}'
+        faces = rng.sample(PEOPLE, rng.randint(0, max_faces))
+        albums = rng.sample(ALBUMS, rng.randint(0, 2))
+        description = rng.choice(['', '', 'Beach day ', 'Dennis Juliet ', 'x' * 200 + ' '])
+        photos[photo_id] = {'description': description, 'faces': faces, 'albums': albums}
+    return photos
+
+
+class PhotoStore:
+    """Ordered photo records with optional JSON persistence."""
+
+    def __init__(self, photos, state_path=None):
+        self.photos = photos
+        self.order = list(photos)
+        self.state_path = state_path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, state_path=None, count=100, max_faces=3, seed=1):
+        """Load persisted state if present, otherwise generate a fresh album."""
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                photos = json.load(f)
+            log.info(f'[FAKE] Loaded {len(photos)} photos from {state_path}')
+        else:
+            photos = generate_photos(count, max_faces=max_faces, seed=seed)
+        return cls(photos, state_path)
+
+    def get(self, photo_id):
+        """Photo record with prev/next ids, or None."""
+        with self._lock:
+            photo = self.photos.get(photo_id)
+            if photo is None:
+                return None
+            i = self.order.index(photo_id)
+            return {
+                'id': photo_id,
+                'index': i,
+                'prev': self.order[i - 1] if i > 0 else None,
+                'next': self.order[i + 1] if i + 1 < len(self.order) else None,
+                **photo,
+            }
+
+    def update_all(self, start=0, **fields):
+        """Overwrite fields (faces, albums, description) on every photo from index start on."""
+        with self._lock:
+            for photo_id in self.order[start:]:
+                self.photos[photo_id].update({k: (list(v) if isinstance(v, list) else v) for k, v in fields.items()})
+
+    def set_description(self, photo_id, description):
+        with self._lock:
+            if photo_id not in self.photos:
+                return False
+            self.photos[photo_id]['description'] = description
+            if self.state_path:
+                tmp = self.state_path + '.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(self.photos, f, indent=1)
+                os.replace(tmp, self.state_path)
+            return True
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Photo - Google Photos</title>
+<style>
+  body { margin: 0; font-family: sans-serif; display: flex; height: 100vh; }
+  #viewer { flex: 1; display: flex; align-items: center; justify-content: center; background: #111; }
+  #viewer img { width: 640px; height: 480px; }
+  .YW656b { width: 360px; overflow-y: auto; padding: 12px; }
+  .ZPTMcc textarea { width: 320px; height: 80px; }
+  .Y8X4Pc { display: inline-block; margin: 4px; padding: 2px 6px; background: #eee; border-radius: 8px; }
+  .DgVY7 { margin: 4px 0; }
+</style></head>
+<body>
+<div id="viewer"><img alt="View photo" role="button" jsname="img" tabindex="0"></div>
+<div class="YW656b" role="complementary" data-has-scrollable="true"><div id="stale"></div><div id="current"></div></div>
+<script>
+const NAV_DELAY_MS = __NAV_DELAY_MS__;
+let photo = null;
+let saveTimer = null;
+
+function esc(s) {
+  return String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+}
+
+function panelHtml(p) {
+  const faces = p.faces.map(n => `<span class="Y8X4Pc">${esc(n)}</span>`).join('');
+  const albums = p.albums.map(a => `<div class="DgVY7"><div class="AJM7gb">${esc(a)}</div></div>`).join('');
+  return `<div class="ZPTMcc" data-photo="${esc(p.id)}">
+    <textarea aria-label="Description" placeholder="Add a description">${esc(p.description)}</textarea>
+    <div class="faces">${faces}</div><div class="albums">${albums}</div></div>`;
+}
+
+function saveNow() {
+  if (saveTimer) { clearTimeout(saveTimer); saveTimer = null; }
+  const ta = document.querySelector('#current textarea');
+  if (!photo || !ta || ta.value === photo.description) return;
+  photo.description = ta.value;
+  fetch(`/api/photo/${photo.id}`, {method: 'POST', headers: {'Content-Type': 'application/json'},
+                                   body: JSON.stringify({description: ta.value}), keepalive: true});
+}
+
+function render(p) {
+  // Keep the previous panel around, hidden, like the real site does
+  const stale = document.getElementById('stale');
+  const old = document.querySelector('#current .ZPTMcc');
+  if (old) {
+    const wrap = document.createElement('div');
+    if (stale.children.length % 2) { wrap.setAttribute('style', 'display: none'); }
+    else { wrap.setAttribute('aria-hidden', 'true'); wrap.style.height = '0'; wrap.style.overflow = 'hidden'; }
+    wrap.appendChild(old);
+    stale.insertBefore(wrap, stale.firstChild);
+    while (stale.children.length > __STALE_PANELS__) stale.removeChild(stale.lastChild);
+  }
+  photo = p;
+  document.querySelector('#viewer img').src = `/img/${p.id}.svg`;
+  document.getElementById('current').innerHTML = panelHtml(p);
+  document.querySelector('#current textarea').addEventListener('input', () => {
+    if (saveTimer) clearTimeout(saveTimer);
+    saveTimer = setTimeout(saveNow, 300);
+  });
+  document.querySelector('#current textarea').addEventListener('blur', saveNow);
+}
+
+async function load(id, push) {
+  const resp = await fetch(`/api/photo/${id}`);
+  if (!resp.ok) return;
+  const p = await resp.json();
+  if (NAV_DELAY_MS) await new Promise(r => setTimeout(r, NAV_DELAY_MS));
+  render(p);
+  if (push) history.pushState({id: p.id}, '', `/photo/${p.id}`);
+}
+
+document.addEventListener('keydown', (e) => {
+  const a = document.activeElement;
+  if (a && a.tagName === 'TEXTAREA') return;
+  if (!photo) return;
+  const target = e.key === 'ArrowRight' ? photo.next : e.key === 'ArrowLeft' ? photo.prev : null;
+  if (target) { saveNow(); load(target, true); e.preventDefault(); }
+});
+window.addEventListener('popstate', (e) => { if (e.state && e.state.id) load(e.state.id, false); });
+window.addEventListener('beforeunload', saveNow);
+
+history.replaceState({id: '__PHOTO_ID__'}, '', '/photo/__PHOTO_ID__');
+load('__PHOTO_ID__', false);
+</script>
+</body></html>
+"""
+
+
+# Virtualized library grid: only the rows around the viewport are in the DOM,
+# re-rendered on scroll (after the nav delay), like the real photo grid
+GRID_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Photos - Library</title>
+<style>
+body { margin: 0; font-family: sans-serif; }
+#scroller { position: absolute; inset: 0; overflow-y: auto; }
+#spacer { position: relative; }
+.tile { position: absolute; width: 150px; height: 150px; }
+.tile img { width: 146px; height: 146px; }
+</style></head>
+<body>
+<div id="scroller" role="main"><div id="spacer"></div></div>
+<script>
+const ROW = 154, COLS = 6, OVERSCAN = 2, DELAY = __NAV_DELAY_MS__;
+let ids = [];
+const scroller = document.getElementById('scroller');
+const spacer = document.getElementById('spacer');
+function render() {
+  const first = Math.max(0, Math.floor(scroller.scrollTop / ROW) - OVERSCAN);
+  const last = Math.ceil((scroller.scrollTop + scroller.clientHeight) / ROW) + OVERSCAN;
+  const html = [];
+  for (let i = first * COLS; i < Math.min(ids.length, last * COLS); i++) {
+    const top = Math.floor(i / COLS) * ROW, left = (i % COLS) * 154;
+    html.push(`<a class="tile" style="top:${top}px;left:${left}px" href="./photo/${ids[i]}" aria-label="Photo ${i + 1}">` +
+              `<img src="/img/${ids[i]}.svg" alt=""></a>`);
+  }
+  spacer.innerHTML = html.join('');
+}
+let pending = null;
+scroller.addEventListener('scroll', () => {
+  if (pending) return;
+  pending = setTimeout(() => { pending = null; render(); }, DELAY);
+});
+fetch('/api/photos').then(r => r.json()).then(data => {
+  ids = data.ids;
+  spacer.style.height = Math.ceil(ids.length / COLS) * ROW + 'px';
+  render();
+});
+</script>
+</body></html>
+"""
+
+
+def image_svg(photo_id, index):
+    hue = (index * 47) % 360
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="640" height="480">'
+            f'<rect width="100%" height="100%" fill="hsl({hue},45%,45%)"/>'
+            f'<text x="50%" y="50%" font-size="48" text-anchor="middle" fill="#fff">#{index} {photo_id}</text>'
+            f'</svg>')
+
+
+class FakePhotosHandler(BaseHTTPRequestHandler):
+    """Request handler; server.store / latency_ms / nav_delay_ms are set by make_server."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *args):
+        log.debug('[FAKE] ' + fmt % args)
+
+    def _delay(self):
+        latency = self.server.latency_ms
+        if latency:
+            time.sleep(latency / 1000.0)
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, obj):
+        self._send(status, json.dumps(obj), 'application/json')
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        store = self.server.store
+        if path == '/grid':
+            self._delay()
+            self._send(200, GRID_TEMPLATE.replace('__NAV_DELAY_MS__', str(self.server.nav_delay_ms)))
+            return
+        if path in ('/', '/photos'):
+            self._send(302, '', headers={'Location': f'/photo/{store.order[0]}'})
+            return
+        m = PHOTO_PATH_RE.match(path)
+        if m and store.get(m.group(1)):
+            self._delay()
+            page = (PAGE_TEMPLATE.replace('__PHOTO_ID__', m.group(1))
+                    .replace('__NAV_DELAY_MS__', str(self.server.nav_delay_ms))
+                    .replace('__STALE_PANELS__', str(STALE_PANELS)))
+            self._send(200, page)
+            return
+        m = API_PATH_RE.match(path)
+        if m:
+            self._delay()
+            photo = store.get(m.group(1))
+            if photo is None:
+                self._send_json(404, {'error': 'not found'})
+            else:
+                self._send_json(200, photo)
+            return
+        if path == '/api/photos':
+            self._send_json(200, {'ids': store.order})
+            return
+        m = IMAGE_PATH_RE.match(path)
+        if m and store.get(m.group(1)):
+            self._send(200, image_svg(m.group(1), store.order.index(m.group(1))), 'image/svg+xml')
+            return
+        self._send(404, 'not found', 'text/plain')
+
+    def do_POST(self):
+        m = API_PATH_RE.match(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if not m:
+            self._send(404, 'not found', 'text/plain')
+            return
+        self._delay()
+        try:
+            description = json.loads(body or b'{}')['description']
+        except Exception:
+            self._send_json(400, {'error': 'expected {"description": ...}'})
+            return
+        if self.server.store.set_description(m.group(1), description):
+            log.debug('[FAKE] Saved %s: %.60r', m.group(1), description)
+            self._send_json(200, {'ok': True})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+
+def make_server(store, host='127.0.0.1', port=DEFAULT_PORT, latency_ms=0, nav_delay_ms=0):
+    """Build (not start) the HTTP server; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), FakePhotosHandler)
+    server.daemon_threads = True
+    server.store = store
+    server.latency_ms = latency_ms
+    server.nav_delay_ms = nav_delay_ms
+    return server
+
+
+def start_in_thread(store, **kwargs):
+    """Start a server on a daemon thread; returns (server, base_url)."""
+    server = make_server(store, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Google Photos stand-in for offline testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--photos', type=int, default=100, help='Number of photos to generate (default 100)')
+    parser.add_argument('--max-faces', type=int, default=3, help='Max face chips per photo (default 3)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency-ms', type=int, default=0, help='Server delay added to every page/API request')
+    parser.add_argument('--nav-delay-ms', type=int, default=0, help='Client-side render delay after ArrowLeft/Right')
+    parser.add_argument('--state', metavar='FILE.json', help='Load/persist photo descriptions here')
+    args = parser.parse_args()
+
+    configure('INFO')
+    store = PhotoStore.load(args.state, count=args.photos, max_faces=args.max_faces, seed=args.seed)
+    server = make_server(store, args.host, args.port, args.latency_ms, args.nav_delay_ms)
+    host, port = server.server_address[:2]
+    log.info(f'[FAKE] Serving {len(store.order)} photos at http://{host}:{port}/ (latency {args.latency_ms} ms)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Collect the photo ids of an album or search grid into a PhotoIndex.
+
+Google Photos renders grids virtually: only the rows near the viewport
+exist in the DOM, so the ids have to be picked up while scrolling. The
+harvester opens the grid, then repeatedly reads every photo link that is
+rendered, appends the unseen ones to the index (streamed to disk), scrolls
+the grid's scroll container by most of a screen and waits until the
+rendered links change. It stops once the container sits at the bottom and
+a few scrolls in a row brought nothing new.
+
+    python grid_harvester.py --album AF1QipM...            # index "album-AF1QipM..."
+    python grid_harvester.py --search "June 2019" --headful
+    python grid_harvester.py --album https://photos.google.com/album/AF1QipM... --name trip
+    python grid_harvester.py --base-url http://127.0.0.1:8765 --url http://127.0.0.1:8765/grid
+
+Afterwards photo_index.py get NAME N gives the URL of photo N.
+"""
+import argparse
+import sys
+import time
+from urllib.parse import quote
+
+import log_setup
+from browser_controller import BrowserController
+from dump_store import photo_id_from_url
+from page_ops import AdaptiveWait
+from photo_index import PhotoIndex, index_name
+
+
+log = log_setup.get_logger('harvest')
+
+# Rendered photo links (in document order) plus the state of the grid's
+# scroll container: the largest scrollable element, else the document
+_GRID_STATE_JS = """() => {
+    const hrefs = [];
+    for (const a of document.querySelectorAll('a[href*="photo/"]')) {
+        hrefs.push(a.href);
+    }
+    let box = window.__harvestBox && window.__harvestBox.isConnected ? window.__harvestBox : null;
+    let best = box ? Infinity : document.scrollingElement.scrollHeight - document.scrollingElement.clientHeight;
+    box = box || document.scrollingElement;
+    for (const el of best === Infinity ? [] : document.querySelectorAll('div, c-wiz, main')) {
+        const extra = el.scrollHeight - el.clientHeight;
+        if (extra > best && el.clientHeight > 200) {
+            const overflow = getComputedStyle(el).overflowY;
+            if (overflow === 'auto' || overflow === 'scroll') {
+                box = el;
+                best = extra;
+            }
+        }
+    }
+    window.__harvestBox = box;
+    return {
+        hrefs: hrefs,
+        scrollTop: box.scrollTop,
+        atBottom: box.scrollTop + box.clientHeight >= box.scrollHeight - 2,
+    };
+}"""
+
+_SCROLL_JS = """(fraction) => {
+    const box = window.__harvestBox || document.scrollingElement;
+    box.scrollTop += Math.max(100, box.clientHeight * fraction);
+    const links = document.querySelectorAll('a[href*="photo/"]');
+    return links.length ? links[links.length - 1].href : null;
+}"""
+
+_CHANGED_JS = """(lastHref) => {
+    const links = document.querySelectorAll('a[href*="photo/"]');
+    return links.length > 0 && links[links.length - 1].href !== lastHref;
+}"""
+
+
+def grid_url(base_url, album=None, search=None, url=None):
+    if url:
+        return url
+    if album:
+        return album if album.startswith('http') else f'{base_url}/album/{album}'
+    return f'{base_url}/search/{quote(search)}'
+
+
+def harvest(ctl, url, index, patience=3, max_scrolls=100000, fraction=0.8):
+    """Scroll the grid at `url` to the end, adding photo ids to `index`; runs on the worker.
+
+    Returns {'found', 'new', 'scrolls', 'seconds'}.
+    """
+    wait = AdaptiveWait('grid', initial_ms=1500, min_ms=150, max_ms=5000)
+    started = time.perf_counter()
+    ctl.page.goto(url, wait_until='domcontentloaded')
+    try:
+        ctl.page.wait_for_selector('a[href*="photo/"]', timeout=15000)
+    except Exception:
+        log.warning(f'[HARVEST] No photo links rendered at {url}')
+    seen = set()
+    new_total = 0
+    idle = 0
+    scrolls = 0
+    while scrolls < max_scrolls:
+        state = ctl.page.evaluate(_GRID_STATE_JS)
+        items = []
+        for href in state['hrefs']:
+            photo_id = photo_id_from_url(href)
+            if photo_id and photo_id not in seen:
+                seen.add(photo_id)
+                items.append((photo_id, href))
+        new = index.add_many(items, source=url)
+        new_total += new
+        idle = 0 if items else idle + 1
+        if items:
+            log.info(f'[HARVEST] {len(seen)} photos seen, {new_total} new in {index.name} (scroll {scrolls})')
+        if state['atBottom'] and idle >= patience:
+            break
+        if idle >= patience * 5:
+            log.warning('[HARVEST] Grid stopped growing before reaching the bottom; stopping')
+            break
+        last = ctl.page.evaluate(_SCROLL_JS, fraction)
+        scrolls += 1
+        try:
+            wait.run(lambda timeout: ctl.page.wait_for_function(_CHANGED_JS, arg=last, timeout=timeout))
+        except Exception:
+            pass  # nothing new rendered within the wait; the next read decides
+    return {'found': len(seen), 'new': new_total, 'scrolls': scrolls,
+            'seconds': round(time.perf_counter() - started, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Harvest photo ids from an album or search grid')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--album', help='Album id or URL')
+    target.add_argument('--search', help='Search query, e.g. a date range like "June 2019"')
+    target.add_argument('--url', help='Any grid URL')
+    parser.add_argument('--name', help='Index name (default from the album id / query)')
+    parser.add_argument('--patience', type=int, default=3, help='Scrolls without new photos at the bottom before stopping')
+    parser.add_argument('--headful', action='store_true', help='Show the browser window')
+    parser.add_argument('--base-url', help='Open this instead of https://photos.google.com (e.g. fake_photos_server.py)')
+    parser.add_argument('--channel', default='chrome', help="Browser channel ('chrome'; empty for bundled Chromium)")
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO')
+    args = parser.parse_args()
+    log_setup.configure(args.log_level)
+
+    ctl = BrowserController(base_url=args.base_url, channel=args.channel or None)
+    url = grid_url(ctl.base_url, args.album, args.search, args.url)
+    name = args.name or index_name(f'album-{args.album}' if args.album else f'search-{args.search}' if args.search else url)
+    index = PhotoIndex(name)
+    log.info(f'[HARVEST] {url} -> index {name} ({len(index)} photos already)')
+    ctl.start(headful=args.headful)
+    if ctl.page is None:  # start() already logged why
+        sys.exit(1)
+    try:
+        result = ctl.run_on_worker(harvest, url, index, patience=args.patience)
+    finally:
+        ctl.stop()
+    log.info(f"[HARVEST] Done: {result['found']} photos in the grid, {result['new']} new, "
+             f"{len(index)} in {index.path} ({result['scrolls']} scrolls, {result['seconds']} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Replay recorded Google Photos sessions (HAR) with their original network timing.
+
+BrowserController(record_har_path=...) records a real session; replaying
+it offline comes in two flavours:
+
+  - fast-forward: Playwright's own context.route_from_har, every response
+    is served immediately, so what is left is our DOM/keyboard work
+  - timed (default): install_timed_replay() serves the same responses but
+    holds each one for its recorded duration, so a replayed session costs
+    what the live one did
+
+The gap between the two is the network share of per-photo time. The
+summary command shows where the recorded time went:
+
+    python har_replay.py summary session.har
+"""
+import base64
+import json
+import sys
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from log_setup import get_logger
+
+
+log = get_logger('har')
+
+# Query parameters that change on every request (request ids, cache busters)
+VOLATILE_PARAMS = frozenset({'_reqid', 'zx', 'rt', 'ct', 'bl', 'f.sid'})
+
+
+def normalize_url(url):
+    """URL without fragment and volatile query parameters, for fuzzy matching."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ''))
+
+
+def entry_time_ms(entry):
+    """Recorded wall time of one HAR entry, in milliseconds."""
+    total = entry.get('time')
+    if isinstance(total, (int, float)) and total >= 0:
+        return float(total)
+    timings = entry.get('timings', {})
+    return float(sum(v for v in timings.values() if isinstance(v, (int, float)) and v > 0))
+
+
+def load_har(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['log']['entries']
+
+
+class HarIndex:
+    """Recorded responses looked up by method + URL, served in recorded order.
+
+    Exact URL matches win, then the URL with volatile parameters stripped,
+    then method + path. Repeated requests walk through the recorded
+    responses for that key and then keep returning the last one.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._exact = defaultdict(list)
+        self._normal = defaultdict(list)
+        self._path = defaultdict(list)
+        self._cursor = defaultdict(int)
+        for entry in entries:
+            req = entry['request']
+            method = req.get('method', 'GET')
+            self._exact[(method, req['url'])].append(entry)
+            self._normal[(method, normalize_url(req['url']))].append(entry)
+            self._path[(method, urlsplit(req['url']).path)].append(entry)
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_har(path))
+
+    def lookup(self, method, url):
+        """Next recorded entry for this request, or None."""
+        for table, key in ((self._exact, ('E', method, url)),
+                           (self._normal, ('N', method, normalize_url(url))),
+                           (self._path, ('P', method, urlsplit(url).path))):
+            candidates = table.get(key[1:])
+            if candidates:
+                i = self._cursor[key]
+                self._cursor[key] = i + 1
+                return candidates[min(i, len(candidates) - 1)]
+        return None
+
+
+def response_from_entry(entry):
+    """(status, headers, body bytes) for route.fulfill from a HAR entry."""
+    resp = entry['response']
+    content = resp.get('content', {})
+    text = content.get('text') or ''
+    body = base64.b64decode(text) if content.get('encoding') == 'base64' else text.encode('utf-8')
+    # Length/encoding headers describe the original wire format, not this body
+    skip = {'content-length', 'content-encoding', 'transfer-encoding'}
+    headers = {h['name']: h['value'] for h in resp.get('headers', []) if h['name'].lower() not in skip}
+    return resp.get('status', 200), headers, body
+
+
+def install_timed_replay(context, page, har_path, speed=1.0):
+    """Serve every request of `context` from the HAR, delayed by its recorded time.
+
+    Requests missing from the HAR are aborted, so nothing reaches the
+    network. speed=2.0 replays twice as fast. The delay uses
+    page.wait_for_timeout, which lets Playwright keep serving other routes
+    while this one waits.
+    """
+    index = HarIndex.from_file(har_path)
+    stats = {'served': 0, 'missing': 0, 'delay_ms': 0.0}
+
+    def _handle(route, request):
+        entry = index.lookup(request.method, request.url)
+        if entry is None:
+            stats['missing'] += 1
+            log.debug('[HAR] Not in recording, aborting: %s %s', request.method, request.url[:120])
+            route.abort()
+            return
+        delay = entry_time_ms(entry) / speed
+        if delay >= 1:
+            page.wait_for_timeout(delay)
+        status, headers, body = response_from_entry(entry)
+        route.fulfill(status=status, headers=headers, body=body)
+        stats['served'] += 1
+        stats['delay_ms'] += delay
+
+    context.route('**/*', _handle)
+    log.info(f'[HAR] Timed replay of {len(index.entries)} recorded requests from {har_path}')
+    return stats
+
+
+def summarize(entries, top=10):
+    """Request count, bytes and recorded network time by host and resource type."""
+    by_host = defaultdict(lambda: [0, 0, 0.0])
+    by_type = defaultdict(lambda: [0, 0, 0.0])
+    for entry in entries:
+        size = entry['response'].get('content', {}).get('size') or 0
+        ms = entry_time_ms(entry)
+        host = urlsplit(entry['request']['url']).netloc
+        rtype = entry.get('_resourceType') or entry['response'].get('content', {}).get('mimeType', '?').split(';')[0]
+        for table, key in ((by_host, host), (by_type, rtype)):
+            table[key][0] += 1
+            table[key][1] += size
+            table[key][2] += ms
+    slowest = sorted(entries, key=entry_time_ms, reverse=True)[:top]
+    return {
+        'requests': len(entries),
+        'bytes': sum(v[1] for v in by_host.values()),
+        'network_ms': round(sum(v[2] for v in by_host.values()), 1),
+        'by_host': {k: {'requests': v[0], 'bytes': v[1], 'ms': round(v[2], 1)}
+                    for k, v in sorted(by_host.items(), key=lambda kv: -kv[1][2])},
+        'by_type': {k: {'requests': v[0], 'bytes': v[1], 'ms': round(v[2], 1)}
+                    for k, v in sorted(by_type.items(), key=lambda kv: -kv[1][2])},
+        'slowest': [{'ms': round(entry_time_ms(e), 1), 'method': e['request']['method'],
+                     'url': e['request']['url'][:160]} for e in slowest],
+    }
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != 'summary':
+        print('Usage: python har_replay.py summary session.har [--json]')
+        sys.exit(2)
+    report = summarize(load_har(sys.argv[2]))
+    if '--json' in sys.argv:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['requests']} requests, {report['bytes'] / 1024:.0f} KB, "
+          f"{report['network_ms'] / 1000:.1f} s recorded network time")
+    print('\nBy host:')
+    for host, v in report['by_host'].items():
+        print(f"  {host:<45} {v['requests']:>5} req {v['bytes'] / 1024:>9.0f} KB {v['ms']:>10.0f} ms")
+    print('\nBy type:')
+    for rtype, v in report['by_type'].items():
+        print(f"  {rtype:<45} {v['requests']:>5} req {v['bytes'] / 1024:>9.0f} KB {v['ms']:>10.0f} ms")
+    print('\nSlowest:')
+    for e in report['slowest']:
+        print(f"  {e['ms']:>8.0f} ms  {e['method']:<5} {e['url']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Startup import cost of each command-line entry point.
+
+Each script is loaded (without running main) in a fresh interpreter under
+python -X importtime; the cost of everything it imports is summed from that
+report, and the plain wall time of the same process is taken separately so
+importtime's own overhead does not count. Entry points are the scripts here
+with a __main__ block, unless files are given.
+
+    python import_bench.py                          # every entry point, 5 runs each
+    python import_bench.py names.json.check.py dump-explorer.py --top 10
+    python import_bench.py --budget-ms 30 --check   # exit 1 on a slow or heavy start
+
+Playwright, bs4 and tkinter cost tens to hundreds of ms to import, so only
+the scripts listed in HEAVY_OK may pull them in at startup; every other
+entry point imports them inside the code paths that use them. --check
+fails when one is loaded anyway, and when a script does not load cleanly
+(a traceback or a non-zero exit).
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+from latency_tracer import summarize_samples
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY = ('playwright', 'bs4', 'tkinter', 'asyncio', 'greenlet')
+HEAVY_OK = {'inject.py': {'tkinter'}, 'page_pool.py': {'asyncio'}}
+
+MARK = '--import-bench--'
+LOADER = (f"import importlib.util, sys\n"
+          f"sys.stderr.write('{MARK}\\n')\n"
+          f"sys.argv = sys.argv[1:]  # as if run directly: scripts may parse argv at import time\n"
+          f"spec = importlib.util.spec_from_file_location('__bench__', sys.argv[0])\n"
+          f"spec.loader.exec_module(importlib.util.module_from_spec(spec))\n")
+
+
+def entry_points():
+    """Scripts in this directory that run something under __main__."""
+    found = []
+    for path in sorted(glob.glob(os.path.join(HERE, '*.py'))):
+        if os.path.basename(path) == os.path.basename(__file__):
+            continue
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        if "__name__ == '__main__'" in text or '__name__ == "__main__"' in text:
+            found.append(os.path.basename(path))
+    return found
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] for the imports after MARK."""
+    rows = []
+    seen_mark = False
+    for line in stderr.splitlines():
+        if line == MARK:
+            seen_mark = True
+            continue
+        if not seen_mark or not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the column header
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def load_error(returncode, stderr):
+    """Why loading the script failed: its traceback's last line or exit status, else None."""
+    if 'Traceback (most recent call last)' in stderr:
+        return [line for line in stderr.splitlines() if line and not line.startswith('import time:')][-1]
+    if returncode:
+        return f'exit status {returncode}'
+    return None
+
+
+def measure(script, runs):
+    """Import ms and process wall ms samples, the module rows of the last run and any load error."""
+    path = os.path.join(HERE, script)
+    import_ms, wall_ms, rows, error = [], [], [], None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', LOADER, path],
+                              cwd=HERE, capture_output=True, text=True)
+        rows = parse_importtime(proc.stderr)
+        import_ms.append(sum(cum for _, _, cum, depth in rows if depth == 0) / 1000)
+        error = error or load_error(proc.returncode, proc.stderr)
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', LOADER, path], cwd=HERE, capture_output=True, text=True)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+        error = error or load_error(proc.returncode, proc.stderr)
+    return import_ms, wall_ms, rows, error
+
+
+def heavy_modules(script, rows):
+    """Top-level packages from HEAVY this script imported without being allowed to."""
+    loaded = {name.split('.')[0] for name, *_ in rows}
+    return sorted((loaded & set(HEAVY)) - HEAVY_OK.get(script, set()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the startup import cost of the entry points')
+    parser.add_argument('scripts', nargs='*', help='Scripts to measure (default: every entry point here)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per script (default 5)')
+    parser.add_argument('--top', type=int, default=0, help='Also list the N most expensive imports per script')
+    parser.add_argument('--budget-ms', type=float, help='Median import ms a script may take')
+    parser.add_argument('--check', action='store_true', help='Exit 1 on a heavy import, a blown budget or a script that fails to load')
+    parser.add_argument('--json', metavar='FILE', help='Write the results here')
+    args = parser.parse_args()
+
+    scripts = [os.path.basename(s) for s in args.scripts] or entry_points()
+    results = []
+    failed = False
+    print(f"{'script':<24}{'import p50':>11}{'max':>8}{'wall p50':>10}{'modules':>9}  heavy")
+    for script in scripts:
+        import_ms, wall_ms, rows, error = measure(script, max(1, args.runs))
+        heavy = heavy_modules(script, rows)
+        stats = summarize_samples(import_ms)
+        over = args.budget_ms is not None and stats['p50_ms'] > args.budget_ms
+        failed = failed or bool(heavy) or over or error is not None
+        print(f"{script:<24}{stats['p50_ms']:>9.1f}ms{stats['max_ms']:>6.1f}ms"
+              f"{summarize_samples(wall_ms)['p50_ms']:>8.1f}ms{len(rows):>9}  "
+              f"{', '.join(heavy) or '-'}{'  OVER BUDGET' if over else ''}"
+              f"{f'  FAILED: {error}' if error else ''}")
+        top = sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]
+        for name, self_us, cum_us, depth in top:
+            print(f"    {cum_us / 1000:>7.1f} ms cumulative {self_us / 1000:>6.1f} ms self  {'  ' * depth}{name}")
+        results.append({'script': script, 'import': stats, 'wall': summarize_samples(wall_ms),
+                        'modules': len(rows), 'heavy': heavy, 'error': error,
+                        'top': [{'module': n, 'self_ms': s / 1000, 'cumulative_ms': c / 1000} for n, s, c, _ in top]})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'Wrote {args.json}')
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
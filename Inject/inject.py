@@ -8,38 +8,122 @@ Google Photos description tagger with old device spoofing
 - Backspace functionality
 - Show current photo URL and description
 """
+from startup_timing import StartupTimer  # first: its clock starts at import
 import argparse
 import tkinter as tk
+import log_setup
 from browser_controller import BrowserController
+from controller_daemon import RemoteController
 from keystroke_handler import KeystrokeHandler
+from latency_tracer import LatencyTracer
+from photo_index import PhotoIndex
+from work_queue import WorkQueue
 from ui_components import AssistantUI
 
 
 # Parse command line arguments
 parser = argparse.ArgumentParser(description='Google Photos Tagger')
 parser.add_argument('--debug', action='store_true', help='Enable debug mode (shows READ and DUMP HTML buttons)')
+parser.add_argument('--trace', metavar='REPORT.json', help='Trace keystroke-to-page latency and write histograms here on exit')
+parser.add_argument('--trace-label', help='Label stored in the latency report (e.g. a version) for later comparison')
+parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                    help='Console log level (default INFO, or DEBUG with --debug)')
+parser.add_argument('--base-url', help='Open this instead of https://photos.google.com (e.g. fake_photos_server.py)')
+parser.add_argument('--record-har', metavar='FILE.har', help='Record the session network traffic to a HAR file')
+parser.add_argument('--replay-har', metavar='FILE.har', help='Replay a recorded HAR offline instead of using the network')
+parser.add_argument('--har-fast-forward', action='store_true', help='With --replay-har, serve responses without the recorded delays')
+parser.add_argument('--dump-full-page', action='store_true', help='DMP dumps the whole page instead of just the info panel')
+parser.add_argument('--index', metavar='NAME', help='Photo index from grid_harvester.py: F8 jumps to photo N, F12 to the first untagged')
+parser.add_argument('--work-queue', action='store_true',
+                    help='With --index, Next/Prev walk photos that still need names or a description (work_queue.py)')
+parser.add_argument('--rpc-metadata', action='store_true',
+                    help="Read descriptions from the page's RPC responses; navigation ends when the info panel shows the new photo")
+parser.add_argument('--cdp-port', type=int, nargs='?', const=9222, metavar='PORT',
+                    help='Keep Chrome running after exit and reattach to it over CDP on the next start (default port 9222; '
+                         'python chrome_cdp.py --stop closes it)')
+parser.add_argument('--daemon', action='store_true',
+                    help='Drive the browser through controller_daemon.py (started if needed) so it outlives this window')
+parser.add_argument('--log-json', metavar='FILE.jsonl', help='Also write every log record as JSON lines to this file')
 args = parser.parse_args()
 DEBUG_MODE = args.debug
+LOG_LEVEL = args.log_level or ('DEBUG' if DEBUG_MODE else 'INFO')
 
 
 def main():
+    timer = StartupTimer()
+    timer.mark('imports_done')
+    log_setup.configure(LOG_LEVEL, json_path=args.log_json)
+    
     # Create components
-    browser = BrowserController()
-    keystroke = KeystrokeHandler(browser)
+    if args.work_queue and not args.index:
+        parser.error('--work-queue needs --index NAME')
+    if args.daemon:
+        main_with_daemon()
+        return
+    photo_index = PhotoIndex(args.index) if args.index else None
+    work_queue = None
+    if args.work_queue:
+        work_queue = WorkQueue(photo_index)
+        log_setup.get_logger('queue').info(f'[QUEUE] {len(work_queue)} of {len(photo_index)} photos in {photo_index.name} need work')
+    browser = BrowserController(base_url=args.base_url, record_har_path=args.record_har,
+                                replay_har_path=args.replay_har, har_fast_forward=args.har_fast_forward,
+                                dump_full_page=args.dump_full_page,
+                                photo_index=photo_index, work_queue=work_queue,
+                                rpc_metadata=args.rpc_metadata, cdp_port=args.cdp_port)
+    tracer = None
+    if args.trace:
+        tracer = LatencyTracer(label=args.trace_label)
+        browser.tracer = tracer
+    
+    # Launch the browser first; Tk and names.json are built while it starts
+    browser.startup_timer = timer
+    try:
+        browser.start_async(headful=True)
+    except RuntimeError as e:
+        log_setup.get_logger('browser').error(f'[BROWSER] {e}')
+    with timer.phase('names_compile'):
+        keystroke = KeystrokeHandler(browser)
     
     # Create UI
-    root = tk.Tk()
-    app = AssistantUI(root, browser, keystroke, debug_mode=DEBUG_MODE)
+    with timer.phase('tk_init'):
+        root = tk.Tk()
+    with timer.phase('ui_build'):
+        app = AssistantUI(root, browser, keystroke, debug_mode=DEBUG_MODE, tracer=tracer)
+    app.trace_path = args.trace
+    app.log_level = LOG_LEVEL
+    app.startup_timer = timer
     
     # Setup shutdown
     root.protocol('WM_DELETE_WINDOW', app.shutdown)
     
-    # Auto-launch browser at startup
-    root.after(500, lambda: app.launch_with_mode('default'))
+    # Enable the UI as soon as the browser is usable (start() only waits now)
+    root.after(0, lambda: app.launch_with_mode('default'))
     
     # Run
     root.mainloop()
 
 
+def main_with_daemon():
+    """The same UI as a thin client of controller_daemon.py; the daemon keeps the browser."""
+    daemon_args = []
+    for flag, value in (('--base-url', args.base_url), ('--index', args.index), ('--cdp-port', args.cdp_port)):
+        if value:
+            daemon_args += [flag, str(value)]
+    for flag, on in (('--work-queue', args.work_queue), ('--rpc-metadata', args.rpc_metadata),
+                     ('--dump-full-page', args.dump_full_page)):
+        if on:
+            daemon_args.append(flag)
+    if args.trace or args.record_har or args.replay_har:
+        log_setup.get_logger('daemon').warning('[DAEMON] --trace and HAR options need the in-process browser; ignored')
+    browser = RemoteController(daemon_args=daemon_args)
+    keystroke = KeystrokeHandler(browser)
+    root = tk.Tk()
+    app = AssistantUI(root, browser, keystroke, debug_mode=DEBUG_MODE)
+    app.log_level = LOG_LEVEL
+    root.protocol('WM_DELETE_WINDOW', app.shutdown)
+    root.after(0, lambda: app.launch_with_mode('default'))
+    root.mainloop()
+
+
 if __name__ == '__main__':
     main()
@@ -3,6 +3,63 @@ import json
 import os
 import re
 
+from log_setup import get_logger
+
+
+log = get_logger('keystroke')
+
+# Single-key shortcuts that exist regardless of names.json
+DEFAULT_SHORTCUTS = {
+    # Arrow keys for navigation
+    'Left': ('prev', None),
+    'Right': ('next', None),
+    # Delete all shortcut
+    '=': ('delete_all', None),
+    # Cursor to end DHM
+    '-': ('cursor_to_end', None),
+    # Tab to add "Dennis " and go next
+    'Tab': ('tab_dennis', None),
+    # Macros: record/stop, replay over N photos, cancel replay
+    'F9': ('macro_record', None),
+    'F10': ('macro_replay', None),
+    'F11': ('macro_cancel', None),
+    # Direct jumps through a harvested photo index (inject.py --index)
+    'F8': ('goto_position', None),
+    'F12': ('goto_untagged', None),
+}
+
+# Map shifted number keys to their unshifted counterparts
+SHIFTED_NUMBER_MAP = {
+    '!': '1',
+    '@': '2',
+    '#': '3',
+    '$': '4',
+    '%': '5',
+    '^': '6',
+    '&': '7',
+    '*': '8',
+    '(': '9',
+    ')': '0'
+}
+SHIFTED_SYMBOL_FOR_DIGIT = {v: k for k, v in SHIFTED_NUMBER_MAP.items()}
+
+# Leader key for multi-key sequences: ` then 1 2 adds group (12)
+SEQUENCE_LEADER = '`'
+
+# Printable keys that never pass through as natural typing: numbers, '='
+# and shifted number symbols (plus the leader once sequences are compiled)
+RESERVED_KEYS = frozenset({'='} | set('0123456789') | set(SHIFTED_NUMBER_MAP))
+
+# Keysyms that arrive on their own while a chord is being typed
+MODIFIER_KEYSYMS = frozenset({
+    'Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R',
+    'Meta_L', 'Meta_R', 'Super_L', 'Super_R', 'Caps_Lock',
+})
+
+LETTER_TOKEN_RE = re.compile(r'\((.)\)')
+NUMBER_TOKEN_RE = re.compile(r'\((\d+)\)')
+NUMBER_PREFIX_RE = re.compile(r'^\(\d+\)\s*')
+
 
 class KeystrokeHandler:
     """Manages keyboard shortcuts from names.json."""
@@ -11,89 +68,99 @@ class KeystrokeHandler:
         """Initialize keystroke handler with browser controller and optional names file path."""
         self.browser = browser_controller
         self.names_file = names_file
+        self.loaded_path = None  # File the current names actually came from
         self.shortcuts = {}
+        self.sequences = {}
+        self.sequence_prefixes = frozenset()
+        self.reserved_keys = RESERVED_KEYS
         self.names_list = []  # Store original names list for UI
+        self._pending_sequence = ()
         self._load_shortcuts()
     
     def reload_shortcuts(self):
         """Reload shortcuts from names.json file."""
-        self.shortcuts = {}
-        self.names_list = []
         self._load_shortcuts()
-        print(f'[KEYSTROKE] Reloaded {len(self.names_list)} names from file')
+        log.info(f'[KEYSTROKE] Reloaded {len(self.names_list)} names from file')
+        return self.names_list
+    
+    def apply_names(self, names):
+        """Swap in an already validated names list (used by the names.json watcher)."""
+        self._compile(list(names))
+        log.info(f'[KEYSTROKE] Applied {len(self.names_list)} names')
         return self.names_list
     
     def _load_shortcuts(self):
-        """Load shortcuts from names.json and register defaults."""
-        # Arrow keys for navigation
-        self.shortcuts['Left'] = ('prev', None)
-        self.shortcuts['Right'] = ('next', None)
-        
-        # Delete all shortcut
-        self.shortcuts['='] = ('delete_all', None)
-
-        # Cursor to end DHM
-        self.shortcuts['-'] = ('cursor_to_end', None)
+        """Load names from names.json and compile them into the dispatch table."""
+        names = self._load_names()
+        self._compile(names)
+    
+    def _compile(self, names):
+        """Compile names into flat dispatch tables and swap them in at once.
         
-        # Tab to add "Dennis " and go next
-        self.shortcuts['Tab'] = ('tab_dennis', None)
+        Everything on_key_press needs is built here, so a key event is a
+        couple of dict/set lookups no matter how many names are configured.
+        """
+        shortcuts = dict(DEFAULT_SHORTCUTS)
+        sequences = {}
         
         # Note: n, N, p, P are NOT registered - they pass through as natural keystrokes
-        
-        # Load names from names.json
-        names = self._load_names()
-        self.names_list = names  # Store for UI
-
-        # Map shifted number keys to their unshifted counterparts
-        SHIFTED_NUMBER_MAP = {
-            '!': '1',
-            '@': '2',
-            '#': '3',
-            '$': '4',
-            '%': '5',
-            '^': '6',
-            '&': '7',
-            '*': '8',
-            '(': '9',
-            ')': '0'
-        }
-        
         for raw in names:
             label = raw
             pushed = ''.join(ch for ch in raw if ch not in '()')
             
-            match = re.search(r'\((.)\)', label)
+            match = LETTER_TOKEN_RE.search(label)
             if match:
                 shortcut_key = match.group(1)
                 # Register Ctrl+lowercase -> just add name
-                self.shortcuts[(shortcut_key.lower(), 'ctrl')] = ('name', pushed)
+                shortcuts[(shortcut_key.lower(), 'ctrl')] = ('name', pushed)
                 # Register Ctrl+UPPERCASE -> add name and advance
-                self.shortcuts[(shortcut_key.upper(), 'ctrl')] = ('name_and_next', pushed)
-                print(f'[KEYSTROKE] Registered Ctrl+{shortcut_key.lower()} -> {pushed}')
-                print(f'[KEYSTROKE] Registered Ctrl+{shortcut_key.upper()} -> {pushed} + NEXT')
+                shortcuts[(shortcut_key.upper(), 'ctrl')] = ('name_and_next', pushed)
+                log.debug('[KEYSTROKE] Registered Ctrl+%s -> %s', shortcut_key.lower(), pushed)
+                log.debug('[KEYSTROKE] Registered Ctrl+%s -> %s + NEXT', shortcut_key.upper(), pushed)
             
             # Extract numbered groups like "(1) Dennis Laura " and strip numeric prefix
-            num_match = re.search(r'\((\d+)\)', label)
+            num_match = NUMBER_TOKEN_RE.search(label)
             if num_match:
                 group_num = num_match.group(1)
                 # Strip the numeric prefix from the label first, then remove parentheses
-                stripped_label = re.sub(r'^\(\d+\)\s*', '', label).strip()
-                if stripped_label:  # Only register if there's content after stripping
-                    # Register Ctrl+number and just number -> just add name
-                    self.shortcuts[(group_num, 'ctrl')] = ('name', stripped_label + ' ')
-                    self.shortcuts[group_num] = ('name', stripped_label + ' ')
-                    print(f'[KEYSTROKE] Registered {group_num} -> {stripped_label} (stripped)')
+                stripped_label = NUMBER_PREFIX_RE.sub('', label).strip()
+                action_text = stripped_label + ' ' if stripped_label else pushed
+                
+                # Every group is reachable as leader + digits, which is the only
+                # way to reach groups 10 and up
+                sequences[(SEQUENCE_LEADER,) + tuple(group_num)] = ('name', action_text)
+                log.debug('[KEYSTROKE] Registered %s %s -> %s', SEQUENCE_LEADER, " ".join(group_num), action_text.strip() or "(empty)")
+                
+                if len(group_num) > 1:
+                    continue
+                
+                # Register Ctrl+number and just number -> just add name
+                shortcuts[(group_num, 'ctrl')] = ('name', action_text)
+                shortcuts[group_num] = ('name', action_text)
+                if stripped_label:
+                    log.debug('[KEYSTROKE] Registered %s -> %s (stripped)', group_num, stripped_label)
                     
                     # Register shifted version -> add name and advance
-                    shifted_symbol = [k for k, v in SHIFTED_NUMBER_MAP.items() if v == group_num]
+                    shifted_symbol = SHIFTED_SYMBOL_FOR_DIGIT.get(group_num)
                     if shifted_symbol:
-                        self.shortcuts[shifted_symbol[0]] = ('name_and_next', stripped_label + ' ')
-                        print(f'[KEYSTROKE] Registered {shifted_symbol[0]} -> {stripped_label} + NEXT')
+                        shortcuts[shifted_symbol] = ('name_and_next', action_text)
+                        log.debug('[KEYSTROKE] Registered %s -> %s + NEXT', shifted_symbol, stripped_label)
                 else:
-                    # Empty group, register as-is
-                    self.shortcuts[(group_num, 'ctrl')] = ('name', pushed)
-                    self.shortcuts[group_num] = ('name', pushed)
-                    print(f'[KEYSTROKE] Registered {group_num} -> (empty)')
+                    log.debug('[KEYSTROKE] Registered %s -> (empty)', group_num)
+        
+        prefixes = set()
+        for seq in sequences:
+            for i in range(1, len(seq)):
+                prefixes.add(seq[:i])
+        
+        # Swap everything in together so a concurrent key press never sees a
+        # half-built table
+        self.shortcuts = shortcuts
+        self.sequences = sequences
+        self.sequence_prefixes = frozenset(prefixes)
+        self.reserved_keys = RESERVED_KEYS | {SEQUENCE_LEADER} if sequences else RESERVED_KEYS
+        self.names_list = names  # Store for UI
+        self._pending_sequence = ()
     
     def _load_names(self):
         """Load names from names.json file."""
@@ -108,10 +175,11 @@ class KeystrokeHandler:
                         names = data.get('names', [])
                     elif isinstance(data, list):
                         names = data
-                    print(f'[KEYSTROKE] Loaded {len(names)} names from {self.names_file}')
+                    log.info(f'[KEYSTROKE] Loaded {len(names)} names from {self.names_file}')
+                    self.loaded_path = self.names_file
                     return names
             except Exception as e:
-                print(f'[KEYSTROKE] Failed to load {self.names_file}: {e}')
+                log.warning(f'[KEYSTROKE] Failed to load {self.names_file}: {e}')
         
         # Try standard locations
         ROOT = os.path.dirname(__file__)
@@ -130,13 +198,14 @@ class KeystrokeHandler:
                         elif isinstance(data, list):
                             names = data
                         if names:
-                            print(f'[KEYSTROKE] Loaded {len(names)} names from {path}')
+                            log.info(f'[KEYSTROKE] Loaded {len(names)} names from {path}')
+                            self.loaded_path = os.path.abspath(path)
                             return names
                 except Exception as e:
-                    print(f'[KEYSTROKE] Failed to load {path}: {e}')
+                    log.warning(f'[KEYSTROKE] Failed to load {path}: {e}')
         
         # Fallback
-        print('[KEYSTROKE] Using fallback names')
+        log.info('[KEYSTROKE] Using fallback names')
         names = ['(D)ennis', '(L)aura', '(B)ekah']
         return names
     
@@ -153,27 +222,67 @@ class KeystrokeHandler:
         Returns:
             Tuple of (action_type, action_data) or None
         """
+        # A sequence in progress gets the key first
+        if self._pending_sequence:
+            if keysym in MODIFIER_KEYSYMS:
+                return ('sequence_pending', self._pending_sequence)
+            if keysym in ('Escape', 'BackSpace', 'Delete'):
+                pending = self._pending_sequence
+                self._pending_sequence = ()
+                return ('sequence_cancelled', pending)
+            return self._continue_sequence(key)
+        
         # Handle BackSpace and Delete keysyms FIRST (most reliable, before keycode)
         if keysym == 'BackSpace':
-            print('[DELETE_TYPE] BackSpace key detected - deleting one char')
+            log.debug('[DELETE_TYPE] BackSpace key detected - deleting one char')
             return ('backspace', None)
         elif keysym == 'Delete':
-            print('[DELETE_TYPE] Delete key detected - clearing entire description')
+            log.debug('[DELETE_TYPE] Delete key detected - clearing entire description')
             return ('delete_all', None)
         
+        if key == SEQUENCE_LEADER and not ctrl and self.sequence_prefixes:
+            self._pending_sequence = (key,)
+            return ('sequence_pending', self._pending_sequence)
+        
         # Try direct lookup first (before keycode, to avoid '3' being confused with 0x33 keycode)
-        if key in self.shortcuts:
-            return self.shortcuts[key]
+        action = self.shortcuts.get(key)
+        if action:
+            return action
         
         # Try Ctrl+ combination
         if ctrl:
-            ctrl_key = (key, 'ctrl')
-            if ctrl_key in self.shortcuts:
-                return self.shortcuts[ctrl_key]
+            return self.shortcuts.get((key, 'ctrl'))
         
         # No match found - return None for natural typing
         return None
     
+    def _continue_sequence(self, key):
+        """Advance the sequence state machine by one key."""
+        pending = self._pending_sequence
+        seq = pending + (key,)
+        if seq in self.sequence_prefixes:
+            self._pending_sequence = seq
+            return ('sequence_pending', seq)
+        
+        self._pending_sequence = ()
+        if seq in self.sequences:
+            return self.sequences[seq]
+        
+        # Key does not extend the sequence: it terminates it, completing a
+        # shorter match like ` 1 when ` 1 2 also exists (Return, space...)
+        return self.sequences.get(pending, ('sequence_cancelled', seq))
+    
+    @property
+    def sequence_pending(self):
+        """True while a multi-key sequence is waiting for more keys."""
+        return bool(self._pending_sequence)
+    
+    def flush_sequence(self):
+        """Resolve a pending sequence after its timeout; return its action or None."""
+        pending = self._pending_sequence
+        self._pending_sequence = ()
+        return self.sequences.get(pending)
+    
     def get_all_shortcuts(self):
         """Return dict of all registered shortcuts."""
         return self.shortcuts.copy()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""End-to-end keystroke latency tracing.
+
+A trace starts when AssistantUI receives the Tk <KeyPress>, carries a
+correlation ID through KeystrokeHandler, the browser command queue and the
+Playwright call, and closes once the description textarea reflects the
+change. Closed traces feed per-action latency histograms that can be dumped
+to JSON and compared across versions:
+
+    python latency_tracer.py compare before.json after.json
+"""
+import itertools
+import json
+import math
+import sys
+import threading
+import time
+
+from log_setup import get_logger
+
+
+log = get_logger('trace')
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open ended)
+BUCKETS_MS = (5, 10, 20, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000)
+
+# How many command completions close each traced action
+ACTION_STEPS = {
+    'name': 1,
+    'name_and_next': 2,
+    'tab_dennis': 2,
+    'backspace': 1,
+    'delete_all': 1,
+    'next': 1,
+    'prev': 1,
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize_samples(samples_ms):
+    """Return count/mean/p50/p95/p99/max for a list of millisecond samples."""
+    values = sorted(samples_ms)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values), 2),
+        'p50_ms': round(percentile(values, 50), 2),
+        'p95_ms': round(percentile(values, 95), 2),
+        'p99_ms': round(percentile(values, 99), 2),
+        'max_ms': round(values[-1], 2),
+    }
+
+
+class _ActionStats:
+    """Histogram, raw samples and per-stage totals for one action type."""
+
+    def __init__(self, max_samples):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.samples = []
+        self.max_samples = max_samples
+        self.failures = 0
+        self.stage_totals = {}
+
+    def add(self, total_ms, stages, ok):
+        for i, bound in enumerate(BUCKETS_MS):
+            if total_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append(total_ms)
+        if not ok:
+            self.failures += 1
+        prev = 0.0
+        for stage, at_ms in stages:
+            total, n = self.stage_totals.get(stage, (0.0, 0))
+            self.stage_totals[stage] = (total + at_ms - prev, n + 1)
+            prev = at_ms
+
+    def to_dict(self):
+        data = summarize_samples(self.samples)
+        data['failures'] = self.failures
+        labels = [f'<={b}' for b in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}']
+        data['histogram_ms'] = dict(zip(labels, self.buckets))
+        data['stage_mean_ms'] = {stage: round(total / n, 2) for stage, (total, n) in self.stage_totals.items()}
+        return data
+
+
+class LatencyTracer:
+    """Thread-safe tracer shared by AssistantUI (begin) and BrowserController (mark/complete)."""
+
+    def __init__(self, label=None, max_samples=10000):
+        self.label = label
+        self.max_samples = max_samples
+        self._ids = itertools.count(1)
+        self._open = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def begin(self, action, started=None, steps=None):
+        """Open a trace for an action; started is a time.perf_counter() value."""
+        trace_id = next(self._ids)
+        t0 = started if started is not None else time.perf_counter()
+        with self._lock:
+            self._open[trace_id] = {
+                'action': action,
+                't0': t0,
+                'steps': steps or ACTION_STEPS.get(action, 1),
+                'stages': [],
+                'ok': True,
+            }
+        return trace_id
+
+    def mark(self, trace_id, stage):
+        """Record that a trace reached a pipeline stage."""
+        if trace_id is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            trace = self._open.get(trace_id)
+            if trace:
+                trace['stages'].append((stage, (now - trace['t0']) * 1000.0))
+
+    def complete(self, trace_id, ok=True):
+        """Finish one command of a trace; the trace closes after its last command."""
+        if trace_id is None:
+            return None
+        now = time.perf_counter()
+        with self._lock:
+            trace = self._open.get(trace_id)
+            if not trace:
+                return None
+            trace['ok'] = trace['ok'] and ok
+            trace['steps'] -= 1
+            if trace['steps'] > 0:
+                return None
+            del self._open[trace_id]
+            total_ms = (now - trace['t0']) * 1000.0
+            stats = self._stats.get(trace['action'])
+            if stats is None:
+                stats = self._stats[trace['action']] = _ActionStats(self.max_samples)
+            stats.add(total_ms, trace['stages'], trace['ok'])
+        log.debug('[TRACE] #%s %s %.1f ms%s', trace_id, trace["action"], total_ms, "" if trace["ok"] else " (not committed)")
+        return total_ms
+
+    def summary(self):
+        """Return the JSON-serialisable histogram report."""
+        with self._lock:
+            return {
+                'label': self.label,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'open_traces': len(self._open),
+                'actions': {action: stats.to_dict() for action, stats in sorted(self._stats.items())},
+            }
+
+    def dump(self, path):
+        """Write the report to path as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        log.info(f'[TRACE] Wrote latency report to {path}')
+
+
+def compare(paths):
+    """Print p50/p95/p99 per action side by side for several dumped reports."""
+    reports = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            reports.append(json.load(f))
+    actions = sorted({a for r in reports for a in r.get('actions', {})})
+    names = [r.get('label') or p for r, p in zip(reports, paths)]
+
+    print(f"{'action':<16}" + ''.join(f'{n[:28]:>30}' for n in names))
+    for action in actions:
+        cells = []
+        for r in reports:
+            a = r.get('actions', {}).get(action)
+            if a and a.get('count'):
+                cells.append(f"{a['p50_ms']:.0f}/{a['p95_ms']:.0f}/{a['p99_ms']:.0f} (n={a['count']})")
+            else:
+                cells.append('-')
+        print(f'{action:<16}' + ''.join(f'{c:>30}' for c in cells))
+    print('(p50/p95/p99 ms)')
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != 'compare':
+        print('Usage: python latency_tracer.py compare report1.json report2.json [...]')
+        sys.exit(2)
+    compare(sys.argv[2:])
+
+
+if __name__ == '__main__':
+    main()
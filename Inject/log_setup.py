@@ -0,0 +1,95 @@
+"""Logging setup - per-subsystem loggers behind a queue-backed async handler.
+
+Hot-path code logs through get_logger('browser'), get_logger('keystroke'), ...
+Records are handed to a QueueHandler, so the worker thread never waits on a
+slow terminal or pipe; a QueueListener thread does the actual writing to
+the console and, optionally, a JSON lines file.
+
+Default level is INFO, which keeps per-step navigation/keystroke chatter
+(logged at DEBUG) off the hot path entirely. --debug restores today's detail.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+
+
+ROOT_LOGGER = 'gphotos'
+
+_listener = None
+
+
+def get_logger(subsystem):
+    """Return the logger for a subsystem, e.g. get_logger('browser')."""
+    return logging.getLogger(f'{ROOT_LOGGER}.{subsystem}')
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record for machine-readable session logs."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure(level='INFO', json_path=None, stream=None):
+    """Route all subsystem loggers through one background writer thread.
+
+    Safe to call again (e.g. to add a JSON sink); the previous listener is
+    flushed and replaced.
+    """
+    global _listener
+    # socket, pickle & co. come with it; processes that never configure skip them
+    from logging.handlers import QueueHandler, QueueListener
+    shutdown()
+
+    handlers = []
+    console = logging.StreamHandler(stream or sys.stdout)
+    # Messages already carry their [TAG] prefix, as the old prints did
+    console.setFormatter(logging.Formatter('%(message)s'))
+    handlers.append(console)
+    if json_path:
+        sink = logging.FileHandler(json_path, encoding='utf-8')
+        sink.setFormatter(JsonLinesFormatter())
+        handlers.append(sink)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(QueueHandler(log_queue))
+    root.propagate = False
+    set_level(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=False)
+    _listener.start()
+    return _listener
+
+
+def set_level(level):
+    """Change the level of every subsystem logger at runtime (e.g. DBG toggle)."""
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    logging.getLogger(ROOT_LOGGER).setLevel(level)
+
+
+def shutdown():
+    """Flush pending records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,62 @@
+"""Macro recording for repetitive per-photo edit sequences.
+
+AssistantUI feeds every dispatched action into a MacroRecorder while
+recording is on. The finished macro is a plain list of (action, data)
+steps that BrowserController.run_macro replays over the next N photos
+in one worker command, without going back through Tk for each key.
+"""
+from log_setup import get_logger
+
+
+log = get_logger('macro')
+
+# Actions the browser worker knows how to replay
+REPLAYABLE_ACTIONS = frozenset({
+    'name', 'name_and_next', 'tab_dennis', 'backspace', 'delete_all',
+    'cursor_to_end', 'next', 'prev', 'keystroke',
+})
+
+# Steps that move to another photo
+NAVIGATION_ACTIONS = frozenset({'next', 'prev', 'name_and_next', 'tab_dennis'})
+
+
+class MacroRecorder:
+    """Collects actions between start() and stop() and keeps the last macro."""
+
+    def __init__(self):
+        self.recording = False
+        self.steps = []
+        self.macro = []
+
+    def start(self):
+        """Begin a new recording, discarding any half-recorded steps."""
+        self.recording = True
+        self.steps = []
+        log.info('[MACRO] Recording started')
+
+    def record(self, action_type, action_data):
+        """Add one step if recording and the action can be replayed."""
+        if self.recording and action_type in REPLAYABLE_ACTIONS:
+            self.steps.append((action_type, action_data))
+            log.debug('[MACRO] Recorded step %s: %s %r', len(self.steps), action_type, action_data)
+
+    def stop(self):
+        """Finish recording; the steps become the current macro if any."""
+        self.recording = False
+        if self.steps:
+            self.macro = list(self.steps)
+        log.info(f'[MACRO] Recording stopped: {len(self.macro)} step(s) {describe(self.macro)}')
+        return self.macro
+
+
+def describe(steps):
+    """Short human readable form of a macro for the status line."""
+    parts = []
+    for action, data in steps:
+        parts.append(f'{action}({data.strip()})' if isinstance(data, str) and data.strip() else action)
+    return ' > '.join(parts)
+
+
+def advances(steps):
+    """True if the macro moves to another photo by itself."""
+    return any(action in NAVIGATION_ACTIONS for action, _ in steps)
@@ -26,7 +26,6 @@ import json
 import sys
 import re
 from collections import defaultdict
-from typing import List, Tuple, Optional
 
 
 def load_text(path: str) -> str:
@@ -36,7 +35,7 @@ def load_text(path: str) -> str:
         return f.read()
 
 
-def try_parse_json(text: str) -> Tuple[Optional[dict], Optional[str]]:
+def try_parse_json(text: str) -> tuple[dict | None, str | None]:
     try:
         obj = json.loads(text)
         return obj, None
@@ -44,7 +43,7 @@ def try_parse_json(text: str) -> Tuple[Optional[dict], Optional[str]]:
         return None, str(e)
 
 
-def find_bracket_block(text: str, key: str) -> Optional[Tuple[int, int, str]]:
+def find_bracket_block(text: str, key: str) -> tuple[int, int, str] | None:
     m = re.search(r'"' + re.escape(key) + r'"\s*:\s*\[', text)
     if not m:
         return None
@@ -78,7 +77,7 @@ def find_bracket_block(text: str, key: str) -> Optional[Tuple[int, int, str]]:
     return None
 
 
-def extract_array_string_entries(block_text: str) -> List[Tuple[str, int, int, str]]:
+def extract_array_string_entries(block_text: str) -> list[tuple[str, int, int, str]]:
     entries = []
     pattern = re.compile(r'"((?:\\.|[^"\\])*)"', re.DOTALL)
     for m in pattern.finditer(block_text):
@@ -92,7 +91,7 @@ def extract_array_string_entries(block_text: str) -> List[Tuple[str, int, int, s
     return entries
 
 
-def check_missing_commas_in_block(block_text: str) -> List[Tuple[int, str]]:
+def check_missing_commas_in_block(block_text: str) -> list[tuple[int, str]]:
     lines = block_text.splitlines()
     suspects = []
     entry_line_indices = []
@@ -121,7 +120,7 @@ def check_missing_commas_in_block(block_text: str) -> List[Tuple[int, str]]:
     return suspects
 
 
-def analyze_parsed_names(names: List[str]) -> Tuple[dict, dict, List[int]]:
+def analyze_parsed_names(names: list[str]) -> tuple[dict, dict, list[int]]:
     """
     Extract parenthesized tokens and classify them:
       - numeric tokens (all digits) -> number_map
@@ -163,11 +162,11 @@ def analyze_parsed_names(names: List[str]) -> Tuple[dict, dict, List[int]]:
     return letter_map, number_map, no_paren
 
 
-def format_entries_for_report(names: List[str], indices: List[int]) -> List[str]:
+def format_entries_for_report(names: list[str], indices: list[int]) -> list[str]:
     return [f"{i+1}: {names[i]!r}" for i in indices]
 
 
-def report_from_parsed(names: List[str]) -> int:
+def report_from_parsed(names: list[str]) -> int:
     """
     Analyze parsed names list and print reports. Returns non-zero if issues found.
     """
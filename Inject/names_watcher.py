@@ -0,0 +1,152 @@
+"""Background watcher that hot-reloads names.json into the keystroke handler."""
+import importlib.util
+import os
+import threading
+
+from log_setup import get_logger
+
+
+log = get_logger('watch')
+
+CHECKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'names.json.check.py')
+
+_checker = None
+
+
+def _load_checker():
+    """Import names.json.check.py (its file name is not importable directly)."""
+    global _checker
+    if _checker is None:
+        spec = importlib.util.spec_from_file_location('names_json_check', CHECKER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _checker = module
+    return _checker
+
+
+def validate_names_text(text):
+    """Validate names.json text with the names.json.check.py analysis.
+
+    Returns (names, problems). names is None when the file must be rejected;
+    problems is a list of human readable strings either way.
+    """
+    checker = _load_checker()
+    problems = []
+
+    parsed, err = checker.try_parse_json(text)
+    if parsed is None:
+        problems.append(f'JSON parse error: {err}')
+        block = checker.find_bracket_block(text, 'names')
+        if block:
+            for ln, line in checker.check_missing_commas_in_block(block[2]):
+                problems.append(f'names line {ln}: missing/extra comma? {line.strip()}')
+        return None, problems
+
+    names = parsed.get('names') if isinstance(parsed, dict) else parsed
+    if not isinstance(names, list):
+        problems.append("no 'names' array")
+        return None, problems
+    for i, entry in enumerate(names):
+        if not isinstance(entry, str):
+            problems.append(f'names entry {i + 1} is {entry!r}, not a string')
+    if problems:
+        return None, problems
+
+    letter_map, number_map, no_paren = checker.analyze_parsed_names(names)
+    for key, idxs in sorted(letter_map.items()):
+        if len(idxs) > 1:
+            problems.append(f"letter '{key}' used by {', '.join(repr(names[i]) for i in idxs)}")
+    for key, idxs in sorted(number_map.items()):
+        if len(idxs) > 1:
+            problems.append(f"number '{key}' used by {', '.join(repr(names[i]) for i in idxs)}")
+    if problems:
+        return None, problems
+
+    # Entries without a (X) token still make a button, so only warn
+    for i in no_paren:
+        problems.append(f'warning: {names[i]!r} has no parenthesized shortcut')
+    return names, problems
+
+
+class NamesWatcher:
+    """Polls names.json with os.stat and applies valid edits to a KeystrokeHandler.
+
+    A stat every interval costs microseconds, so this runs as a plain daemon
+    thread instead of pulling in an inotify dependency. Invalid edits are
+    reported and ignored, leaving the previous working keymap in place.
+    """
+
+    def __init__(self, keystroke_handler, path=None, on_applied=None, on_rejected=None, interval=1.0):
+        self.keystroke = keystroke_handler
+        self.path = path or keystroke_handler.loaded_path
+        self.on_applied = on_applied
+        self.on_rejected = on_rejected
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last_sig = self._stat_signature()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except (OSError, TypeError):
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def start(self):
+        """Start polling in the background."""
+        if not self.path:
+            log.warning('[WATCH] No names.json path to watch')
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        log.info(f'[WATCH] Watching {self.path}')
+
+    def stop(self):
+        """Stop polling."""
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            sig = self._stat_signature()
+            if sig is None or sig == self._last_sig:
+                continue
+            self._last_sig = sig
+            log.info('[WATCH] names.json changed, reloading')
+            try:
+                self.reload()
+            except Exception as e:
+                # One bad save must not end the watcher; the next edit is picked up again
+                log.error(f'[WATCH] Reload failed, keeping previous keymap: {e}')
+
+    def reload(self):
+        """Read, validate and apply names.json now. Returns (ok, names_or_problems)."""
+        with self._lock:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except Exception as e:
+                return self._reject([f'cannot read {self.path}: {e}'])
+
+            names, problems = validate_names_text(text)
+            if names is None:
+                return self._reject(problems)
+
+            for p in problems:
+                log.warning(f'[WATCH] {p}')
+            self.keystroke.apply_names(names)
+            if self.on_applied:
+                self.on_applied(names)
+            return True, names
+
+    def _reject(self, problems):
+        log.warning('[WATCH] Rejected names.json, keeping previous keymap:')
+        for p in problems:
+            log.warning(f'[WATCH]   {p}')
+        if self.on_rejected:
+            self.on_rejected(problems)
+        return False, problems
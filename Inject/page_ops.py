@@ -0,0 +1,201 @@
+"""Synchronous per-photo operations for unattended batch jobs.
+
+Every function here takes the BrowserController and runs on its worker
+thread (through BrowserController.run_on_worker), so it may use the page
+and the controller's own _do_* helpers directly, exactly like macro replay.
+Waits are not fixed sleeps: each kind of wait has an AdaptiveWait whose
+timeout follows the latencies actually observed in this session.
+"""
+import time
+from urllib.parse import unquote_plus
+
+from browser_controller import _VISIBLE_DESCRIPTION_JS_BODY
+from dump_store import photo_id_from_url
+from log_setup import get_logger
+from rpc_metadata import RPC_URL_MARK
+
+
+log = get_logger('pageops')
+
+# Where a description save is POSTed: Google Photos' RPC endpoint, and
+# fake_photos_server's /api/photo/<id> for offline runs
+SAVE_URL_MARKS = (RPC_URL_MARK, '/api/photo/')
+
+
+class AdaptiveWait:
+    """Timeout tracking an EWMA of observed latencies (like TCP's RTO).
+
+    timeout = mean + 4 * mean deviation, clamped to [min_ms, max_ms]. A
+    timeout doubles the mean so the next attempt waits longer; successes
+    pull it back towards what the page really needs.
+    """
+
+    def __init__(self, name, initial_ms=2000, alpha=0.2, min_ms=250, max_ms=20000):
+        self.name = name
+        self.alpha = alpha
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.mean = float(initial_ms)
+        self.dev = initial_ms / 4.0
+        self.samples = []
+        self.timeouts = 0
+
+    def timeout_ms(self):
+        return max(self.min_ms, min(self.max_ms, self.mean + 4 * self.dev))
+
+    def observe(self, ms):
+        self.samples.append(ms)
+        self.dev += self.alpha * (abs(ms - self.mean) - self.dev)
+        self.mean += self.alpha * (ms - self.mean)
+
+    def timed_out(self):
+        self.timeouts += 1
+        self.mean = min(self.max_ms, self.mean * 2)
+
+    def run(self, fn):
+        """Call fn(timeout_ms), feeding its duration (or timeout) back into the estimate."""
+        t0 = time.perf_counter()
+        try:
+            value = fn(self.timeout_ms())
+        except Exception:
+            self.timed_out()
+            raise
+        self.observe((time.perf_counter() - t0) * 1000)
+        return value
+
+
+def photo_url(base_url, ref):
+    """Photo URL for a manifest reference: a full URL or a photo id."""
+    if ref.startswith('http://') or ref.startswith('https://'):
+        return ref
+    return f'{base_url.rstrip("/")}/photo/{ref}'
+
+
+def read_description(ctl):
+    return ctl.page.evaluate(_VISIBLE_DESCRIPTION_JS_BODY + "return v; }", None)
+
+
+def open_photo(ctl, url, wait):
+    """Load a photo page and wait until its description textarea is visible; returns its value."""
+    def load(timeout):
+        ctl.page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+        ctl.page.wait_for_function(_VISIBLE_DESCRIPTION_JS_BODY + "return v !== null; }", arg=None, timeout=timeout)
+    wait.run(load)
+    ctl._last_url = ctl.page.url
+    return read_description(ctl) or ''
+
+
+def wait_for_description(ctl, expected, wait):
+    """Wait until the visible description, trimmed, equals `expected`."""
+    wait.run(lambda timeout: ctl.page.wait_for_function(
+        _VISIBLE_DESCRIPTION_JS_BODY + "return v !== null && v.trim() === expected; }",
+        arg=expected.strip(), timeout=timeout))
+
+
+def is_save_request(request, photo_id, text):
+    """True for the POST that saves this photo's description.
+
+    The page also POSTs logging and analytics all the time, so only a save
+    endpoint counts, and only when its URL or body carries the photo id or
+    the new text.
+    """
+    if request.method != 'POST' or not any(mark in request.url for mark in SAVE_URL_MARKS):
+        return False
+    try:
+        body = unquote_plus(request.post_data or '')
+    except Exception:
+        body = ''  # binary body
+    return any(token and (token in request.url or token in body) for token in (photo_id, text.strip()))
+
+
+def commit_description(ctl, wait, text):
+    """Blur the textarea so the page saves, and wait for the save request.
+
+    Returns False when no save of `text` for this photo was seen in time;
+    the text is typed but the save is unconfirmed.
+    """
+    photo_id = photo_id_from_url(ctl.page.url)
+    try:
+        def blur_and_wait(timeout):
+            with ctl.page.expect_request(lambda r: is_save_request(r, photo_id, text), timeout=timeout):
+                ctl.page.evaluate("() => document.activeElement && document.activeElement.blur()")
+        wait.run(blur_and_wait)
+        return True
+    except Exception as e:
+        log.debug('[PAGEOPS] Save not observed: %s', e)
+        return False
+
+
+def set_description(ctl, text, waits):
+    """Replace the description with `text` (_do_delete_all clears with select-all, so any length)."""
+    ctl._do_delete_all()
+    wait_for_description(ctl, '', waits['type'])
+    if text.strip():
+        ctl._do_append_text(text.strip())
+        wait_for_description(ctl, text.strip(), waits['type'])
+
+
+def names_missing(current, names):
+    """Names not yet in the description (same normalised check as _extract_and_add_names)."""
+    desc_normalized = ' '.join(current.split()).lower()
+    missing = []
+    for name in names:
+        name = ' '.join(name.split())
+        if name and name.lower() not in desc_normalized:
+            missing.append(name)
+            desc_normalized += ' ' + name.lower()
+    return missing
+
+
+def plan_edit(before, description=None, names=()):
+    """Decide how to turn description `before` into the requested one.
+
+    Returns (action, text, result): action is 'unchanged', 'replace' (type
+    text after clearing) or 'append' (type text at the end); result is the
+    record apply_entry reports, without its status.
+    """
+    target = before.strip() if description is None else description.strip()
+    missing = names_missing(target, names)
+    if missing:
+        target = (target + ' ' + ' '.join(missing)).strip()
+    # Every name is in target now; the ones the page gains are those `before` lacked
+    result = {'before': before.strip(), 'after': target, 'added_names': names_missing(before, names)}
+    if target == before.strip():
+        return 'unchanged', '', result
+    if not target.startswith(before.strip()):
+        return 'replace', target, result
+    # Pure append keeps the existing text (and its undo history) untouched
+    addition = target[len(before.strip()):]
+    if before != before.rstrip() or not before.strip():
+        addition = addition.lstrip()
+    result['after'] = (before + addition).strip()
+    return 'append', addition, result
+
+
+def apply_entry(ctl, url, description=None, names=(), waits=None):
+    """Open one photo, write its description and/or names, and save.
+
+    Returns a result dict with status 'ok', 'unchanged' or 'unconfirmed'
+    (typed but no save request seen); raises on load or typing failures.
+    """
+    before = open_photo(ctl, url, waits['open'])
+    action, text, result = plan_edit(before, description, names)
+    result['url'] = ctl.page.url
+    if action == 'unchanged':
+        result['status'] = 'unchanged'
+        return result
+    if action == 'replace':
+        set_description(ctl, text, waits)
+    else:
+        ctl._do_append_text(text)
+        wait_for_description(ctl, result['after'], waits['type'])
+    result['status'] = 'ok' if commit_description(ctl, waits['save'], result['after']) else 'unconfirmed'
+    return result
+
+
+def default_waits():
+    return {
+        'open': AdaptiveWait('open', initial_ms=5000, max_ms=30000),
+        'type': AdaptiveWait('type', initial_ms=1000),
+        'save': AdaptiveWait('save', initial_ms=1500, max_ms=10000),
+    }
@@ -0,0 +1,218 @@
+"""N pages (tabs) over one persistent context for parallel bulk work.
+
+Playwright's sync API binds every object to the thread that started it,
+so tabs of one launch_persistent_context cannot each get an OS thread the
+way BrowserController's single worker does. The pool therefore runs the
+async API on one event loop: every page is a worker coroutine with its own
+queue, and while one tab waits on the network the others keep typing.
+
+The scheduler shards photos round-robin over the page queues; a worker
+whose shard runs dry steals from the longest remaining one. An AIMD
+limiter caps how many pages work at once: it grows by one page per
+window of healthy photos up to --pages, and halves when per-photo latency
+rises well above the best seen (or a photo fails), so Google's throttling
+is met with back-off instead of a pile of timeouts.
+"""
+import asyncio
+import time
+
+from browser_controller import DEFAULT_BASE_URL, FIELD_END_KEY, SELECT_ALL_KEY, _VISIBLE_DESCRIPTION_JS_BODY
+from dump_store import photo_id_from_url
+from log_setup import get_logger
+from page_ops import default_waits, is_save_request, photo_url, plan_edit
+
+
+log = get_logger('pool')
+
+# Centre of the visible description textarea (the one load/typed check), or null
+_TEXTAREA_CENTRE_JS = _VISIBLE_DESCRIPTION_JS_BODY + """
+    if (!visible) return null;
+    const r = visible.getBoundingClientRect();
+    return { x: r.left + r.width / 2, y: r.top + r.height / 2 };
+}"""
+
+
+class AimdLimiter:
+    """Concurrency limit with additive increase / multiplicative decrease.
+
+    A photo slower than `slow_factor` x the fastest per-photo EWMA seen, or a
+    failure, halves the limit (at most once per cooldown); every `limit`
+    healthy photos add one slot, up to max_limit.
+    """
+
+    def __init__(self, max_limit, start=1, slow_factor=2.0, alpha=0.2, cooldown_s=5.0):
+        self.max_limit = max_limit
+        self.limit = float(max(1, min(start, max_limit)))
+        self.slow_factor = slow_factor
+        self.alpha = alpha
+        self.cooldown_s = cooldown_s
+        self.ewma_ms = None
+        self.best_ms = None
+        self.active = 0
+        self.history = []  # (time, limit) whenever it changes
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+
+    async def release(self, ms, ok):
+        async with self._cond:
+            self.active -= 1
+            self._update(ms, ok)
+            self._cond.notify_all()
+
+    def _update(self, ms, ok):
+        before = int(self.limit)
+        if ok:
+            self.ewma_ms = ms if self.ewma_ms is None else self.ewma_ms + self.alpha * (ms - self.ewma_ms)
+            self.best_ms = self.ewma_ms if self.best_ms is None else min(self.best_ms, self.ewma_ms)
+        slow = ok and self.ewma_ms > self.best_ms * self.slow_factor
+        now = time.monotonic()
+        if (not ok or slow) and now - self._last_decrease >= self.cooldown_s:
+            self.limit = max(1.0, self.limit / 2)
+            self._last_decrease = now
+            log.info(f'[POOL] Backing off to {int(self.limit)} page(s) '
+                     f'({"failure" if not ok else f"latency {self.ewma_ms:.0f} ms vs best {self.best_ms:.0f} ms"})')
+        elif ok and not slow:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        if int(self.limit) != before:
+            self.history.append((round(now, 3), int(self.limit)))
+
+
+async def _read_description(page):
+    return await page.evaluate(_VISIBLE_DESCRIPTION_JS_BODY + "return v; }", None)
+
+
+async def _timed(wait, fn):
+    """Async AdaptiveWait.run: await fn(timeout_ms) and feed back how long it took."""
+    t0 = time.perf_counter()
+    try:
+        await fn(wait.timeout_ms())
+    except Exception:
+        wait.timed_out()
+        raise
+    wait.observe((time.perf_counter() - t0) * 1000)
+
+
+async def apply_on_page(page, url, description, names, waits):
+    """Async twin of page_ops.apply_entry for a bare page (no controller helpers)."""
+    async def load(timeout):
+        await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+        await page.wait_for_function(_VISIBLE_DESCRIPTION_JS_BODY + "return v !== null; }", arg=None, timeout=timeout)
+
+    async def typed(timeout):
+        await page.wait_for_function(_VISIBLE_DESCRIPTION_JS_BODY + "return v !== null && v.trim() === expected; }",
+                                     arg=result['after'], timeout=timeout)
+
+    async def saved(timeout):
+        photo_id = photo_id_from_url(page.url)
+        async with page.expect_request(lambda r: is_save_request(r, photo_id, result['after']), timeout=timeout):
+            await page.evaluate("() => document.activeElement && document.activeElement.blur()")
+
+    await _timed(waits['open'], load)
+    before = await _read_description(page) or ''
+    action, text, result = plan_edit(before, description, names)
+    result['url'] = page.url
+    if action == 'unchanged':
+        result['status'] = 'unchanged'
+        return result
+    centre = await page.evaluate(_TEXTAREA_CENTRE_JS, None)
+    if centre is None:
+        raise RuntimeError('No visible description textarea to click')
+    await page.mouse.click(centre['x'], centre['y'])
+    if action == 'replace':
+        await page.keyboard.press(SELECT_ALL_KEY)
+        await page.keyboard.press('Delete')
+    else:
+        await page.keyboard.press(FIELD_END_KEY)
+    await page.keyboard.type(text)
+    await _timed(waits['type'], typed)
+    try:
+        await _timed(waits['save'], saved)
+        result['status'] = 'ok'
+    except Exception:
+        result['status'] = 'unconfirmed'
+    return result
+
+
+class PagePool:
+    """Shard (key, description, names) entries over N tabs of one persistent context."""
+
+    def __init__(self, pages, base_url=None, user_data_dir=None, channel='chrome', headless=True,
+                 retries=2, on_result=None):
+        import pathlib
+        self.pages = pages
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.user_data_dir = user_data_dir or str(pathlib.Path.home() / '.googlephotos_profile')
+        self.channel = channel
+        self.headless = headless
+        self.retries = retries
+        self.on_result = on_result
+        self.waits = default_waits()
+        self.limiter = None
+        self.per_page = {}
+
+    def run(self, entries):
+        """Process all entries; returns the result records in completion order."""
+        return asyncio.run(self._run(entries))
+
+    async def _run(self, entries):
+        from playwright.async_api import async_playwright
+
+        self.limiter = AimdLimiter(self.pages)
+        queues = [asyncio.Queue() for _ in range(self.pages)]
+        for i, entry in enumerate(entries):
+            queues[i % self.pages].put_nowait(entry)
+        results = []
+        async with async_playwright() as p:
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir=self.user_data_dir, headless=self.headless, channel=self.channel,
+                args=['--disable-blink-features=AutomationControlled'])
+            try:
+                tabs = list(context.pages[:self.pages])
+                while len(tabs) < self.pages:
+                    tabs.append(await context.new_page())
+                log.info(f'[POOL] {len(entries)} photos over {self.pages} page(s)')
+                await asyncio.gather(*(self._worker(i, tab, queues, results) for i, tab in enumerate(tabs)))
+            finally:
+                await context.close()
+        return results
+
+    def _next_entry(self, index, queues):
+        own = queues[index]
+        if not own.empty():
+            return own.get_nowait()
+        victim = max(queues, key=lambda q: q.qsize())
+        return victim.get_nowait() if not victim.empty() else None
+
+    async def _worker(self, index, page, queues, results):
+        done = self.per_page.setdefault(index, 0)
+        while True:
+            entry = self._next_entry(index, queues)
+            if entry is None:
+                return
+            key, description, names = entry
+            await self.limiter.acquire()
+            t0 = time.perf_counter()
+            record = {'key': key, 'page': index}
+            for attempt in range(1, self.retries + 2):
+                record['attempts'] = attempt
+                try:
+                    record.update(await apply_on_page(page, photo_url(self.base_url, key), description, names, self.waits))
+                    record.pop('error', None)
+                    if record['status'] in ('ok', 'unchanged'):
+                        break
+                except Exception as e:
+                    record.update(status='failed', error=f'{type(e).__name__}: {str(e).splitlines()[0][:200]}')
+                    log.warning(f'[POOL] page {index} {key}: attempt {attempt} failed: {record["error"]}')
+            record['ms'] = round((time.perf_counter() - t0) * 1000, 1)
+            record['ts'] = round(time.time(), 3)
+            await self.limiter.release(record['ms'], record['status'] in ('ok', 'unchanged'))
+            done += 1
+            self.per_page[index] = done
+            results.append(record)
+            if self.on_result:
+                self.on_result(record)
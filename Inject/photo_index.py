@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Local, ordered photo-ID indexes built by grid_harvester.py.
+
+One JSON lines file per index under ~/.googlephotos_index (or
+$GPHOTOS_INDEX_DIR), one photo per line in grid order:
+
+    {"pos": 1, "photo_id": "AF1Qip...", "url": "https://photos.google.com/photo/AF1Qip...", "ts": ...}
+
+Entries are appended as they are found, so a harvest that dies halfway
+keeps what it saw and a rerun only adds what is new. Positions are
+1-based, matching "photo N" in the UI.
+
+What the tagger last saw on each photo (its description) goes to a
+NAME.state.jsonl sidecar, last line per photo wins, so "first untagged
+photo" is a lookup instead of a walk through the library.
+
+    python photo_index.py list
+    python photo_index.py show NAME [--head 20]
+    python photo_index.py get NAME N          # URL of photo N
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+
+DEFAULT_DIR = os.environ.get('GPHOTOS_INDEX_DIR') or os.path.join(os.path.expanduser('~'), '.googlephotos_index')
+
+
+def index_name(text):
+    """File-safe index name for an album id, search query or URL."""
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', text).strip('-')[:80] or 'index'
+
+
+class PhotoIndex:
+    """Ordered, de-duplicated photo ids with O(1) lookup both ways."""
+
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.path = os.path.join(directory or DEFAULT_DIR, index_name(name) + '.jsonl')
+        self.state_path = self.path[:-len('.jsonl')] + '.state.jsonl'
+        self.entries = []
+        self._positions = {}
+        self.state = {}  # photo_id -> {'description', 'ts', ...} as last seen
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._positions[entry['photo_id']] = len(self.entries) + 1
+                        self.entries.append(entry)
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.state.setdefault(record.pop('photo_id'), {}).update(record)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, photo_id):
+        return photo_id in self._positions
+
+    def add_many(self, items, source=None):
+        """Append unseen (photo_id, url) pairs in order; returns how many were new."""
+        new = []
+        now = round(time.time(), 3)
+        for photo_id, url in items:
+            if photo_id in self._positions:
+                continue
+            entry = {'pos': len(self.entries) + 1, 'photo_id': photo_id, 'url': url, 'ts': now}
+            if source:
+                entry['source'] = source
+            self._positions[photo_id] = entry['pos']
+            self.entries.append(entry)
+            new.append(entry)
+        if new:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(e) + '\n' for e in new))
+        return len(new)
+
+    def get(self, pos):
+        """Entry at 1-based position `pos`, or None."""
+        if 1 <= pos <= len(self.entries):
+            return self.entries[pos - 1]
+        return None
+
+    def position(self, photo_id):
+        """1-based position of photo_id, or None."""
+        return self._positions.get(photo_id)
+
+    def ids(self):
+        return [e['photo_id'] for e in self.entries]
+
+    def note(self, photo_id, **fields):
+        """Remember what was seen on a photo (e.g. description=...); written only when it changed."""
+        known = self.state.get(photo_id, {})
+        if all(known.get(k) == v for k, v in fields.items()):
+            return
+        fields['ts'] = round(time.time(), 3)
+        self.state.setdefault(photo_id, {}).update(fields)
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with open(self.state_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(photo_id=photo_id, **fields), ensure_ascii=False) + '\n')
+
+    def tagged(self, photo_id):
+        """True once the photo was seen with a non-empty description."""
+        return bool((self.state.get(photo_id, {}).get('description') or '').strip())
+
+    def first_untagged(self, start=1):
+        """Position of the first photo at or after `start` not known to be tagged, or None."""
+        for entry in self.entries[max(start, 1) - 1:]:
+            if not self.tagged(entry['photo_id']):
+                return entry['pos']
+        return None
+
+
+def list_indexes(directory=None):
+    directory = directory or DEFAULT_DIR
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.jsonl')] for name in os.listdir(directory)
+                  if name.endswith('.jsonl') and not name.endswith('.state.jsonl'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect photo-ID indexes built by grid_harvester.py')
+    parser.add_argument('--dir', default=None, help=f'Index directory (default {DEFAULT_DIR})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='Indexes, their sizes and how many photos are tagged')
+    p_show = sub.add_parser('show', help='Photos of one index in order')
+    p_show.add_argument('name')
+    p_show.add_argument('--head', type=int, help='Only the first N photos')
+    p_get = sub.add_parser('get', help='URL of photo N (1-based)')
+    p_get.add_argument('name')
+    p_get.add_argument('pos', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name in list_indexes(args.dir):
+            index = PhotoIndex(name, args.dir)
+            tagged = sum(1 for photo_id in index.ids() if index.tagged(photo_id))
+            print(f'{name:<40} {len(index):>7} photos {tagged:>7} tagged')
+    elif args.command == 'show':
+        index = PhotoIndex(args.name, args.dir)
+        for e in index.entries[:args.head]:
+            print(f"{e['pos']:>7} {'T' if index.tagged(e['photo_id']) else ' '} {e['photo_id']}  {e['url']}")
+    elif args.command == 'get':
+        entry = PhotoIndex(args.name, args.dir).get(args.pos)
+        if entry is None:
+            raise SystemExit(f'{args.name} has no photo {args.pos}')
+        print(entry['url'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Photo metadata straight from Google Photos' RPC payloads.
+
+The web app fetches photo details through batchexecute RPCs
+(POST .../data/batchexecute?rpcids=...). A response body is
+
+    )]}'
+
+    1234
+    [["wrb.fr","<rpcid>","<payload as a JSON string>",null,null,null,"generic"], ...]
+
+(length-prefixed chunks; the lengths count UTF-16 units, so they are
+skipped rather than trusted). The initial page carries the same payloads
+in AF_initDataCallback({key: 'ds:N', ..., data: [...]}) scripts, which is
+what the recorded dumps in OLD/old_device contain.
+
+Payloads are positional arrays, so items are found by shape rather than by
+rpcid: a media item is ["AF1Qip...", [thumb url, w, h, ...], taken ms, ...,
+{extensions}] with the description under extension 396644657 and places
+under 129168200; an album carries 72930366: [kind, title, ...]; a named
+person is [display name, 0|1, gender|null, given name].
+
+BrowserController(rpc_metadata=True) feeds page responses through an
+RpcMetadataListener and, once the info panel shows the new photo, takes
+its description from a response to that navigation instead of reading the
+page. The CLI decodes recorded payloads:
+
+    python rpc_metadata.py session.har                 # batchexecute responses in a HAR
+    python rpc_metadata.py ../OLD/old_device/gphotos_dump_1762946103.html
+    python rpc_metadata.py store:AF1QipN... body.txt --json
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+
+from dump_store import read_dump
+from log_setup import get_logger
+
+
+log = get_logger('rpc')
+
+RPC_URL_MARK = '/batchexecute'
+XSSI_PREFIX = ")]}'"
+DESCRIPTION_KEY = '396644657'
+LOCATION_KEY = '129168200'
+ALBUM_KEY = '72930366'
+
+_CHUNK_LENGTH_RE = re.compile(r'\s*(?:\d+[ \t]*\n)?\s*')
+_INIT_DATA_RE = re.compile(r"AF_initDataCallback\(\{key: '([^']+)'")
+
+
+def parse_batchexecute(body):
+    """[(rpcid, payload)] from a batchexecute response body; payload None for error entries."""
+    text = body.lstrip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    decoder = json.JSONDecoder()
+    results = []
+    pos = 0
+    while True:
+        pos = _CHUNK_LENGTH_RE.match(text, pos).end()
+        if pos >= len(text):
+            break
+        envelope, pos = decoder.raw_decode(text, pos)
+        for entry in envelope if isinstance(envelope, list) else []:
+            if isinstance(entry, list) and len(entry) > 2 and entry[0] == 'wrb.fr':
+                results.append((entry[1], json.loads(entry[2]) if isinstance(entry[2], str) else None))
+    return results
+
+
+def parse_init_data(html):
+    """[(key, payload)] from the AF_initDataCallback scripts of a page or dump."""
+    decoder = json.JSONDecoder()
+    results = []
+    for m in _INIT_DATA_RE.finditer(html):
+        start = html.find('data:', m.end())
+        if start < 0:
+            break
+        try:
+            payload, _ = decoder.raw_decode(html, start + len('data:'))
+        except ValueError:
+            continue
+        results.append((m.group(1), payload))
+    return results
+
+
+def _places(location):
+    names = []
+    try:
+        for place in location[1][4] or []:
+            names.append(place[1][0][0])
+    except (IndexError, TypeError):
+        pass
+    return names
+
+
+def _is_person(node):
+    return (len(node) >= 4 and isinstance(node[0], str) and node[0] and node[1] in (0, 1)
+            and (node[2] is None or isinstance(node[2], str)) and isinstance(node[3], str)
+            and not node[0].startswith(('AF1Qip', 'http')))
+
+
+def extract(payload):
+    """{'photos': {photo_id: {...}}, 'albums': [{'id', 'title'}], 'people': [names]} found in a payload.
+
+    A photo's 'description' is None when the item carries no description
+    extension, so callers can tell "not in this payload" from "empty".
+    """
+    photos, albums, people = {}, [], []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+            continue
+        if not isinstance(node, list):
+            continue
+        if len(node) >= 2 and isinstance(node[0], str) and node[0].startswith('AF1Qip') and isinstance(node[-1], dict):
+            ext = node[-1]
+            if ALBUM_KEY in ext and isinstance(ext[ALBUM_KEY], list) and len(ext[ALBUM_KEY]) > 1:
+                albums.append({'id': node[0], 'title': ext[ALBUM_KEY][1]})
+            elif isinstance(node[1], list) and node[1] and isinstance(node[1][0], str):
+                description = ext.get(DESCRIPTION_KEY)
+                photos[node[0]] = {
+                    'description': description[0] if isinstance(description, list) and description else None,
+                    'places': _places(ext.get(LOCATION_KEY)),
+                    'taken_ms': node[2] if len(node) > 2 and isinstance(node[2], int) else None,
+                }
+        elif _is_person(node) and node[0] not in people:
+            people.append(node[0])
+        stack.extend(node)
+    return {'photos': photos, 'albums': albums, 'people': people}
+
+
+class RpcMetadataListener:
+    """Collects photo metadata from a page's batchexecute responses.
+
+    Playwright's sync API must not block inside event callbacks, so the
+    response handler only queues matching responses; poll() (called from
+    the worker thread, e.g. while waiting for a navigation) reads and
+    parses them.
+    """
+
+    def __init__(self):
+        self.photos = {}
+        self.albums = {}
+        self.people = []
+        self.rpc_counts = Counter()
+        self.parse_ms = []
+        self._pending = []
+
+    def attach(self, page):
+        page.on('response', self._on_response)
+
+    def _on_response(self, response):
+        if RPC_URL_MARK in response.url:
+            self._pending.append((time.perf_counter(), response))
+
+    def feed(self, body, received=None):
+        """Parse one response body received at perf_counter() `received` (default now);
+        returns the photo ids it described.
+        """
+        started = time.perf_counter()
+        found = []
+        for rpcid, payload in parse_batchexecute(body):
+            self.rpc_counts[rpcid] += 1
+            if payload is None:
+                continue
+            meta = extract(payload)
+            for photo_id, info in meta['photos'].items():
+                known = self.photos.setdefault(photo_id, {})
+                known.update({k: v for k, v in info.items() if v is not None or k not in known})
+                if info['description'] is not None:
+                    # Only a payload carrying the description refreshes it; one that
+                    # merely mentions the photo leaves the older text in place
+                    known['description_received'] = started if received is None else received
+                found.append(photo_id)
+            self.albums.update((a['id'], a['title']) for a in meta['albums'])
+            self.people.extend(p for p in meta['people'] if p not in self.people)
+        self.parse_ms.append((time.perf_counter() - started) * 1000)
+        return found
+
+    def poll(self):
+        """Parse the responses received so far; returns the photo ids they described."""
+        found = []
+        while self._pending:
+            received, response = self._pending.pop(0)
+            try:
+                found.extend(self.feed(response.text(), received))
+            except Exception as e:
+                log.debug('[RPC] Could not read %s: %s', response.url[:120], e)
+        return found
+
+    def get(self, photo_id, since=None):
+        """Metadata for photo_id seen so far, or None.
+
+        With `since` (a perf_counter() time), only metadata whose description
+        came in a response received after it: an older description may
+        predate an edit to the photo.
+        """
+        self.poll()
+        info = self.photos.get(photo_id)
+        if info is not None and since is not None and info.get('description_received', float('-inf')) < since:
+            return None
+        return info
+
+    def log_summary(self):
+        if self.rpc_counts:
+            mean = sum(self.parse_ms) / len(self.parse_ms)
+            log.info(f'[RPC] {sum(self.rpc_counts.values())} RPC payloads ({dict(self.rpc_counts)}), '
+                     f'{len(self.photos)} photos described, {mean:.1f} ms mean parse')
+
+
+def _payloads_from(ref):
+    """[(label, payload)] from a HAR, a dump (file or store: ref) or a raw batchexecute body."""
+    if ref.endswith('.har'):
+        from har_replay import load_har, response_from_entry
+        found = []
+        for entry in load_har(ref):
+            if RPC_URL_MARK in entry['request']['url']:
+                body = response_from_entry(entry)[2].decode('utf-8', errors='replace')
+                found.extend(parse_batchexecute(body))
+        return found
+    text = read_dump(ref)
+    if text.lstrip().startswith(XSSI_PREFIX):
+        return parse_batchexecute(text)
+    return parse_init_data(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode photo metadata from recorded Google Photos RPC payloads')
+    parser.add_argument('files', nargs='+', help='.har, dump .html / store:<ref>, or a saved batchexecute body')
+    parser.add_argument('--json', action='store_true', help='Print the merged metadata as JSON')
+    parser.add_argument('--all', action='store_true', help='List photos without a description too')
+    args = parser.parse_args()
+
+    photos, albums, people, counts = {}, {}, [], Counter()
+    started = time.perf_counter()
+    for ref in args.files:
+        for label, payload in _payloads_from(ref):
+            counts[label] += 1
+            if payload is None:
+                continue
+            meta = extract(payload)
+            photos.update(meta['photos'])
+            albums.update((a['id'], a['title']) for a in meta['albums'])
+            people.extend(p for p in meta['people'] if p not in people)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        json.dump({'photos': photos, 'albums': albums, 'people': people, 'payloads': dict(counts)},
+                  sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    described = {k: v for k, v in photos.items() if v['description']}
+    print(f'{sum(counts.values())} payloads ({", ".join(f"{k} {v}" for k, v in sorted(counts.items()))}) '
+          f'in {elapsed_ms:.0f} ms')
+    print(f'{len(photos)} photos, {len(described)} with a description, {len(albums)} albums, {len(people)} people')
+    for photo_id, info in (photos if args.all else described).items():
+        places = f"  [{', '.join(info['places'])}]" if info['places'] else ''
+        print(f"  {photo_id}  {info['description'] or '':<40}{places}")
+    if albums:
+        print('Albums: ' + ', '.join(sorted(set(albums.values()))))
+    if people:
+        print('People: ' + ', '.join(people))
+
+
+if __name__ == '__main__':
+    main()
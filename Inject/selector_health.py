@@ -0,0 +1,107 @@
+"""Rolling hit rates for the obfuscated selectors the controller depends on.
+
+Google Photos ships class names like ZPTMcc, YW656b, DgVY7, AJM7gb and
+Y8X4Pc; when a release renames them nothing raises, tagging just gets slow
+or wrong. Every DOM probe the controller makes reports which selector tier
+matched (0 = primary, 1.. = fallbacks, None = nothing) and how many
+candidates each tier produced. SelectorHealth keeps the last WINDOW
+results per probe and logs one [SELECTOR] warning when the share matched
+by a probe's primary selector falls below its threshold (and one when it
+recovers), so the controller can switch strategy early instead of after an
+hour of mis-tagged photos.
+"""
+from collections import deque
+
+from log_setup import get_logger
+
+
+log = get_logger('selectors')
+
+WINDOW = 50
+MIN_SAMPLES = 10
+
+# probe -> (selectors in tier order, minimum hit rate before alerting)
+PROBES = {
+    'viewer_image': (('img[alt="View photo"]', 'img[alt*="View"]', 'img[role="button"]', 'img[jsname]'), 0.9),
+    'sidebar_root': (('.ZPTMcc', '.YW656b'), 0.9),
+    # Photos without people or albums are normal, so chips only alert when
+    # a whole window comes back empty
+    'face_chips': (('span.Y8X4Pc',), 0.02),
+    'album_chips': (('div.DgVY7 > div.AJM7gb',), 0.02),
+}
+
+
+class SelectorHealth:
+    """Rolling per-probe tier and candidate counts with degrade/recover alerts."""
+
+    def __init__(self, window=WINDOW, min_samples=MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = {probe: deque(maxlen=window) for probe in PROBES}
+        self._totals = {probe: 0 for probe in PROBES}
+        self._degraded = set()
+
+    def record(self, probe, tier, counts=None):
+        """Record one probe result: matched tier (None = miss) and candidates per tier."""
+        self._samples[probe].append((tier, tuple(counts or ())))
+        self._totals[probe] += 1
+        self._check(probe)
+
+    def hit_rate(self, probe, tier=None):
+        """Share of recent samples that matched (at `tier` when given), or None if too few."""
+        samples = self._samples[probe]
+        if len(samples) < self.min_samples:
+            return None
+        if tier is None:
+            hits = sum(1 for t, _ in samples if t is not None)
+        else:
+            hits = sum(1 for t, _ in samples if t == tier)
+        return hits / len(samples)
+
+    def degraded(self, probe):
+        return probe in self._degraded
+
+    def _check(self, probe):
+        # Fallback tiers matching is itself the drift signal, so judge the primary one
+        rate = self.hit_rate(probe, tier=0)
+        if rate is None:
+            return
+        threshold = PROBES[probe][1]
+        if rate < threshold and probe not in self._degraded:
+            self._degraded.add(probe)
+            log.warning(f'[SELECTOR] {probe} primary hit rate {rate:.0%} over the last {len(self._samples[probe])} '
+                        f'probes (< {threshold:.0%}); selectors {PROBES[probe][0]} may have changed')
+        elif rate >= threshold and probe in self._degraded:
+            self._degraded.discard(probe)
+            log.info(f'[SELECTOR] {probe} recovered, primary hit rate {rate:.0%}')
+
+    def snapshot(self):
+        """Per-probe rolling stats for logs and reports."""
+        report = {}
+        for probe, samples in self._samples.items():
+            selectors = PROBES[probe][0]
+            tiers = {sel: sum(1 for t, _ in samples if t == i) for i, sel in enumerate(selectors)}
+            mean_counts = {}
+            for i, sel in enumerate(selectors):
+                counts = [c[i] for _, c in samples if len(c) > i]
+                if counts:
+                    mean_counts[sel] = round(sum(counts) / len(counts), 1)
+            report[probe] = {
+                'total': self._totals[probe],
+                'window': len(samples),
+                'hit_rate': self.hit_rate(probe),
+                'primary_rate': self.hit_rate(probe, tier=0),
+                'tiers': tiers,
+                'misses': sum(1 for t, _ in samples if t is None),
+                'mean_candidates': mean_counts,
+                'degraded': probe in self._degraded,
+            }
+        return report
+
+    def log_summary(self):
+        for probe, s in self.snapshot().items():
+            if not s['total']:
+                continue
+            rate = 'n/a' if s['hit_rate'] is None else f"{s['hit_rate']:.0%} (primary {s['primary_rate']:.0%})"
+            log.info(f"[SELECTOR] {probe}: {s['total']} probes, hit rate {rate}, tiers {s['tiers']}, "
+                     f"misses {s['misses']}, mean candidates {s['mean_candidates']}"
+                     f"{' DEGRADED' if s['degraded'] else ''}")
@@ -0,0 +1,55 @@
+"""Wall-clock phases of tagger startup.
+
+Phases may run on different threads and overlap (the browser launches
+while Tk builds the window), so each is kept as a start/end pair relative
+to when this module was imported, and the report shows the timeline
+rather than a sum.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from log_setup import get_logger
+
+
+log = get_logger('startup')
+
+PROCESS_T0 = time.perf_counter()  # inject.py imports this first
+
+
+class StartupTimer:
+    """Collects (name, start, end) phases and logs them once startup is done."""
+
+    def __init__(self, t0=PROCESS_T0):
+        self.t0 = t0
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end):
+        with self._lock:
+            self.phases.append((name, start - self.t0, end - self.t0))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter())
+
+    def mark(self, name):
+        """A zero-length phase: the moment something became true."""
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    def report(self):
+        """Log the phases in start order; returns them as dicts."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: (p[1], p[2]))
+        rows = [{'phase': name, 'start_ms': round(start * 1000), 'end_ms': round(end * 1000),
+                 'ms': round((end - start) * 1000)} for name, start, end in phases]
+        for row in rows:
+            log.info(f"[STARTUP] {row['phase']:<16} {row['start_ms']:>6} -> {row['end_ms']:>6} ms ({row['ms']} ms)")
+        if rows:
+            log.info(f"[STARTUP] Ready after {max(r['end_ms'] for r in rows)} ms")
+        return rows
@@ -0,0 +1,83 @@
+"""rpc_metadata parsing against recorded-shape fixture payloads.
+
+    python -m pytest -q test_rpc_metadata.py
+
+fixtures/batchexecute_body.txt is a trimmed batchexecute response (XSSI
+prefix, two length-prefixed chunks, wrb.fr / di / af.httprm / e entries,
+one error entry with a null payload); fixtures/init_data.html holds two
+AF_initDataCallback scripts as the recorded dumps do. Item shapes are cut
+from the dumps in OLD/old_device.
+"""
+import json
+import os
+import time
+
+from rpc_metadata import RpcMetadataListener, extract, parse_batchexecute, parse_init_data
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PHOTO = 'AF1QipPLofSDR5U54BGWtI4vuLpgfEkUOWF0oWYS3vXd'
+BARE_PHOTO = 'AF1QipM02UfrVQ35LIHePDOArX5Vvgh0qV330oZWR2-9'
+ALBUM = 'AF1QipNwaNWY3JeZ7Gl1f59VJx5Hm3E11hGu39wdS4U-e_3g0afNTAZVUihTZlcCsaKW1A'
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_batchexecute_entries():
+    entries = parse_batchexecute(_fixture('batchexecute_body.txt'))
+    assert [rpcid for rpcid, _ in entries] == ['VrseUb', 'fDcn4b']
+    assert isinstance(entries[0][1], list)
+    assert entries[1][1] is None  # error entry: no payload
+
+
+def test_parse_batchexecute_without_prefix_or_lengths():
+    body = '[["wrb.fr","x","[1]",null,null,null,"generic"],["di",5]]'
+    assert parse_batchexecute(body) == [('x', [1])]
+
+
+def test_extract_batchexecute_payload():
+    (_, payload), _ = parse_batchexecute(_fixture('batchexecute_body.txt'))
+    meta = extract(payload)
+    assert meta['photos'][PHOTO] == {'description': 'Beach day with Laura',
+                                     'places': ['Santa Cruz', 'California'],
+                                     'taken_ms': 1745309985450}
+    assert meta['photos'][BARE_PHOTO]['description'] is None
+    assert meta['photos'][BARE_PHOTO]['places'] == []
+    assert ALBUM not in meta['photos']
+    assert meta['albums'] == [{'id': ALBUM, 'title': "2001 03 03 Mom's Birthday"}]
+    assert meta['people'] == ['Dennis Mathes']
+
+
+def test_parse_init_data():
+    entries = parse_init_data(_fixture('init_data.html'))
+    assert [key for key, _ in entries] == ['ds:2', 'ds:8']
+    people = extract(entries[0][1])['people']
+    photos = extract(entries[1][1])['photos']
+    assert people == ['Dennis Mathes']
+    assert photos[PHOTO]['description'] == 'Beach day with Laura'
+
+
+def test_listener_trusts_only_responses_after_since():
+    listener = RpcMetadataListener()
+    body = _fixture('batchexecute_body.txt')
+    assert set(listener.feed(body)) == {PHOTO, BARE_PHOTO}
+    assert listener.rpc_counts == {'VrseUb': 1, 'fDcn4b': 1}
+    since = time.perf_counter()
+    assert listener.get(PHOTO)['description'] == 'Beach day with Laura'
+    assert listener.get(PHOTO, since=since) is None
+    listener.feed(body)
+    assert listener.get(PHOTO, since=since)['places'] == ['Santa Cruz', 'California']
+
+
+def test_listener_since_needs_a_fresh_description():
+    listener = RpcMetadataListener()
+    listener.feed(_fixture('batchexecute_body.txt'))
+    since = time.perf_counter()
+    item = [PHOTO, ['https://lh3.googleusercontent.com/pw/x', 1, 1], 1745309985450, {}]
+    listener.feed('[["wrb.fr","VrseUb",%s,null,null,null,"generic"]]' % json.dumps(json.dumps([item])))
+    assert listener.photos[PHOTO]['description'] == 'Beach day with Laura'  # kept for callers without since
+    assert listener.get(PHOTO, since=since) is None
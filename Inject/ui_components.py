@@ -1,19 +1,37 @@
 """UI components - extracted from inject_v3.py"""
+import logging
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 import threading
 import re
+import time
+import log_setup
+from latency_tracer import ACTION_STEPS
+from macro import MacroRecorder, describe
+from names_watcher import NamesWatcher
+
+
+log = log_setup.get_logger('ui')
+
+# How long a multi-key sequence waits for its next key
+SEQUENCE_TIMEOUT_MS = 1000
 
 
 class AssistantUI:
     """Minimal UI for Google Photos tagger."""
     
-    def __init__(self, root, browser_controller, keystroke_handler, debug_mode=False):
-        print('[UI] Initializing...')
+    def __init__(self, root, browser_controller, keystroke_handler, debug_mode=False, tracer=None):
+        log.info('[UI] Initializing...')
         self.root = root
         self.browser = browser_controller
         self.keystroke = keystroke_handler
         self.debug_mode = debug_mode
+        self._sequence_timer = None
+        self.macro = MacroRecorder()
+        self.tracer = tracer  # Optional LatencyTracer, also set on the browser
+        self.trace_path = None  # Where shutdown writes the latency report
+        self.startup_timer = None  # Optional StartupTimer, reported once the browser is ready
+        self.log_level = 'DEBUG' if debug_mode else 'INFO'  # Level to return to when DBG is switched off
         
         root.title('Google Photos Tagger - Old Device Mode')
         
@@ -84,6 +102,8 @@ class AssistantUI:
         self.shortcut_frame.grid(row=1, column=0, columnspan=4, sticky='ew', pady=(0, 4))
         
         self.name_buttons = []
+        self._name_button_map = {}
+        self._name_button_specs_applied = {}
         self._create_name_buttons()
 
         # Photo URL label - row 2 (only in debug mode)
@@ -123,10 +143,18 @@ class AssistantUI:
         root.bind_class('TButton', '<space>', handle_button_space)  # For ttk.Button
         main.focus_set()
         
-        print(f'[UI] Registered {len(self.keystroke.get_all_shortcuts())} keyboard shortcuts')
-        print(f'[UI] Shortcuts: {list(self.keystroke.get_all_shortcuts().keys())}')
+        if log.isEnabledFor(logging.DEBUG):
+            shortcuts = self.keystroke.get_all_shortcuts()
+            log.debug('[UI] Registered %s keyboard shortcuts', len(shortcuts))
+            log.debug('[UI] Shortcuts: %s', list(shortcuts))
         
-        print('[UI] Starting poll loop')
+        # Pick up names.json edits without pressing reload
+        self.names_watcher = NamesWatcher(self.keystroke, 
+                                          on_applied=self._on_names_applied, 
+                                          on_rejected=self._on_names_rejected)
+        self.names_watcher.start()
+        
+        log.debug('[UI] Starting poll loop')
         self.poll_browser_state()
         
         # Position window at bottom after all widgets are created
@@ -143,14 +171,9 @@ class AssistantUI:
         y_position = screen_height - window_height - 50  # 50px from bottom for taskbar
         root.geometry(f'{window_width}x{window_height}+{x_position}+{y_position}')
     
-    def _create_name_buttons(self):
-        """Create name shortcut buttons from keystroke handler's names list.
+    def _name_button_specs(self):
+        """Return {(row, column): (label, pushed)} for the current names list.
         Letter-based shortcuts on first row, number-based on second row."""
-        # Clear existing buttons
-        for btn in self.name_buttons:
-            btn.destroy()
-        self.name_buttons = []
-        
         letter_buttons = []
         number_buttons = []
         
@@ -161,63 +184,87 @@ class AssistantUI:
             else:  # Letter-based like "(D)ennis"
                 letter_buttons.append(raw)
         
-        # Create letter-based buttons on row 0
+        specs = {}
         for idx, raw in enumerate(letter_buttons):
-            label = raw
             pushed = ''.join(ch for ch in raw if ch not in '()')
-            
-            btn = ttk.Button(self.shortcut_frame, text=label, 
-                            command=(lambda p=pushed: self.add_name(p)), 
-                            state='disabled' if not self.browser._running else 'normal')
-            btn.grid(row=0, column=idx, sticky='ew', padx=1, pady=1)
-            self.name_buttons.append(btn)
-        
-        # Configure columns for row 0
-        for i in range(len(letter_buttons)):
-            self.shortcut_frame.columnconfigure(i, weight=1)
+            specs[(0, idx)] = (raw, pushed)
         
-        # Create number-based buttons on row 1
         for idx, raw in enumerate(number_buttons):
-            label = raw
             # Strip the numeric prefix for display and pushing
             # Do NOT call .strip() here so trailing spaces from names.json are preserved
             stripped_label = re.sub(r'^\(\d+\)\s*', '', raw)
             pushed = ''.join(ch for ch in stripped_label if ch not in '()') if stripped_label else ''
-            
-            btn = ttk.Button(self.shortcut_frame, text=label, 
-                            command=(lambda p=pushed: self.add_name(p)), 
-                            state='disabled' if not self.browser._running else 'normal')
-            btn.grid(row=1, column=idx, sticky='ew', padx=1, pady=1)
-            self.name_buttons.append(btn)
-        
-        # Configure columns for row 1
-        for i in range(len(number_buttons)):
+            specs[(1, idx)] = (raw, pushed)
+        return specs
+    
+    def _create_name_buttons(self):
+        """Create or update name shortcut buttons from keystroke handler's names list.
+        
+        Only buttons whose label changed are reconfigured; new positions get
+        new buttons and positions that disappeared are destroyed.
+        """
+        specs = self._name_button_specs()
+        state = 'disabled' if not self.browser._running else 'normal'
+        changed = 0
+        
+        for pos in list(self._name_button_map):
+            if pos not in specs:
+                self._name_button_map.pop(pos).destroy()
+                changed += 1
+        
+        for (row, col), (label, pushed) in specs.items():
+            spec = (label, pushed)
+            btn = self._name_button_map.get((row, col))
+            if btn is None:
+                btn = ttk.Button(self.shortcut_frame, text=label, 
+                                command=(lambda p=pushed: self._dispatch_action('name', p)), 
+                                state=state)
+                btn.grid(row=row, column=col, sticky='ew', padx=1, pady=1)
+                self._name_button_map[(row, col)] = btn
+                changed += 1
+            elif self._name_button_specs_applied.get((row, col)) != spec:
+                btn.config(text=label, command=(lambda p=pushed: self._dispatch_action('name', p)))
+                changed += 1
+        self._name_button_specs_applied = specs
+        self.name_buttons = [self._name_button_map[pos] for pos in sorted(self._name_button_map)]
+        
+        # Configure columns for both rows
+        columns = max((col + 1 for _, col in specs), default=0)
+        for i in range(columns):
             self.shortcut_frame.columnconfigure(i, weight=1)
+        return changed
     
     def reload_names(self):
         """Reload names from names.json and update UI."""
-        try:
-            print('[RELOAD] Reloading names.json...')
-            new_names = self.keystroke.reload_shortcuts()
-            
-            # Rebuild name buttons
-            self._create_name_buttons()
-            
-            messagebox.showinfo('Reload Complete', 
-                              f'Reloaded {len(new_names)} names from names.json')
-            print(f'[RELOAD] Successfully reloaded {len(new_names)} names')
-            
-        except Exception as e:
-            print(f'[RELOAD] ERROR: {e}')
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror('Reload Failed', f'Failed to reload names.json: {str(e)}')
+        log.debug('[RELOAD] Reloading names.json...')
+        ok, result = self.names_watcher.reload()
+        if not ok:
+            # Problems were already reported by the watcher callback
+            return
+        log.info(f'[RELOAD] Successfully reloaded {len(result)} names')
+    
+    def _on_names_applied(self, names):
+        """Watcher callback (any thread): refresh buttons on the Tk thread."""
+        def _update():
+            changed = self._create_name_buttons()
+            self.keyboard_status.config(text=f'Names reloaded: {len(names)} names, {changed} button(s) updated',
+                                        foreground='green')
+        self.root.after(0, _update)
+    
+    def _on_names_rejected(self, problems):
+        """Watcher callback (any thread): show why names.json was not applied."""
+        summary = problems[0] if problems else 'invalid file'
+        if len(problems) > 1:
+            summary += f' (+{len(problems) - 1} more, see console)'
+        self.root.after(0, lambda: self.keyboard_status.config(
+            text=f'names.json NOT reloaded: {summary}', foreground='red'))
     
     def toggle_debug(self):
         """Toggle debug mode on/off and update UI accordingly."""
         self.debug_mode = not self.debug_mode
         if self.debug_mode:
-            print('[DEBUG] Debug mode ENABLED')
+            log_setup.set_level('DEBUG')
+            log.info('[DEBUG] Debug mode ENABLED')
             try:
                 self.debug_toggle_btn.config(text='DBG ✓', style='Accent.TButton')
             except:
@@ -259,7 +306,8 @@ class AssistantUI:
                 self.sum_btn.grid()
 
         else:
-            print('[DEBUG] Debug mode DISABLED')
+            log.info('[DEBUG] Debug mode DISABLED')
+            log_setup.set_level('INFO' if self.log_level == 'DEBUG' else self.log_level)
             try:
                 self.debug_toggle_btn.config(text='DBG', style='')
             except:
@@ -283,6 +331,7 @@ class AssistantUI:
 
     def on_key_press(self, event):
         """Handle keyboard shortcuts and natural typing."""
+        started = time.perf_counter()
         # Extract keycode if available (from event.keysym_num on some systems)
         keycode = getattr(event, 'keysym_num', None)
         keysym = event.keysym
@@ -290,7 +339,7 @@ class AssistantUI:
         self.keyboard_status.config(text=f'Last key pressed: "{event.char}" (keysym: {keysym}, state: {event.state}, keycode: {keycode})')
         
         if not self.browser._running:
-            print(f'[SHORTCUT] Ignored key "{event.char}" - browser not running')
+            log.debug('[SHORTCUT] Ignored key "%s" - browser not running', event.char)
             return
 
         # Check for Ctrl modifier using state bitmask (0x04 on Mac/Linux)
@@ -300,68 +349,168 @@ class AssistantUI:
         key = event.char if event.char else keysym
         
         # If it's a printable character (not a special key) and not a control combo
-        # Reserved keys: numbers 1-9 and '=' and shifted number symbols
+        # Reserved keys (numbers, '=', shifted number symbols, sequence leader) are
+        # precomputed by the keystroke handler when names.json is compiled
         # Letters (including n, N, p, P) pass through as natural keystrokes
-        reserved_keys = {'=', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9', '!', '@', '#', '$', '%', '^', '&', '*', '(', ')'}
-        if len(key) == 1 and key.isprintable() and not ctrl_pressed and event.char and key not in reserved_keys:
-            print(f'[KEYSTROKE] Sending "{key}" directly to web page')
+        if (len(key) == 1 and key.isprintable() and not ctrl_pressed and event.char
+                and key not in self.keystroke.reserved_keys and not self.keystroke.sequence_pending):
+            log.debug('[KEYSTROKE] Sending "%s" directly to web page', key)
+            self.macro.record('keystroke', key)
             self.browser.send_keystroke(key)
             return 'break'
         
         # Handle numeric keys for Ctrl+1, Ctrl+2, Ctrl+3
         if ctrl_pressed and key.isdigit():
-            print(f'[MODIFIER_COMBO] Ctrl+{key} pressed')
+            log.debug('[MODIFIER_COMBO] Ctrl+%s pressed', key)
             action = self.keystroke.on_key_press(key, ctrl=True, state=event.state, keycode=keycode, keysym=keysym)
         else:
             action = self.keystroke.on_key_press(key, ctrl=ctrl_pressed, state=event.state, keycode=keycode, keysym=keysym)
         
         if action:
             action_type, action_data = action
-            print(f'[SHORTCUT] Key "{key}" (ctrl={ctrl_pressed}, state={event.state}) -> {action_type}: {action_data}')
-
-            if action_type == 'next':
-                self.next_photo()
-            elif action_type == 'prev':
-                self.prev_photo()
-            elif action_type == 'name':
-                self.add_name(action_data)
-            elif action_type == 'name_and_next':
-                # Add name and immediately go to next photo
-                self.add_name(action_data)
-                self.next_photo()
-            # 'space' action removed - no-op
-            elif action_type == 'backspace':
-                self.do_backspace()
-            elif action_type == 'delete_all':
-                self.delete_all_description()
-            elif action_type == 'cursor_to_end':
-                self.position_cursor_at_end()
-            elif action_type == 'tab_dennis':
-                self.add_name('Dennis ')
-                self.next_photo()
-            
+            log.debug('[SHORTCUT] Key "%s" (ctrl=%s, state=%s) -> %s: %s', key, ctrl_pressed, event.state, action_type, action_data)
+            trace_id = None
+            if self.tracer and action_type in ACTION_STEPS:
+                trace_id = self.tracer.begin(action_type, started=started)
+                self.tracer.mark(trace_id, 'handled')
+            self._dispatch_action(action_type, action_data, trace_id)
             return 'break'
 
-    def add_name(self, name):
+    def _dispatch_action(self, action_type, action_data, trace_id=None):
+        """Run the UI side of a keystroke handler action."""
+        self.macro.record(action_type, action_data)
+        if action_type == 'next':
+            self.next_photo(trace_id)
+        elif action_type == 'prev':
+            self.prev_photo(trace_id)
+        elif action_type == 'name':
+            self.add_name(action_data, trace_id)
+        elif action_type == 'name_and_next':
+            # Add name and immediately go to next photo
+            self.add_name(action_data, trace_id)
+            self.next_photo(trace_id)
+        # 'space' action removed - no-op
+        elif action_type == 'backspace':
+            self.do_backspace(trace_id)
+        elif action_type == 'delete_all':
+            self.delete_all_description(trace_id)
+        elif action_type == 'cursor_to_end':
+            self.position_cursor_at_end()
+        elif action_type == 'tab_dennis':
+            self.add_name('Dennis ', trace_id)
+            self.next_photo(trace_id)
+        elif action_type == 'sequence_pending':
+            self.keyboard_status.config(text=f'Sequence: {" ".join(action_data)} ...')
+            # Give up waiting for more keys after a short pause
+            if self._sequence_timer:
+                self.root.after_cancel(self._sequence_timer)
+            self._sequence_timer = self.root.after(SEQUENCE_TIMEOUT_MS, self._flush_sequence)
+            return
+        elif action_type == 'macro_record':
+            self.toggle_macro_recording()
+        elif action_type == 'macro_replay':
+            self.replay_macro()
+        elif action_type == 'macro_cancel':
+            self.browser.cancel_macro()
+        elif action_type == 'goto_position':
+            self.goto_position()
+        elif action_type == 'goto_untagged':
+            self.goto_first_untagged()
+        elif action_type == 'sequence_cancelled':
+            self.keyboard_status.config(text=f'Sequence cancelled: {" ".join(action_data)}')
+        
+        if self._sequence_timer:
+            self.root.after_cancel(self._sequence_timer)
+            self._sequence_timer = None
+
+    def _flush_sequence(self):
+        """Complete or drop a sequence nobody finished typing."""
+        self._sequence_timer = None
+        action = self.keystroke.flush_sequence()
+        if action:
+            log.debug('[SHORTCUT] Sequence timeout -> %s: %s', action[0], action[1])
+            self._dispatch_action(*action)
+        else:
+            self.keyboard_status.config(text='Sequence timed out')
+
+    def toggle_macro_recording(self):
+        """F9: start recording a macro, or stop and keep it."""
+        if not self.macro.recording:
+            self.macro.start()
+            self.keyboard_status.config(text='MACRO: recording... press F9 to stop', foreground='red')
+            return
+        steps = self.macro.stop()
+        if steps:
+            self.keyboard_status.config(text=f'MACRO: {len(steps)} step(s): {describe(steps)[:120]} - F10 to replay', 
+                                        foreground='blue')
+        else:
+            self.keyboard_status.config(text='MACRO: nothing recorded', foreground='blue')
+
+    def replay_macro(self):
+        """F10: ask for N and replay the macro over the next N photos."""
+        if not self.macro.macro:
+            self.keyboard_status.config(text='MACRO: record one first with F9', foreground='blue')
+            return
+        count = simpledialog.askinteger('Replay macro', 
+                                        f'Replay over how many photos?\n\n{describe(self.macro.macro)[:200]}', 
+                                        parent=self.root, minvalue=1, initialvalue=10)
+        if not count:
+            return
+        self.keyboard_status.config(text=f'MACRO: replaying over {count} photo(s)... F11 to stop', foreground='red')
+
+        def _done(report):
+            text = (f"MACRO: {report['completed']}/{report['requested']} photos, "
+                    f"{report['photos_per_minute']} photos/min")
+            if report['stopped']:
+                text += f" - stopped: {report['stopped']}"
+            self.root.after(0, lambda: self.keyboard_status.config(text=text, foreground='green'))
+
+        self.browser.run_macro(self.macro.macro, count, on_done=_done)
+
+    def goto_position(self):
+        """F8: ask for N (or +N / -N) and jump there in the photo index."""
+        index = self.browser.photo_index
+        if index is None:
+            self.keyboard_status.config(text='INDEX: start with --index NAME to jump by position', foreground='blue')
+            return
+        answer = simpledialog.askstring('Jump to photo', f'Photo number (1-{len(index)}), or +N / -N to move:',
+                                        parent=self.root)
+        if not answer or not answer.strip().lstrip('+-').isdigit():
+            return
+        answer = answer.strip()
+        if answer[0] in '+-':
+            self.keyboard_status.config(text=f'INDEX: moving {answer}', foreground='blue')
+            threading.Thread(target=self.browser.advance, args=(int(answer),), daemon=True).start()
+        else:
+            self.keyboard_status.config(text=f'INDEX: jumping to photo {answer} of {len(index)}', foreground='blue')
+            threading.Thread(target=self.browser.goto_photo, args=(int(answer),), daemon=True).start()
+
+    def goto_first_untagged(self):
+        """F12: jump to the first photo in the index without a description."""
+        if self.browser.photo_index is None:
+            self.keyboard_status.config(text='INDEX: start with --index NAME to find untagged photos', foreground='blue')
+            return
+        self.keyboard_status.config(text='INDEX: jumping to the first untagged photo', foreground='blue')
+        threading.Thread(target=self.browser.goto_first_untagged, daemon=True).start()
+
+    def add_name(self, name, trace_id=None):
         """Append a given name string to the current description."""
-        print(f'[ADD_NAME] Queueing append for: {name}')
-        threading.Thread(target=lambda: self.browser.append_text(name), daemon=True).start()
+        log.debug('[ADD_NAME] Queueing append for: %s', name)
+        threading.Thread(target=lambda: self.browser.append_text(name, trace_id=trace_id), daemon=True).start()
 
     def launch_with_mode(self, mode):
         """Launch browser with specific user agent mode."""
         def _launch():
             try:
-                print(f'[LAUNCH] Starting browser with mode: {mode}')
+                log.info(f'[LAUNCH] Starting browser with mode: {mode}')
                 
                 self.browser._launch_mode = mode
                 
                 self.browser.start(headful=True)
-                print('[LAUNCH] Browser started')
+                log.info('[LAUNCH] Browser started')
                 self.root.after(0, self._on_browser_ready)
             except Exception as e:
-                print(f'[LAUNCH] ERROR: {e}')
-                import traceback
-                traceback.print_exc()
+                log.exception(f'[LAUNCH] ERROR: {e}')
                 error_msg = str(e)
                 self.root.after(0, lambda msg=error_msg: messagebox.showerror('Error', msg))
 
@@ -394,23 +543,28 @@ class AssistantUI:
         self.keyboard_status.config(text='Keyboard: READY - Press ← → arrows for navigation, or name keys', 
                                      foreground='green')
         
+        if self.startup_timer:
+            self.startup_timer.mark('ui_ready')
+            self.startup_timer.report()
+            self.startup_timer = None
+        
         messagebox.showinfo('Browser Ready', 'Browser launched. Please log into Google Photos if needed.\n\nKeyboard shortcuts are active!')
 
-    def next_photo(self):
+    def next_photo(self, trace_id=None):
         """Go to next photo."""
-        threading.Thread(target=self.browser.goto_next_photo, daemon=True).start()
+        threading.Thread(target=self.browser.goto_next_photo, args=(trace_id,), daemon=True).start()
 
-    def prev_photo(self):
+    def prev_photo(self, trace_id=None):
         """Go to previous photo."""
-        threading.Thread(target=self.browser.goto_prev_photo, daemon=True).start()
+        threading.Thread(target=self.browser.goto_prev_photo, args=(trace_id,), daemon=True).start()
 
-    def do_backspace(self):
+    def do_backspace(self, trace_id=None):
         """Send backspace to browser."""
-        threading.Thread(target=self.browser.send_backspace, daemon=True).start()
+        threading.Thread(target=self.browser.send_backspace, args=(trace_id,), daemon=True).start()
 
-    def delete_all_description(self):
+    def delete_all_description(self, trace_id=None):
         """Delete entire description."""
-        threading.Thread(target=self.browser.delete_all_description, daemon=True).start()
+        threading.Thread(target=self.browser.delete_all_description, args=(trace_id,), daemon=True).start()
 
     def dump_html(self):
         """Dump current page HTML for debugging."""
@@ -439,12 +593,18 @@ class AssistantUI:
                 else:
                     self.desc_label.config(text='(no description)')
         except Exception as e:
-            print(f'[POLL] ERROR: {e}')
+            log.error(f'[POLL] ERROR: {e}')
 
         self.root.after(500, self.poll_browser_state)
 
     def shutdown(self):
         """Shutdown."""
+        self.names_watcher.stop()
+        if self.tracer and self.trace_path:
+            try:
+                self.tracer.dump(self.trace_path)
+            except Exception as e:
+                log.error(f'[TRACE] ERROR writing report: {e}')
         try:
             self.browser.stop()
         except Exception:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Walk a photo index in "needs work" order instead of library order.
+
+What the tagger saw on each photo (description, people shown in the info
+panel) is kept in the index's state sidecar (photo_index.py). From that a
+photo needs:
+
+    names   people are shown but not all of them are in the description
+    empty   the description is empty
+    unseen  never visited, so nothing is known yet
+
+and photos with a description that already holds every person shown need
+nothing and are skipped. The queue is ordered by that need, then by index
+position. With inject.py --index NAME --work-queue the Next/Prev keys walk
+it with one direct jump per photo.
+
+    python work_queue.py NAME             # counts per need and the head of the queue
+    python work_queue.py NAME --head 50 --no-unseen
+"""
+import argparse
+from collections import Counter
+
+from photo_index import PhotoIndex
+
+
+NEEDS = ('names', 'empty', 'unseen')  # queue order
+
+
+def names_missing(description, people):
+    """People not yet in the description (the normalised check _extract_and_add_names uses)."""
+    desc_normalized = ' '.join((description or '').split()).lower()
+    return [p for p in people if ' '.join(p.split()).lower() not in desc_normalized]
+
+
+def need(index, photo_id):
+    """What a photo still needs: one of NEEDS, or None."""
+    state = index.state.get(photo_id)
+    if not state or 'description' not in state:
+        return 'unseen'
+    if names_missing(state['description'], state.get('people') or []):
+        return 'names'
+    if not (state['description'] or '').strip():
+        return 'empty'
+    return None
+
+
+class WorkQueue:
+    """Index photos that need work, most urgent first; a cursor walks them."""
+
+    def __init__(self, index, include_unseen=True):
+        self.index = index
+        self.include_unseen = include_unseen
+        self.order = []
+        self.cursor = -1
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute the order from the index state; the walk restarts at the top."""
+        wanted = NEEDS if self.include_unseen else NEEDS[:-1]
+        needs = {pid: need(self.index, pid) for pid in self.index.ids()}
+        self.order = sorted((pid for pid, n in needs.items() if n in wanted),
+                            key=lambda pid: (NEEDS.index(needs[pid]), self.index.position(pid)))
+        self.cursor = -1
+        return Counter(n for n in needs.values())
+
+    def __len__(self):
+        return len(self.order)
+
+    def step(self, n=1):
+        """Move the cursor n places (negative: back) and return that index entry, or None at the end.
+
+        Forward steps skip photos that no longer need work (state noted
+        since the queue was built), so revisits cost nothing.
+        """
+        pos = self.cursor
+        while True:
+            pos += 1 if n > 0 else -1
+            if not 0 <= pos < len(self.order):
+                return None
+            if n < 0 or need(self.index, self.order[pos]) is not None:
+                break
+        self.cursor = pos
+        return self.index.get(self.index.position(self.order[pos]))
+
+    def remaining(self):
+        return max(0, len(self.order) - self.cursor - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the needs-work order of a photo index')
+    parser.add_argument('name', help='Index name (photo_index.py list)')
+    parser.add_argument('--dir', default=None, help='Index directory')
+    parser.add_argument('--head', type=int, default=20, help='Show the first N photos of the queue')
+    parser.add_argument('--no-unseen', action='store_true', help='Leave out photos never visited')
+    args = parser.parse_args()
+
+    index = PhotoIndex(args.name, args.dir)
+    queue = WorkQueue(index, include_unseen=not args.no_unseen)
+    counts = queue.rebuild()
+    print(f'{index.name}: {len(index)} photos, {len(queue)} need work '
+          f'({", ".join(f"{n} {counts.get(n, 0)}" for n in NEEDS)}, done {counts.get(None, 0)})')
+    for pid in queue.order[:args.head]:
+        state = index.state.get(pid, {})
+        missing = names_missing(state.get('description'), state.get('people') or [])
+        print(f"{index.position(pid):>7} {need(index, pid):<7} {pid}"
+              + (f"  missing: {', '.join(missing)}" if missing else ''))
+
+
+if __name__ == '__main__':
+    main()